@@ -2,28 +2,53 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from controllers.controller_functions.telemetry import EXPORT_DECIMALS
+
+# CSV column name of each exported telemetry column, in CSV order
+CSV_COLUMNS = {
+    'Time_s': 'time',
+    'Alt_Sim': 'sim_altitude_agl',
+    'Alt_Raw': 'raw_altitude_agl',
+    'Alt_Filtered': 'filtered_altitude_agl',
+    'V_Sim': 'sim_velocity',
+    'V_Filtered': 'filtered_velocity',
+    'A_Sim': 'sim_acceleration',
+    'A_Raw': 'raw_acceleration',
+    'A_Filtered': 'filtered_acceleration',
+    'Deployment': 'deployment',
+    'Desired_Deployment': 'desired_deployment',
+    'Predicted_Apogee': 'predicted_apogee',
+    'Predicted_Apogee_No_Brake': 'predicted_apogee_no_brake',
+    'Error': 'error',
+    'Control_Active': 'control_active',
+}
+
+
+def telemetry_dataframe(telemetry, decimals=None):
+    """
+    DataFrame with the CSV column names from a controller's telemetry
+
+    Args:
+        telemetry: Controller (anything with .data) or its TelemetryRecorder
+        decimals: Round to this many decimals, or None to keep full precision
+
+    Returns:
+        pandas DataFrame, one row per control tick
+    """
+    recorder = getattr(telemetry, 'data', telemetry)
+    df = pd.DataFrame({name: recorder[column] for name, column in CSV_COLUMNS.items()})
+    if decimals is not None:
+        df = df.round(decimals)
+    df['Control_Active'] = df['Control_Active'].astype(int)
+    return df
+
+
 def export_to_csv(flight, controller, config):
     """Export flight data to CSV with temperature data"""
 
     try:
         # Create DataFrame from controller data
-        df = pd.DataFrame({
-            'Time_s': controller.data['time'],
-            'Alt_Sim': controller.data['sim_altitude_agl'],
-            'Alt_Raw': controller.data['raw_altitude_agl'],
-            'Alt_Filtered': controller.data['filtered_altitude_agl'],
-            'V_Sim': controller.data['sim_velocity'],
-            'V_Filtered': controller.data['filtered_velocity'],
-            'A_Sim': controller.data['sim_acceleration'],
-            'A_Raw': controller.data['raw_acceleration'],
-            'A_Filtered': controller.data['filtered_acceleration'],
-            'Deployment': controller.data['deployment'],
-            'Desired_Deployment': controller.data['desired_deployment'],
-            'Predicted_Apogee': controller.data['predicted_apogee'],
-            'Predicted_Apogee_No_Brake': controller.data['predicted_apogee_no_brake'],
-            'Error': controller.data['error'],
-            'Control_Active': controller.data['control_active']
-        })
+        df = telemetry_dataframe(controller, decimals=EXPORT_DECIMALS)
 
         # Export to CSV
         script_dir = Path(__file__).parent
@@ -34,6 +59,12 @@ def export_to_csv(flight, controller, config):
         print(f"\nData exported to {filename}")
         print(f"Rows: {len(df)}, Columns: {len(df.columns)}")
 
+        # Control tick stage timing, when the controller was profiled
+        if getattr(controller, 'profiler', None) is not None:
+            timing_filename = output_dir / 'sim_flight_stage_timing.csv'
+            controller.profiler.summary().to_csv(timing_filename, index=False)
+            print(f"Stage timing exported to {timing_filename}")
+
     except Exception as e:
         print(f"Error exporting CSV: {e}")
         import traceback
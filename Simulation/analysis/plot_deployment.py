@@ -3,12 +3,25 @@ import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
 from config import Config
+from analysis.export_flight import telemetry_dataframe
+
+
+def _load_flight_data(source):
+    # A CSV path, or a controller / TelemetryRecorder read through column views
+    if isinstance(source, (str, Path)):
+        return pd.read_csv(source)
+    return telemetry_dataframe(source)
 
 
 def plot_deployment(csv_path='sim_flight_data.csv', save_path='deployment_plot.png', config=Config):
+    """
+    Plot desired vs actual deployment, drag force and error while control is active
+
+    csv_path is an exported flight CSV, or the controller (or its telemetry)
+    to plot straight from memory without writing a CSV.
+    """
     try:
-        # Read the CSV file
-        df = pd.read_csv(csv_path)
+        df = _load_flight_data(csv_path)
 
         # Filter to only show data where control is active AND after coast lockout
         config_instance = config() if callable(config) else config
@@ -83,8 +96,8 @@ def plot_deployment(csv_path='sim_flight_data.csv', save_path='deployment_plot.p
 
 def plot_deployment_with_altitude(csv_path='sim_flight_data.csv', save_path='deployment_altitude_plot.png', config=Config):
     try:
-        # Read the CSV file
-        df = pd.read_csv(csv_path)
+        # CSV path, controller or telemetry (see plot_deployment)
+        df = _load_flight_data(csv_path)
 
         # Get coast lockout time
         config_instance = config() if callable(config) else config
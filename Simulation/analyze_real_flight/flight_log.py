@@ -0,0 +1,271 @@
+"""
+Reader for the flight logs the flight computer writes to its SD card
+
+A log starts with a preamble: a "Code compiled on ..." line, the SD card's
+config.csv copied line by line and a "Calibration point: ..." line. Then
+comes the header and one row per control loop, each ending with a comma.
+Logs of flights that landed end with "Apogee was ..." and "Total flight
+time was ..." lines. If the flight computer rebooted while logging, a new
+"Code compiled on ..." line (possibly glued to the end of a row) starts a
+new preamble within the data; only the rows before it are read.
+"""
+import io
+import os
+import sys
+from dataclasses import dataclass, field, fields
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+TIME_COLUMN = 'Time (us)'
+MODE_COLUMN = 'Mode'
+# Altitude the flight computer filtered; later firmware logs the raw and corrected altitudes
+ALTITUDE_COLUMNS = ('Corrected Altitude AGL (m)', 'Altitude AGL (m)')
+
+# config.csv values in the order the firmware reads them (Config::fillConfig reads
+# by position, and the labels changed between firmware versions)
+FIRMWARE_CONFIG_FIELDS = (
+    'simulation_mode', 'airbrakes_enabled', 'log_name', 'sim_name',
+    'burnout_mass', 'air_density', 'rocket_cd', 'airbrake_cd', 'rocket_area',
+    'model_y_std', 'model_v_std', 'model_a_std', 'measurement_y_std', 'measurement_a_std',
+    'target_apogee', 'launch_acceleration', 'coast_lockout', 'kp',
+    'altimeter_lockout', 'max_deployment_rate',
+)
+
+# Config attributes set from the record, the same values config.py reads from config.csv
+CONFIG_ATTRIBUTES = {
+    'burnout_mass': 'burnout_mass',
+    'air_density': 'air_density',
+    'rocket_cd': 'apogee_prediction_cd',
+    'airbrake_cd': 'airbrake_drag',
+    'model_y_std': 'model_y_std',
+    'model_v_std': 'model_v_std',
+    'model_a_std': 'model_a_std',
+    'measurement_y_std': 'alt_std',
+    'measurement_a_std': 'accel_std',
+    'target_apogee': 'target_apogee',
+    'airbrakes_enabled': 'use_airbrake',
+    'coast_lockout': 'burn_time',
+}
+
+_COMPILED_PREFIX = b'Code compiled on '
+_CALIBRATION_PREFIX = b'Calibration point:'
+_APOGEE_PREFIX = b'Apogee was '
+_FLIGHT_TIME_PREFIX = b'Total flight time was '
+_BOM = b'\xef\xbb\xbf'
+
+
+@dataclass
+class FlightLogConfig:
+    """
+    Preamble and summary lines of a flight log
+
+    The config.csv fields are named after the firmware's Config members and
+    are None if the log has no value for them. entries keeps every config.csv
+    line as written (label: value string).
+    """
+    compiled_on: str = None
+    calibration_point: float = None
+
+    # config.csv
+    simulation_mode: bool = None
+    airbrakes_enabled: bool = None
+    log_name: str = None
+    sim_name: str = None
+    burnout_mass: float = None  # kg
+    air_density: float = None  # kg/m^3
+    rocket_cd: float = None
+    airbrake_cd: float = None  # At full deployment
+    rocket_area: float = None  # m^2
+    model_y_std: float = None
+    model_v_std: float = None
+    model_a_std: float = None
+    measurement_y_std: float = None
+    measurement_a_std: float = None
+    target_apogee: float = None  # m
+    launch_acceleration: float = None  # m/s^2
+    coast_lockout: float = None  # s
+    kp: float = None  # 1/s
+    altimeter_lockout: float = None  # s
+    max_deployment_rate: float = None  # deployment/s
+    entries: dict = field(default_factory=dict)
+
+    # Summary written after landing
+    apogee: float = None  # m
+    apogee_time: float = None  # s after launch
+    flight_time: float = None  # s
+
+    # Line of the log (1-based) where a reboot started a new preamble, if one did
+    reboot_line: int = None
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Record from config.csv (label, value) pairs in file order"""
+        types = {f.name: f.type for f in fields(cls)}
+        record = cls(entries=dict(entries))
+        for name, (_, value) in zip(FIRMWARE_CONFIG_FIELDS, entries):
+            if types[name] is bool:
+                value = value.upper() == 'T'
+            elif types[name] is float:
+                value = float(value)
+            setattr(record, name, value)
+        return record
+
+    def to_config(self, config=None):
+        """
+        Config with the values the flight computer flew with
+
+        Sets the same Config attributes config.py reads from config.csv;
+        values missing from the log keep config's.
+
+        Args:
+            config: Config to update (default: a new Config)
+
+        Returns:
+            The updated Config
+        """
+        config = Config() if config is None else config
+        for name, attribute in CONFIG_ATTRIBUTES.items():
+            value = getattr(self, name)
+            if value is not None:
+                setattr(config, attribute, value)
+        if self.burnout_mass is not None:
+            config.dry_mass = self.burnout_mass - 0.049  # As config.py derives it
+        return config
+
+
+def _parse_preamble(lines):
+    """FlightLogConfig from the lines before the header"""
+    compiled_on, calibration_point, entries = None, None, []
+    for line in lines:
+        line = line.strip()
+        if line.startswith(_BOM):
+            line = line[len(_BOM):]
+        if line.startswith(_COMPILED_PREFIX):
+            compiled_on = line[len(_COMPILED_PREFIX):].decode(errors='replace')
+        elif line.startswith(_CALIBRATION_PREFIX):
+            calibration_point = float(line[len(_CALIBRATION_PREFIX):])
+        elif b',' in line:
+            label, value = line.decode(errors='replace').split(',', 2)[:2]
+            if label.strip():
+                entries.append((label.strip(), value.strip()))
+    record = FlightLogConfig.from_entries(entries)
+    record.compiled_on, record.calibration_point = compiled_on, calibration_point
+    return record
+
+
+def _parse_summary(record, lines):
+    """Apogee, its time and the flight time from the lines after the data"""
+    for line in lines:
+        line = line.strip()
+        if line.startswith(_APOGEE_PREFIX):
+            # Apogee was <m> and occured at <s> seconds
+            words = line.split()
+            record.apogee, record.apogee_time = float(words[2]), float(words[-2])
+        elif line.startswith(_FLIGHT_TIME_PREFIX):
+            record.flight_time = float(line.split()[-2])
+
+
+def _split_body(body, num_fields):
+    """Body bytes without the lines after the last complete data row, and those lines"""
+    end = len(body)
+    trailer = []
+    while end > 0:
+        start = body.rfind(b'\n', 0, end - 1) + 1
+        line = body[start:end]
+        if line.strip() and line[:1] in b'-0123456789' and line.count(b',') + 1 >= num_fields:
+            break
+        trailer.append(line)
+        end = start
+    return body[:end], trailer[::-1]
+
+
+def resolve_column(column, available):
+    """Name of column in available; column may be a tuple of alternatives, the first present is used"""
+    for name in ((column,) if isinstance(column, str) else column):
+        if name in available:
+            return name
+    return None
+
+
+def read_flight_log(log_path, columns=None, float_dtype=np.float32, time_col=TIME_COLUMN):
+    """
+    Read a flight log's preamble and data rows
+
+    Only the requested columns are parsed. The time column is read as
+    float64 (exact for microsecond counts), the flight mode as int8 and
+    every other column as float_dtype; float32 keeps the logged six decimals
+    of altitude to within 1e-5 m at a few hundred meters.
+
+    Args:
+        log_path: Path to the log (e.g. "Log Data/3.18 Flight 2.CSV")
+        columns: Header names to read (default: every column). An entry may be
+                 a tuple of alternative names for logs of different firmware
+                 versions; the first one present is read. The time column is
+                 always read.
+        float_dtype: dtype of the columns other than time and mode
+        time_col: Name of the time column, which starts the header line
+
+    Returns:
+        (FlightLogConfig, DataFrame of the requested columns)
+    """
+    header_start = time_col.encode()
+    with open(log_path, 'rb') as f:
+        preamble = []
+        header_line = 0
+        for line in f:
+            header_line += 1
+            if line.startswith(header_start):
+                header = line
+                break
+            preamble.append(line)
+        else:
+            raise ValueError(
+                f"No header line starting with '{time_col}' in {log_path}\n"
+                f"  The log may have ended before the flight computer started logging"
+            )
+        body = f.read()
+
+    record = _parse_preamble(preamble)
+
+    # A reboot while logging writes a new preamble into the data; keep the rows before it
+    reboot = body.find(_COMPILED_PREFIX)
+    if reboot >= 0:
+        record.reboot_line = header_line + body.count(b'\n', 0, reboot) + 1
+        print(f"    Warning: {log_path} line {record.reboot_line}: flight computer rebooted "
+              f"('{_COMPILED_PREFIX.decode().strip()} ...'), reading only the rows before it")
+        body = body[:reboot]
+
+    header_names = [name.strip() for name in header.decode(errors='replace').rstrip('\r\n').split(',')]
+    # Rows cut short by a reboot have too few fields and are dropped with the summary lines
+    body, trailer = _split_body(body, len(header_names))
+    _parse_summary(record, trailer)
+
+    # Named columns only; the trailing comma of every row leaves an unnamed last one
+    available = [name for name in header_names if name]
+    if columns is None:
+        selected = available
+    else:
+        selected = [time_col]
+        missing = []
+        for column in columns:
+            name = resolve_column(column, available)
+            if name is None:
+                missing.append(column)
+            elif name not in selected:
+                selected.append(name)
+        if missing:
+            raise ValueError(f"Missing required columns: {missing}")
+
+    dtypes = {name: float_dtype for name in selected}
+    dtypes[time_col] = np.float64
+    if MODE_COLUMN in dtypes:
+        dtypes[MODE_COLUMN] = np.int8
+
+    data = pd.read_csv(io.BytesIO(header + body), usecols=selected, dtype=dtypes, engine='c')
+    return record, data[selected]
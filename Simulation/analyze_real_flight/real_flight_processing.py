@@ -3,13 +3,41 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import sys
 import os
-from scipy.interpolate import interp1d
 
-# Add parent directory to path to import config and kalman filter
+# Add parent directory to path to import config and kalman filter, and this
+# directory for flight_log when imported as analyze_real_flight.real_flight_processing
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from config import Config
 from controllers.controller_functions.kalman_filter import KalmanAltitudeFilter
+from flight_log import ALTITUDE_COLUMNS, MODE_COLUMN, TIME_COLUMN, read_flight_log, resolve_column
+
+
+# Parsed .eng files by path and modification time, shared by every interpolator of a process
+_thrust_curve_cache = {}
+
+
+def _parse_eng_file(eng_file_path):
+    """Motor header fields and (time, thrust) points of a .eng file (RASP format), cached by path and mtime"""
+    key = (os.path.abspath(eng_file_path), os.stat(eng_file_path).st_mtime_ns)
+    if key not in _thrust_curve_cache:
+        with open(eng_file_path, 'r') as f:
+            lines = f.readlines()
+
+        # Skip comment lines (start with ;)
+        data_lines = [line.strip() for line in lines if line.strip() and not line.startswith(';')]
+
+        # First data line is the motor header
+        # Format: Name Diameter(mm) Length(mm) Delays PropMass(kg) TotalMass(kg) Manufacturer
+        header = data_lines[0].split()
+
+        # Thrust curve data points
+        points = [line.split()[:2] for line in data_lines[1:] if len(line.split()) >= 2]
+        curve = np.array(points, dtype=np.float64).reshape(-1, 2)
+        curve.flags.writeable = False
+        _thrust_curve_cache[key] = (header, curve[:, 0], curve[:, 1])
+    return _thrust_curve_cache[key]
 
 
 class ThrustCurveInterpolator:
@@ -30,6 +58,10 @@ class ThrustCurveInterpolator:
     ALSO accounts for aerodynamic drag:
     - Drag = 0.5 * ρ * v² * Cd * A
     - Air density varies with altitude (standard atmosphere model)
+
+    Thrust and mass are linear interpolations over the curve's points (mass
+    from a table precomputed at each point), and every method accepts floats
+    or arrays, so a whole burn window can be evaluated in one call.
     """
 
     def __init__(self, eng_file_path: str, rocket_mass: float, rocket_diameter: float = 0.066, drag_coefficient: float = 0.5):
@@ -49,28 +81,20 @@ class ThrustCurveInterpolator:
         self.rocket_diameter = rocket_diameter
         self.drag_coefficient = drag_coefficient
         self.reference_area = np.pi * (rocket_diameter / 2) ** 2  # Cross-sectional area
-        self.time_data = []
-        self.thrust_data = []
-        self.interpolator = None
+        self.time_data = None
+        self.thrust_data = None
         self.burn_time = 0.0
         self.propellant_mass = 0.0  # Will be loaded from file
         self.total_impulse = 0.0
-        self.cumulative_impulse = None  # Cumulative impulse over time
-        self.impulse_interpolator = None  # Interpolator for impulse(t)
+        self.cumulative_impulse = None  # Cumulative impulse at each curve point
+        self.mass_data = None  # Rocket mass at each curve point
 
         self._load_thrust_curve()
 
     def _load_thrust_curve(self):
         """Load thrust curve from .eng file and extract motor parameters"""
-        with open(self.eng_file_path, 'r') as f:
-            lines = f.readlines()
+        header, self.time_data, self.thrust_data = _parse_eng_file(self.eng_file_path)
 
-        # Skip comment lines (start with ;)
-        data_lines = [line.strip() for line in lines if line.strip() and not line.startswith(';')]
-
-        # First data line is the motor header
-        # Format: Name Diameter(mm) Length(mm) Delays PropMass(kg) TotalMass(kg) Manufacturer
-        header = data_lines[0].split()
         if len(header) >= 6:
             self.propellant_mass = float(header[4])  # Propellant mass in kg
             print(f"    Loaded motor: {header[0]}, propellant mass: {self.propellant_mass:.4f} kg")
@@ -78,64 +102,34 @@ class ThrustCurveInterpolator:
             print(f"    Warning: Could not parse propellant mass from motor file, assuming 0.027 kg")
             self.propellant_mass = 0.027  # Default fallback
 
-        # Load thrust curve data points
-        for line in data_lines[1:]:
-            parts = line.split()
-            if len(parts) >= 2:
-                time = float(parts[0])
-                thrust = float(parts[1])
-                self.time_data.append(time)
-                self.thrust_data.append(thrust)
-
-        self.time_data = np.array(self.time_data)
-        self.thrust_data = np.array(self.thrust_data)
         self.burn_time = self.time_data[-1]
 
-        # Calculate total impulse using trapezoidal integration
-        self.total_impulse = np.trapz(self.thrust_data, self.time_data)
-        print(f"    Total impulse: {self.total_impulse:.1f} N·s")
-
-        # Calculate cumulative impulse at each time point
+        # Cumulative impulse at each time point, by the trapezoidal rule in one pass
         # This tells us how much propellant has been consumed up to time t
         # Assumption: mass flow rate ∝ thrust, so propellant consumed ∝ impulse
-        self.cumulative_impulse = np.zeros_like(self.time_data)
-        for i in range(1, len(self.time_data)):
-            # Integrate thrust from 0 to current time
-            self.cumulative_impulse[i] = np.trapz(
-                self.thrust_data[:i+1],
-                self.time_data[:i+1]
-            )
+        segment_impulse = 0.5 * np.diff(self.time_data) * (self.thrust_data[1:] + self.thrust_data[:-1])
+        self.cumulative_impulse = np.concatenate(([0.0], np.cumsum(segment_impulse)))
+        self.total_impulse = float(self.cumulative_impulse[-1])
+        print(f"    Total impulse: {self.total_impulse:.1f} N·s")
 
-        # Create interpolators
-        self.interpolator = interp1d(
-            self.time_data,
-            self.thrust_data,
-            kind='linear',
-            bounds_error=False,
-            fill_value=0.0  # Return 0 thrust outside burn time
-        )
+        # Mass at each time point; propellant consumed = propellant_mass × fraction of total impulse
+        fraction_burned = self.cumulative_impulse / self.total_impulse if self.total_impulse > 0 else 0.0
+        self.mass_data = self.initial_rocket_mass - self.propellant_mass * fraction_burned
 
-        self.impulse_interpolator = interp1d(
-            self.time_data,
-            self.cumulative_impulse,
-            kind='linear',
-            bounds_error=False,
-            fill_value=(0.0, self.total_impulse)  # 0 before burn, total after
-        )
-
-    def get_thrust(self, time: float) -> float:
+    def get_thrust(self, time):
         """
         Get interpolated thrust at given time
 
         Args:
-            time: Time in seconds
+            time: Time in seconds (float or array)
 
         Returns:
-            Thrust force in Newtons
+            Thrust force in Newtons (float, or array for array input); 0 outside the burn
         """
-        return float(self.interpolator(time))
+        thrust = np.interp(time, self.time_data, self.thrust_data, left=0.0, right=0.0)
+        return float(thrust) if np.ndim(thrust) == 0 else thrust
 
-    def get_current_mass(self, time: float) -> float:
+    def get_current_mass(self, time):
         """
         Get rocket mass at given time, accounting for propellant consumption
 
@@ -148,35 +142,23 @@ class ThrustCurveInterpolator:
         is being burned per second, and vice versa.
 
         Args:
-            time: Time in seconds
+            time: Time in seconds (float or array)
 
         Returns:
-            Current rocket mass in kg
+            Current rocket mass in kg (float, or array for array input)
         """
-        if time <= 0:
-            return self.initial_rocket_mass
-        elif time >= self.burn_time:
-            # All propellant consumed
-            return self.initial_rocket_mass - self.propellant_mass
-        else:
-            # Thrust-based propellant consumption model
-            # Get cumulative impulse up to this time
-            impulse_consumed = float(self.impulse_interpolator(time))
+        # Initial mass before the first curve point, all propellant consumed after burnout
+        mass = np.interp(time, self.time_data, self.mass_data,
+                         left=self.initial_rocket_mass,
+                         right=self.initial_rocket_mass - self.propellant_mass)
+        return float(mass) if np.ndim(mass) == 0 else mass
 
-            # Fraction of propellant burned = fraction of total impulse delivered
-            fraction_burned = impulse_consumed / self.total_impulse if self.total_impulse > 0 else 0
-
-            # Calculate mass consumed
-            propellant_consumed = self.propellant_mass * fraction_burned
-
-            return self.initial_rocket_mass - propellant_consumed
-
-    def get_air_density(self, altitude: float) -> float:
+    def get_air_density(self, altitude):
         """
         Get air density at given altitude using standard atmosphere model
 
         Args:
-            altitude: Altitude in meters AGL
+            altitude: Altitude in meters AGL (float or array)
 
         Returns:
             Air density in kg/m³
@@ -187,13 +169,13 @@ class ThrustCurveInterpolator:
         scale_height = 8500.0  # meters
         return rho_0 * np.exp(-altitude / scale_height)
 
-    def get_drag_force(self, velocity: float, altitude: float) -> float:
+    def get_drag_force(self, velocity, altitude):
         """
         Calculate drag force at given velocity and altitude
 
         Args:
-            velocity: Velocity in m/s (positive = upward)
-            altitude: Altitude in meters AGL
+            velocity: Velocity in m/s (positive = upward; float or array)
+            altitude: Altitude in meters AGL (float or array)
 
         Returns:
             Drag force in Newtons (always opposes velocity)
@@ -203,9 +185,11 @@ class ThrustCurveInterpolator:
         # Sign: drag always opposes motion
         drag_magnitude = 0.5 * rho * velocity**2 * self.drag_coefficient * self.reference_area
         # Return negative if going up (drag opposes upward motion)
+        if np.ndim(drag_magnitude) > 0:
+            return np.where(np.asarray(velocity) > 0, -drag_magnitude, drag_magnitude)
         return -drag_magnitude if velocity > 0 else drag_magnitude
 
-    def get_acceleration(self, time: float, velocity: float = 0.0, altitude: float = 0.0) -> float:
+    def get_acceleration(self, time, velocity=0.0, altitude=0.0):
         """
         Get net acceleration at given time, accounting for thrust, drag, mass, and gravity
 
@@ -213,28 +197,36 @@ class ThrustCurveInterpolator:
         a_net = (F_thrust - F_drag) / m - g
 
         Args:
-            time: Time in seconds since motor ignition
-            velocity: Current velocity in m/s (for drag calculation, default 0)
-            altitude: Current altitude in m AGL (for air density, default 0)
+            time: Time in seconds since motor ignition (float or array)
+            velocity: Current velocity in m/s (for drag calculation, default 0; float or array)
+            altitude: Current altitude in m AGL (for air density, default 0; float or array)
 
         Returns:
-            Net acceleration in m/s² (thrust/mass - drag/mass - gravity)
+            Net acceleration in m/s² (thrust/mass - drag/mass - gravity), an array if any input is one
         """
         thrust = self.get_thrust(time)
         current_mass = self.get_current_mass(time)
 
-        if current_mass > 0:
-            # Calculate drag force (opposes velocity)
-            drag = self.get_drag_force(velocity, altitude)
+        # Calculate drag force (opposes velocity)
+        drag = self.get_drag_force(velocity, altitude)
+
+        if np.ndim(current_mass) > 0 or np.ndim(drag) > 0:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                acceleration = (thrust + drag) / current_mass - 9.81
+            # Just gravity if no mass
+            return np.where(current_mass > 0, acceleration, -9.81)
 
+        if current_mass > 0:
             # Net acceleration = (thrust + drag) / mass - gravity
             # Note: drag is negative when going up, so it reduces acceleration
             return (thrust + drag) / current_mass - 9.81
         else:
             return -9.81  # Just gravity if no mass
 
-    def is_burning(self, time: float) -> bool:
-        """Check if motor is still burning at given time"""
+    def is_burning(self, time):
+        """Check if motor is still burning at given time (bool, or bool array for array input)"""
+        if np.ndim(time) > 0:
+            return (np.asarray(time) >= 0.0) & (np.asarray(time) <= self.burn_time)
         return 0.0 <= time <= self.burn_time
 
 
@@ -300,6 +292,50 @@ class RealFlightProcessor:
         if state_col and state_col in df.columns:
             rename_dict[state_col] = 'state'
 
+        return self._standardize_flight_data(df, rename_dict, time_unit)
+
+    def load_flight_log(self, log_path: str,
+                        altitude_col=ALTITUDE_COLUMNS,
+                        accel_col='IMU Global Acceleration z',
+                        accel_x_col='IMU Global Acceleration x',
+                        accel_y_col='IMU Global Acceleration y',
+                        state_col=MODE_COLUMN,
+                        extra_cols=(),
+                        float_dtype=np.float32):
+        """
+        Load a flight log as written by the flight computer (e.g. from Log Data/)
+
+        Reads the preamble into a FlightLogConfig and only the needed columns,
+        with compact dtypes (see flight_log.read_flight_log). Column arguments
+        may be tuples of alternative names, the first present in the log is used.
+
+        Args:
+            log_path: Path to the log
+            altitude_col: Name of altitude column (default: the corrected altitude if logged, else the altitude)
+            accel_col: Name of accelerometer column (vertical acceleration)
+            accel_x_col: Name of X acceleration column (optional, None to skip)
+            accel_y_col: Name of Y acceleration column (optional, None to skip)
+            state_col: Name of flight state column (optional, None to skip)
+            extra_cols: Other columns to read, kept under their names (e.g. 'Servo deployment')
+            float_dtype: dtype of the sensor columns
+
+        Returns:
+            (DataFrame ready for run_filter, FlightLogConfig of the log); build the
+            Config the flight computer flew with from the second with to_config()
+        """
+        columns = [altitude_col, accel_col] + [col for col in (accel_x_col, accel_y_col, state_col) if col]
+        log_config, df = read_flight_log(log_path, columns + list(extra_cols), float_dtype=float_dtype)
+
+        rename_dict = {TIME_COLUMN: 'time'}
+        for col, name in ((altitude_col, 'altitude'), (accel_col, 'accel'), (accel_x_col, 'accel_x'),
+                          (accel_y_col, 'accel_y'), (state_col, 'state')):
+            if col:
+                rename_dict[resolve_column(col, df.columns)] = name
+
+        return self._standardize_flight_data(df, rename_dict, 'us'), log_config
+
+    def _standardize_flight_data(self, df, rename_dict, time_unit):
+        """Rename columns to the standard names, sort by time and convert time to seconds from 0"""
         df = df.rename(columns=rename_dict)
 
         # Sort by time
@@ -373,14 +409,6 @@ class RealFlightProcessor:
 
         self.kalman_filter.initialize(initial_altitude, self.config.sampling_rate)
 
-        # Storage for results
-        filtered_altitude = []
-        filtered_velocity = []
-        filtered_accel = []
-        saturated_flags = []
-        thrust_accel_values = []  # Store thrust accelerations for analysis
-        thrust_used_count = 0  # Counter for how many times thrust curve was used
-
         # Check if state column exists
         has_state = 'state' in flight_data.columns
 
@@ -436,180 +464,184 @@ class RealFlightProcessor:
             print(f"    During burn: thrust accel REPLACES saturated accelerometer measurement")
             print(f"    After burn: switches back to accelerometer measurement")
 
-        # Process each data point
-        for idx, row in flight_data.iterrows():
-            time = row['time']
-            altitude = row['altitude']
-            accel_measured = row['accel']
+        # Per-row inputs as NumPy columns; everything that does not depend on the
+        # filter's own estimates is worked out for all rows before the filter runs
+        times = flight_data['time'].to_numpy(dtype=np.float64)
+        altitudes = flight_data['altitude'].to_numpy(dtype=np.float64)
+        accels = flight_data['accel'].to_numpy(dtype=np.float64)
+        num_rows = len(times)
+        row_labels = flight_data.index
+
+        # Flight state of each row (NaN where missing) and whether it is powered flight
+        if has_state:
+            states = flight_data['state'].to_numpy(dtype=np.float64)
+            powered = np.trunc(states) == 2
+        else:
+            states = np.full(num_rows, np.nan)
+            powered = np.ones(num_rows, dtype=bool)
+
+        # Thrust and mass only depend on time since ignition, so look them up for
+        # every row at once; drag depends on the previous estimates and is added per row
+        if thrust_curve_interpolator:
+            # Time relative to ignition (when state first became 2), else absolute time
+            thrust_times = times - ignition_time if ignition_time is not None else times
+            thrust_forces = thrust_curve_interpolator.get_thrust(thrust_times)
+            masses = thrust_curve_interpolator.get_current_mass(thrust_times)
+            burning = thrust_curve_interpolator.is_burning(thrust_times)
+            # ONLY use the thrust curve while the motor is burning and, if there is
+            # a state column, in powered flight (state 2)
+            use_thrust = burning & powered
+        else:
+            thrust_times = times
+            burning = np.zeros(num_rows, dtype=bool)
+            use_thrust = np.zeros(num_rows, dtype=bool)
 
-            # Get flight state if available (check for NaN)
-            flight_state = int(row['state']) if has_state and 'state' in row and pd.notna(row['state']) else None
+        # Accelerometer saturation (in g's), only where the measured acceleration is used
+        if handle_saturation:
+            saturated = ~use_thrust & (np.abs(accels / 9.81) >= self.accel_saturation_threshold)
+        else:
+            saturated = np.zeros(num_rows, dtype=bool)
+
+        # Rows within any deployment filter range
+        in_deployment_window = np.zeros(num_rows, dtype=bool)
+        if deployment_filter_ranges is not None:
+            for start_time, end_time in deployment_filter_ranges:
+                in_deployment_window |= (times >= start_time) & (times <= end_time)
+        if not (deployment_model_y_std or deployment_model_v_std or deployment_model_a_std or
+                deployment_alt_std or deployment_accel_std):
+            in_deployment_window[:] = False
+
+        # Noise settings, selected per row by index:
+        # 0 normal, 1 saturated, 2 deployment, 3 deployment and saturated
+        normal_Q, normal_R = self.kalman_filter.Q, self.kalman_filter.R
+        deployment_Q, deployment_R = normal_Q.copy(), normal_R.copy()
+        if deployment_model_y_std is not None:
+            deployment_Q[0, 0] = deployment_model_y_std ** 2
+        if deployment_model_v_std is not None:
+            deployment_Q[1, 1] = deployment_model_v_std ** 2
+        if deployment_model_a_std is not None:
+            deployment_Q[2, 2] = deployment_model_a_std ** 2
+        if deployment_alt_std is not None:
+            deployment_R[0, 0] = deployment_alt_std ** 2
+        if deployment_accel_std is not None:
+            deployment_R[1, 1] = deployment_accel_std ** 2
+        # Saturation sets the accel measurement variance very large (effectively
+        # infinite), taking precedence over the deployment value
+        saturated_R, deployment_saturated_R = normal_R.copy(), deployment_R.copy()
+        saturated_R[1, 1] = deployment_saturated_R[1, 1] = 1e10
+        noise_settings = (
+            (normal_Q, normal_R), (normal_Q, saturated_R),
+            (deployment_Q, deployment_R), (deployment_Q, deployment_saturated_R),
+        )
+        noise_index = (2 * in_deployment_window + saturated).tolist()
+        # Deployment altitude variance scaled by (v² + 1) of the previous velocity estimate
+        scale_alt_std = deployment_alt_std is not None and deployment_alt_std_velocity_scale is not None
+        scaled_noise_settings = (None, None, (deployment_Q, deployment_R.copy()),
+                                 (deployment_Q, deployment_saturated_R.copy()))
 
-            # Get thrust acceleration if interpolator provided
+        # How many times the thrust curve was used before each row
+        thrust_used_before = np.cumsum(use_thrust) - use_thrust
+
+        # Storage for results
+        filtered_altitude = [0.0] * num_rows
+        filtered_velocity = [0.0] * num_rows
+        filtered_accel = [0.0] * num_rows
+        thrust_accel_values = [0.0] * num_rows  # Store thrust accelerations for analysis
+
+        # Plain floats for the per-row loop
+        time_list, altitude_list, accel_list = times.tolist(), altitudes.tolist(), accels.tolist()
+        use_thrust_list = use_thrust.tolist()
+        if thrust_curve_interpolator:
+            thrust_list, mass_list = thrust_forces.tolist(), masses.tolist()
+        # Rows printing a debug line: the first few uses of the thrust curve and, until
+        # then, every 100th of the first rows that do not use it
+        debug_rows = set()
+        if thrust_curve_interpolator:
+            debug_rows.update(np.flatnonzero(use_thrust & (thrust_used_before < 5)).tolist())
+            for i in np.flatnonzero(~use_thrust & (thrust_used_before < 5)).tolist():
+                idx = row_labels[i]
+                if idx < 1000 and idx % 100 == 0 and (
+                        (has_state and not powered[i]) or (not burning[i] and thrust_used_before[i] == 0)):
+                    debug_rows.add(i)
+
+        # Run the filter over each data point
+        kalman_filter = self.kalman_filter
+        current_noise = 0
+        velocity_estimate, altitude_estimate = 0.0, None
+        for i in range(num_rows):
+            time = time_list[i]
+
+            # Thrust-based acceleration, with drag from the previous estimates
             thrust_accel = 0.0
-            is_burning = False
             if thrust_curve_interpolator:
-                # Calculate time relative to ignition (when state first became 2)
-                if ignition_time is not None:
-                    thrust_time = time - ignition_time
+                if i == 0:
+                    altitude_estimate = altitude_list[0]
+                if mass_list[i] > 0:
+                    drag = thrust_curve_interpolator.get_drag_force(velocity_estimate, altitude_estimate)
+                    thrust_accel = (thrust_list[i] + drag) / mass_list[i] - 9.81
                 else:
-                    # No state column, use absolute time
-                    thrust_time = time
-
-                # Get current velocity and altitude estimates from Kalman filter (if available)
-                # Use previous estimates for drag calculation
-                if len(filtered_velocity) > 0:
-                    current_velocity = filtered_velocity[-1]
-                    current_altitude = filtered_altitude[-1]
+                    thrust_accel = -9.81  # Just gravity if no mass
+                thrust_accel_values[i] = thrust_accel
+
+            if i in debug_rows:
+                flight_state = int(states[i]) if not np.isnan(states[i]) else None
+                if use_thrust_list[i]:
+                    print(f"  DEBUG: Using thrust curve at t={time:.3f}s, state={flight_state}, thrust_time={thrust_times[i]:.3f}s, thrust_accel={thrust_accel:.1f} m/s²")
+                elif has_state and not powered[i]:
+                    print(f"  DEBUG: NOT using thrust at t={time:.3f}s - state={flight_state} (not 2)")
                 else:
-                    current_velocity = 0.0
-                    current_altitude = altitude
-
-                thrust_accel = thrust_curve_interpolator.get_acceleration(thrust_time, current_velocity, current_altitude)
-                is_burning = thrust_curve_interpolator.is_burning(thrust_time)
-                thrust_accel_values.append(thrust_accel)
-
-            # Determine which acceleration measurement to use
-            # ONLY use thrust curve when:
-            # 1. Thrust interpolator is provided
-            # 2. Motor is burning (based on time since state==2)
-            # 3. If state column exists: state must == 2 (powered flight)
-            #    If no state column: always use thrust curve during burn
-            if has_state:
-                use_thrust_curve = (
-                    thrust_curve_interpolator and
-                    is_burning and
-                    flight_state == 2
-                )
-            else:
-                # No state column - use thrust curve whenever burning
-                use_thrust_curve = (
-                    thrust_curve_interpolator and
-                    is_burning
-                )
-
-            # Debug first few uses of thrust curve
-            if use_thrust_curve and thrust_used_count < 5:
-                print(f"  DEBUG: Using thrust curve at t={time:.3f}s, state={flight_state}, thrust_time={thrust_time:.3f}s, thrust_accel={thrust_accel:.1f} m/s²")
-
-            if use_thrust_curve:
-                # During motor burn in state 2: USE THRUST CURVE instead of saturated accelerometer
-                accel_to_use = thrust_accel
-                # Don't flag as saturated since we're using thrust model
-                is_saturated = False
-                thrust_used_count += 1
-            else:
-                # Not in powered flight state or after burnout: use actual accelerometer
-                accel_to_use = accel_measured
-                # Check for accelerometer saturation (convert accel to g's for comparison)
-                accel_in_g = accel_measured / 9.81
-                is_saturated = handle_saturation and abs(accel_in_g) >= self.accel_saturation_threshold
-
-                # Debug why thrust curve NOT used (only first few times during potential burn period)
-                if thrust_curve_interpolator and thrust_used_count < 5 and idx < 1000:
-                    if has_state and flight_state != 2:
-                        if idx % 100 == 0:  # Only print every 100th to avoid spam
-                            print(f"  DEBUG: NOT using thrust at t={time:.3f}s - state={flight_state} (not 2)")
-                    elif not is_burning:
-                        if thrust_used_count == 0 and idx % 100 == 0:
-                            print(f"  DEBUG: NOT using thrust at t={time:.3f}s - not burning (thrust_time={thrust_time:.3f}s, burn_time={thrust_curve_interpolator.burn_time:.3f}s)")
-
-            saturated_flags.append(is_saturated)
-
-            # Check if current time falls within any deployment filter range
-            deployment_filter_active = False
-            if deployment_filter_ranges is not None:
-                for start_time, end_time in deployment_filter_ranges:
-                    if start_time <= time <= end_time:
-                        deployment_filter_active = True
-                        break
-
-            # Store original Q and R matrices if we need to modify them
-            original_Q = None
-            original_R = None
-
-            # Switch to deployment-specific filter variances if within active window
-            if deployment_filter_active and (deployment_model_y_std or deployment_model_v_std or
-                                            deployment_model_a_std or deployment_alt_std or deployment_accel_std):
-                original_Q = self.kalman_filter.Q.copy()
-                original_R = self.kalman_filter.R.copy()
-
-                # Update process noise covariance (Q matrix) if provided
-                if deployment_model_y_std is not None:
-                    self.kalman_filter.Q[0, 0] = deployment_model_y_std ** 2
-                if deployment_model_v_std is not None:
-                    self.kalman_filter.Q[1, 1] = deployment_model_v_std ** 2
-                if deployment_model_a_std is not None:
-                    self.kalman_filter.Q[2, 2] = deployment_model_a_std ** 2
-
-                # Update measurement noise covariance (R matrix) if provided
-                if deployment_alt_std is not None:
-                    # Get current velocity estimate for velocity scaling
-                    if deployment_alt_std_velocity_scale is not None and len(filtered_velocity) > 0:
-                        current_vel = filtered_velocity[-1]
-                        # σ_total = σ_base * v²
-                        alt_std_scaled = deployment_alt_std * (current_vel ** 2 + 1)
-                        self.kalman_filter.R[0, 0] = deployment_alt_std ** 2 * (current_vel ** 2 + 1)
-                    else:
-                        # No velocity scaling, use base value
-                        self.kalman_filter.R[0, 0] = deployment_alt_std ** 2
-
-                if deployment_accel_std is not None:
-                    self.kalman_filter.R[1, 1] = deployment_accel_std ** 2
-
-            # Override R matrix if saturated (takes precedence over deployment)
-            if is_saturated:
-                if original_R is None:
-                    original_R = self.kalman_filter.R.copy()
-                # Set accel measurement variance to very large value (effectively infinite)
-                self.kalman_filter.R[1, 1] = 1e10
+                    print(f"  DEBUG: NOT using thrust at t={time:.3f}s - not burning (thrust_time={thrust_times[i]:.3f}s, burn_time={thrust_curve_interpolator.burn_time:.3f}s)")
+
+            # During motor burn in state 2 the thrust curve REPLACES the (saturated) accelerometer
+            accel_to_use = thrust_accel if use_thrust_list[i] else accel_list[i]
+
+            noise = noise_index[i]
+            if noise >= 2 and scale_alt_std and i > 0:
+                # σ_total = σ_base * (v² + 1), written into this setting's own copy of R
+                kalman_filter.Q, kalman_filter.R = scaled_noise_settings[noise]
+                kalman_filter.R[0, 0] = deployment_alt_std ** 2 * (velocity_estimate ** 2 + 1)
+                current_noise = None
+            elif noise != current_noise:
+                kalman_filter.Q, kalman_filter.R = noise_settings[noise]
+                current_noise = noise
 
             # Update filter with chosen acceleration measurement
-            alt_est, vel_est = self.kalman_filter.update(
-                altitude,
+            altitude_estimate, velocity_estimate = kalman_filter.update(
+                altitude_list[i],
                 accel_to_use,  # <-- Use thrust accel during burn, measured accel after
                 time,
                 motor_burn_time=0
             )
 
-            # Restore Q and R matrices if they were modified
-            if original_Q is not None:
-                self.kalman_filter.Q = original_Q
-            if original_R is not None:
-                self.kalman_filter.R = original_R
-
             # Store estimates
-            filtered_altitude.append(alt_est)
-            filtered_velocity.append(vel_est)
-            filtered_accel.append(self.kalman_filter.getAEstimate())
+            filtered_altitude[i] = altitude_estimate
+            filtered_velocity[i] = velocity_estimate
+            filtered_accel[i] = kalman_filter.getAEstimate()
+
+        kalman_filter.Q, kalman_filter.R = normal_Q, normal_R
 
         # Add results to dataframe
         results = flight_data.copy()
         results['filtered_altitude'] = filtered_altitude
         results['filtered_velocity'] = filtered_velocity
         results['filtered_accel'] = filtered_accel
-        results['saturated'] = saturated_flags
+        results['saturated'] = saturated
 
         # Add thrust acceleration if it was used
         if thrust_curve_interpolator:
             results['thrust_accel'] = thrust_accel_values
-            print(f"\n  Thrust curve was used for {thrust_used_count}/{len(results)} data points")
+            print(f"\n  Thrust curve was used for {int(use_thrust.sum())}/{len(results)} data points")
 
         # Calculate predicted apogee with no airbrakes for each timestep
         # Using kinematic equation: apogee = current_altitude + v²/(2*|a|)
-        # Only calculate when velocity > 0 (ascending)
-        predicted_apogee = []
-        for alt, vel in zip(filtered_altitude, filtered_velocity):
-            if vel > 0:
-                # Ballistic trajectory: how much higher will it go with constant deceleration?
-                delta_h = -(vel ** 2) / (2 * no_airbrake_decel)
-                apogee = alt + delta_h
-            else:
-                # Descending or at apogee, predicted apogee is current max altitude
-                apogee = alt
-            predicted_apogee.append(apogee)
-
-        results['predicted_apogee_no_airbrake'] = predicted_apogee
+        # Only when ascending; descending or at apogee it is the current altitude
+        altitude_estimates = np.array(filtered_altitude)
+        velocity_estimates = np.array(filtered_velocity)
+        results['predicted_apogee_no_airbrake'] = np.where(
+            velocity_estimates > 0,
+            altitude_estimates + -(velocity_estimates ** 2) / (2 * no_airbrake_decel),
+            altitude_estimates
+        )
 
         # Integrate horizontal accelerations if available
         if 'accel_x' in flight_data.columns and 'accel_y' in flight_data.columns:
@@ -617,26 +649,20 @@ class RealFlightProcessor:
             ax = flight_data['accel_x'].values
             ay = flight_data['accel_y'].values
 
-            # Integrate acceleration to get velocity
-            # Using cumulative trapezoidal integration
-            vx = np.zeros_like(ax)
-            vy = np.zeros_like(ay)
-            x = np.zeros_like(ax)
-            y = np.zeros_like(ay)
-
-            for i in range(1, len(time_array)):
-                dt = time_array[i] - time_array[i-1]
-                # Trapezoidal integration for velocity
-                vx[i] = vx[i-1] + 0.5 * (ax[i-1] + ax[i]) * dt
-                vy[i] = vy[i-1] + 0.5 * (ay[i-1] + ay[i]) * dt
-                # Trapezoidal integration for position
-                x[i] = x[i-1] + 0.5 * (vx[i-1] + vx[i]) * dt
-                y[i] = y[i-1] + 0.5 * (vy[i-1] + vy[i]) * dt
+            # Cumulative trapezoidal integration of acceleration to velocity, then to position
+            dt = np.diff(time_array)
+
+            def integrate(values):
+                integral = np.zeros_like(values)
+                np.cumsum(0.5 * (values[:-1] + values[1:]) * dt, out=integral[1:])
+                return integral
 
+            vx = integrate(ax)
+            vy = integrate(ay)
             results['integrated_vx'] = vx
             results['integrated_vy'] = vy
-            results['integrated_x'] = x
-            results['integrated_y'] = y
+            results['integrated_x'] = integrate(vx)
+            results['integrated_y'] = integrate(vy)
 
         # Override deployment values if requested
         if override_deployment is not None:
@@ -652,20 +678,22 @@ class RealFlightProcessor:
             deployment_cols = [col for col in results.columns if 'deployment' in col.lower()]
             time_array = results['time'].values
 
+            max_changes = (rate_limit_deployment * np.diff(time_array)).tolist()
+
             for col in deployment_cols:
                 original_deployment = results[col].values
                 rate_limited = np.zeros_like(original_deployment)
                 rate_limited[0] = original_deployment[0]
 
-                # Apply rate limiting
-                for i in range(1, len(original_deployment)):
-                    dt = time_array[i] - time_array[i-1]
-                    max_change = rate_limit_deployment * dt
-                    desired_change = original_deployment[i] - rate_limited[i-1]
-
+                # Apply rate limiting (each step depends on the last, so over plain floats)
+                limited = rate_limited[0].item()
+                limited_values = [limited]
+                for desired, max_change in zip(original_deployment[1:].tolist(), max_changes):
                     # Clamp the change to the rate limit
-                    actual_change = np.clip(desired_change, -max_change, max_change)
-                    rate_limited[i] = rate_limited[i-1] + actual_change
+                    actual_change = min(max(desired - limited, -max_change), max_change)
+                    limited = limited + actual_change
+                    limited_values.append(limited)
+                rate_limited[1:] = limited_values[1:]
 
                 # Add as new column
                 new_col_name = f"{col}_rate_limited"
@@ -0,0 +1,69 @@
+"""
+Benchmark: per-sample airbrake drag curve setup in CustomStochasticRocket.create_object
+
+Compares the old per-sample path (pd.read_csv, scale, tolist, build a new AirBrakes
+Function) against the preloaded table scaled lazily by the sample's Cd multiplier.
+Also times the drag coefficient lookup Flight makes while the airbrakes are deployed.
+
+Run from the Simulation directory:
+    python benchmarks/benchmark_airbrake_drag_curve.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from rocketpy.rocket.aero_surface import AirBrakes
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Config
+from simulation_functions.airbrake_drag_curve import (
+    load_airbrake_drag_curve,
+    create_drag_coefficient_function,
+    ScaledDragCoefficient
+)
+
+config = Config()
+reference_area = np.pi * config.rocket_radius ** 2
+rng = np.random.default_rng(0)
+
+
+def legacy_setup():
+    airbrake_cd_multiplier = rng.normal(1.0, config.airbrake_cd_std)
+    df = pd.read_csv(config.airbrake_drag_curve_file)
+    df.iloc[:, 2] = df.iloc[:, 2] * airbrake_cd_multiplier
+    return AirBrakes(df.values.tolist(), reference_area)
+
+
+drag_coefficient = create_drag_coefficient_function(load_airbrake_drag_curve(config.airbrake_drag_curve_file))
+
+
+def preloaded_setup():
+    airbrake_cd_multiplier = rng.normal(1.0, config.airbrake_cd_std)
+    air_brakes = AirBrakes(drag_coefficient, reference_area)
+    air_brakes.drag_coefficient = ScaledDragCoefficient(drag_coefficient, airbrake_cd_multiplier)
+    return air_brakes
+
+
+def time_per_call(function, number):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+if __name__ == "__main__":
+    n = 500
+    legacy_us = time_per_call(legacy_setup, n)
+    preloaded_us = time_per_call(preloaded_setup, n)
+
+    legacy_cd = legacy_setup().drag_coefficient
+    scaled_cd = preloaded_setup().drag_coefficient
+    legacy_eval_us = time_per_call(lambda: legacy_cd.get_value_opt(0.6, 0.2), 20000)
+    scaled_eval_us = time_per_call(lambda: scaled_cd.get_value_opt(0.6, 0.2), 20000)
+
+    print("Per-sample airbrake drag curve setup")
+    print(f"  read_csv + rebuild Function: {legacy_us:8.1f} us")
+    print(f"  preloaded + scale factor:    {preloaded_us:8.1f} us  ({legacy_us / preloaded_us:.1f}x faster)")
+    print("Drag coefficient lookup during flight")
+    print(f"  rebuilt Function:            {legacy_eval_us:8.2f} us")
+    print(f"  shared Function * factor:    {scaled_eval_us:8.2f} us")
@@ -0,0 +1,288 @@
+"""
+Benchmark suite: cost of one control tick for every controller
+
+Drives each controller from controller.Control (every CONTROLLERS entry plus
+FILE) through sensor streams without RocketPy: a synthetic coast with
+barometer and accelerometer noise, and the recorded flight in
+analyze_real_flight/flight4mod.csv resampled onto the controller's ticks.
+Sensors, state vectors and the airbrake are stand-ins built before timing,
+so only controller.controller() is measured.
+
+Reports per-tick latency (p50/p99/max), throughput in ticks/s, memory
+allocated per tick (tracemalloc peak, in a separate traced pass) and net
+retained blocks per tick, and checks p99 against the budget of one flight
+computer loop (its loop overrun warning is at 20 ms, i.e. 50 Hz).
+
+Results can be saved as a JSON baseline and later runs compared against it;
+ticks whose p50 grew by more than the tolerance are reported as regressions.
+
+Run from the Simulation directory:
+    python benchmarks/benchmark_controller_ticks.py
+    python benchmarks/benchmark_controller_ticks.py --save
+    python benchmarks/benchmark_controller_ticks.py --loop-rate 100 --baseline other.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from time import perf_counter_ns
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Config
+from controller import Control, CONTROLLERS
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "controller_ticks.json"
+RECORDED_FLIGHT = Path(__file__).parent.parent / "analyze_real_flight" / "flight4mod.csv"
+LOOP_RATE_HZ = 50  # Flight computer loop (Rocket::update warns of overruns past 20 ms)
+REPEAT = 10  # Timed passes over each stream, each with a fresh controller
+REGRESSION_TOLERANCE = 0.5  # p50 growth over the baseline reported as a regression
+SEA_LEVEL_PRESSURE = 101325.0  # Pa, only sets the scale of the barometer readings
+
+
+def pressure_at(altitude_agl):
+    """Barometer reading at altitude_agl, the inverse of find_altitude"""
+    return SEA_LEVEL_PRESSURE * (1 - np.asarray(altitude_agl) / 44330.0) ** 5.255
+
+
+def synthetic_stream(config, seed=0):
+    """
+    Coast of predict_apogee's drag model, with the brakes retracted, from a
+    constant-acceleration burn sized to overshoot the target by 15 m, then one
+    second of descent. Barometer noise follows config.barometer_noise_variance.
+    """
+    g = 9.81
+    k = 0.5 * config.air_density * config.apogee_prediction_cd * np.pi * config.rocket_radius ** 2
+    vt = np.sqrt(config.burnout_mass * g / k)
+
+    # Burnout velocity v_b from altitude v_b * burn_time / 2 reaching target + 15 m
+    burnout_velocity = 50.0
+    for _ in range(50):
+        climb = config.target_apogee + 15.0 - burnout_velocity * config.burn_time / 2
+        burnout_velocity = np.sqrt((np.exp(2 * k * climb / config.burnout_mass) - 1) * config.burnout_mass * g / k)
+    burn_acceleration = burnout_velocity / config.burn_time
+    burnout_altitude = burnout_velocity * config.burn_time / 2
+
+    phase0 = np.arctan(burnout_velocity / vt)
+    coast_time = phase0 * vt / g
+    apogee = burnout_altitude + vt ** 2 / g * -np.log(np.cos(phase0))
+    time = np.arange(0.0, config.burn_time + coast_time + 1.0, 1 / config.sampling_rate)
+
+    burn = time < config.burn_time
+    coast = ~burn & (time < config.burn_time + coast_time)
+    descent = ~burn & ~coast
+    phase = phase0 - g * (time - config.burn_time) / vt
+    fall = g * (time - config.burn_time - coast_time) / vt
+
+    altitude = np.where(burn, 0.5 * burn_acceleration * time ** 2, 0.0)
+    velocity = np.where(burn, burn_acceleration * time, 0.0)
+    acceleration = np.where(burn, burn_acceleration, 0.0)
+    altitude[coast] = burnout_altitude + vt ** 2 / g * np.log(np.cos(phase[coast]) / np.cos(phase0))
+    velocity[coast] = vt * np.tan(phase[coast])
+    acceleration[coast] = -g - k * velocity[coast] ** 2 / config.burnout_mass
+    altitude[descent] = apogee - vt ** 2 / g * np.log(np.cosh(fall[descent]))
+    velocity[descent] = -vt * np.tanh(fall[descent])
+    acceleration[descent] = -g + k * velocity[descent] ** 2 / config.burnout_mass
+
+    rng = np.random.default_rng(seed)
+    pressure = pressure_at(altitude) + rng.normal(0.0, np.sqrt(config.barometer_noise_variance), len(time))
+    acceleration = acceleration + rng.normal(0.0, config.accel_std, len(time))
+    quaternion = np.tile([1.0, 0.0, 0.0, 0.0], (len(time), 1))
+    return time, altitude, velocity, pressure, acceleration, quaternion
+
+
+def recorded_stream(config, path=RECORDED_FLIGHT):
+    """Launch to one second past apogee of a processed flight log, resampled onto the controller's ticks"""
+    log = pd.read_csv(path)
+    log = log[log['state'] >= 2]
+    log_time = log['Time (us)'].to_numpy() - log['Time (us)'].iloc[0]
+    log_altitude = log['Altitude AGL (m)'].to_numpy()
+    end_time = log_time[np.argmax(log_altitude)] + 1.0
+    time = np.arange(0.0, end_time, 1 / config.sampling_rate)
+
+    def column(name):
+        return np.interp(time, log_time, log[name].to_numpy())
+
+    altitude = column('Altitude AGL (m)')
+    quaternion = np.column_stack([column(f'IMU Quat {axis}') for axis in 'WXYZ'])
+    return (time, altitude, column('State Estimation v'), pressure_at(altitude),
+            column('IMU Global Acceleration z'), quaternion)
+
+
+def build_ticks(config, stream):
+    """(time, state, sensors) per tick, built up front so timing sees only the controller"""
+    time, altitude, velocity, pressure, acceleration, quaternion = stream
+    ticks = []
+    for i in range(len(time)):
+        state = np.zeros(13)
+        state[2] = altitude[i] + config.env_elevation
+        state[5] = velocity[i]
+        state[6:10] = quaternion[i]
+        sensors = [SimpleNamespace(measurement=float(pressure[i])),
+                   SimpleNamespace(measurement=np.array([0.0, 0.0, acceleration[i]]))]
+        ticks.append((float(time[i]), state, sensors))
+    return ticks
+
+
+def deployment_file(stream, directory):
+    """Deployment CSV for the FILE controller: fully deployed while climbing, retracted after apogee"""
+    time, _, velocity, *_ = stream
+    path = os.path.join(directory, "deployment.csv")
+    pd.DataFrame({'time': time, 'deployment': (velocity > 0).astype(float)}).to_csv(path, index=False)
+    return path
+
+
+def make_controller(name, config, file_path):
+    config.control_algorithm = name
+    if name == "FILE":
+        config.deployment_file_path = file_path
+        config.deployment_file_time_col = 'time'
+        config.deployment_file_deployment_col = 'deployment'
+        config.deployment_file_time_unit = 's'
+    return Control(config)
+
+
+def run_ticks(controller, ticks, sampling_rate, traced=False):
+    """Per-tick durations (ns), net retained blocks and, if traced, bytes allocated at peak"""
+    air_brakes = SimpleNamespace(deployment_level=0.0)
+    durations, blocks, peaks = [], [], []
+    for time, state, sensors in ticks:
+        if traced:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            controller.controller(time, sampling_rate, state, None, None, air_brakes, sensors)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        else:
+            blocks_before = sys.getallocatedblocks()
+            start = perf_counter_ns()
+            controller.controller(time, sampling_rate, state, None, None, air_brakes, sensors)
+            durations.append(perf_counter_ns() - start)
+            blocks.append(sys.getallocatedblocks() - blocks_before)
+    return durations, blocks, peaks
+
+
+def benchmark(name, config, ticks, file_path):
+    """Latency, throughput and allocation statistics of one controller on one stream"""
+    # One untimed pass first, so imports and caches (tables, schedules) are warm
+    run_ticks(make_controller(name, config, file_path), ticks, config.sampling_rate)
+
+    durations, blocks = [], []
+    for _ in range(REPEAT):
+        controller = make_controller(name, config, file_path)
+        pass_durations, pass_blocks, _ = run_ticks(controller, ticks, config.sampling_rate)
+        durations += pass_durations
+        blocks += pass_blocks
+
+    tracemalloc.start()
+    try:
+        controller = make_controller(name, config, file_path)
+        _, _, peaks = run_ticks(controller, ticks, config.sampling_rate, traced=True)
+    finally:
+        tracemalloc.stop()
+
+    durations_us = np.array(durations) / 1e3
+    return {
+        'ticks': len(durations),
+        'p50_us': float(np.percentile(durations_us, 50)),
+        'p99_us': float(np.percentile(durations_us, 99)),
+        'max_us': float(durations_us.max()),
+        'ticks_per_s': float(len(durations_us) / durations_us.sum() * 1e6),
+        'alloc_kib_per_tick': float(np.mean(peaks) / 1024),
+        'blocks_per_tick': float(np.mean(blocks)),
+    }
+
+
+def run_suite(loop_rate_hz):
+    """Results keyed by "CONTROLLER/stream", with the run's metadata"""
+    config = Config()
+    streams = {'synthetic': synthetic_stream(config), 'recorded': recorded_stream(config)}
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for stream_name, stream in streams.items():
+            ticks = build_ticks(config, stream)
+            file_path = deployment_file(stream, directory)
+            for name in list(CONTROLLERS) + ["FILE"]:
+                # Controllers print on construction (FILE); keep the table readable
+                with open(os.devnull, "w") as devnull:
+                    stdout, sys.stdout = sys.stdout, devnull
+                    try:
+                        results[f"{name}/{stream_name}"] = benchmark(name, Config(), ticks, file_path)
+                    finally:
+                        sys.stdout = stdout
+    metadata = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'sampling_rate_hz': config.sampling_rate,
+        'loop_rate_hz': loop_rate_hz,
+        'repeat': REPEAT,
+    }
+    return {'metadata': metadata, 'results': results}
+
+
+def print_results(suite, baseline=None, tolerance=REGRESSION_TOLERANCE):
+    """Table of results against the loop budget and, if given, a baseline; returns the regressions"""
+    budget_us = 1e6 / suite['metadata']['loop_rate_hz']
+    print(f"Control tick cost (budget {budget_us:.0f} us = one {suite['metadata']['loop_rate_hz']} Hz loop)")
+    header = (f"  {'Controller/stream':<24} {'P50 us':>8} {'P99 us':>8} {'Max us':>9} {'Ticks/s':>9}"
+              f" {'KiB/tick':>8} {'Blk/tick':>8}  Budget")
+    if baseline is not None:
+        header += "  vs baseline p50"
+    print(header)
+
+    regressions = []
+    for key, result in suite['results'].items():
+        verdict = "ok" if result['p99_us'] <= budget_us else "OVER"
+        line = (f"  {key:<24} {result['p50_us']:8.1f} {result['p99_us']:8.1f} {result['max_us']:9.1f}"
+                f" {result['ticks_per_s']:9.0f} {result['alloc_kib_per_tick']:8.2f} {result['blocks_per_tick']:8.2f}"
+                f"  {verdict:<6}")
+        if baseline is not None:
+            previous = baseline['results'].get(key)
+            if previous is None:
+                line += "  (new)"
+            else:
+                change = result['p50_us'] / previous['p50_us'] - 1
+                line += f"  {100 * change:+6.1f}%"
+                if change > tolerance:
+                    line += "  REGRESSION"
+                    regressions.append(key)
+        print(line)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--loop-rate", type=float, default=LOOP_RATE_HZ,
+                        help="Flight computer loop rate (Hz); the per-tick budget is one loop")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON to compare or save")
+    parser.add_argument("--save", action="store_true", help="Write this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="Fractional p50 growth reported as a regression")
+    args = parser.parse_args()
+
+    suite = run_suite(args.loop_rate)
+    baseline = None
+    if not args.save and args.baseline.exists():
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        print(f"Comparing with {args.baseline} (python {baseline['metadata']['python']}, "
+              f"numpy {baseline['metadata']['numpy']})")
+    regressions = print_results(suite, baseline, args.tolerance)
+
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(suite, baseline_file, indent=2)
+        print(f"\nSaved baseline to {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} regression(s) over {100 * args.tolerance:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
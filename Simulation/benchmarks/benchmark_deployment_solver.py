@@ -0,0 +1,85 @@
+"""
+Benchmark: per-tick deployment solve in the optimizer controllers
+
+Compares the old scipy path (minimize_scalar on |predict_apogee - target| over
+[0, 1]) against solve_deployment, which inverts predict_apogee in closed form.
+States are spread over the coast phase, from ones that fall short of the target
+with the brakes retracted to ones that overshoot it fully deployed.
+
+Run from the Simulation directory:
+    python benchmarks/benchmark_deployment_solver.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+from scipy.optimize import minimize_scalar
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Config
+from controllers.controller_functions.predict_apogee import predict_apogee
+from controllers.controller_functions.solve_deployment import solve_deployment
+
+config = Config()
+rng = np.random.default_rng(0)
+NUM_STATES = 500
+
+
+def coast_state(altitude_agl, deployment):
+    """(altitude, velocity) from which holding deployment reaches the target apogee exactly"""
+    cd = config.apogee_prediction_cd + deployment * config.airbrake_drag
+    k = 0.5 * config.air_density * cd * np.pi * config.rocket_radius ** 2
+    climb = config.target_apogee - altitude_agl
+    velocity = np.sqrt((np.exp(2 * k * climb / config.burnout_mass) - 1) * config.burnout_mass * 9.81 / k)
+    return float(altitude_agl), float(velocity)
+
+
+# Coast states needing deployments from -0.25 to 1.25, so about a third saturate
+STATES = [coast_state(altitude_agl, deployment) for altitude_agl, deployment
+          in zip(rng.uniform(40.0, config.target_apogee - 1.0, NUM_STATES), rng.uniform(-0.25, 1.25, NUM_STATES))]
+
+
+def scipy_deployment(altitude_agl, velocity):
+    def objective(deployment):
+        deployment = np.clip(deployment, 0.0, 1.0)
+        return abs(predict_apogee(altitude_agl, velocity, deployment, config) - config.target_apogee)
+
+    result = minimize_scalar(objective, bounds=(0.0, 1.0), method='bounded')
+    return float(np.clip(result.x, 0.0, 1.0))
+
+
+def closed_form_deployment(altitude_agl, velocity):
+    return solve_deployment(altitude_agl, velocity, config)
+
+
+def time_per_tick(solver, repeat=5):
+    def solve_all():
+        for altitude_agl, velocity in STATES:
+            solver(altitude_agl, velocity)
+    return min(timeit.repeat(solve_all, number=1, repeat=repeat)) / len(STATES) * 1e6
+
+
+def apogee_miss(solver, states):
+    """Largest |predicted apogee - target| over the given states"""
+    return max(abs(predict_apogee(altitude_agl, velocity, solver(altitude_agl, velocity), config)
+                   - config.target_apogee) for altitude_agl, velocity in states)
+
+
+if __name__ == "__main__":
+    scipy_us = time_per_tick(scipy_deployment)
+    closed_form_us = time_per_tick(closed_form_deployment)
+
+    # States the target is reachable from, i.e. neither solver should saturate
+    reachable = [state for state in STATES if 0.0 < closed_form_deployment(*state) < 1.0]
+    differences = [abs(scipy_deployment(*state) - closed_form_deployment(*state)) for state in STATES]
+    scipy_miss = apogee_miss(scipy_deployment, reachable)
+    closed_form_miss = apogee_miss(closed_form_deployment, reachable)
+
+    print(f"Deployment solve per control tick ({NUM_STATES} coast states, {len(reachable)} reachable)")
+    print(f"  minimize_scalar:  {scipy_us:8.2f} us   max apogee miss {scipy_miss:.2e} m")
+    print(f"  solve_deployment: {closed_form_us:8.2f} us   max apogee miss {closed_form_miss:.2e} m"
+          f"  ({scipy_us / closed_form_us:.1f}x faster)")
+    print(f"  Max deployment difference: {max(differences):.2e}")
+    print("  (minimize_scalar stops within its xatol of the bounds when saturated; solve_deployment returns 0 or 1)")
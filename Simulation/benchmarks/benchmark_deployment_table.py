@@ -0,0 +1,80 @@
+"""
+Benchmark: deployment lookup table (LUT controller) against the exact solver
+
+Prints DeploymentTable.accuracy_report for vertical tables of several sizes
+and the default tilted table, then the per-tick cost of a lookup against
+solve_deployment on coast states. Pass a path to also write the default
+vertical table as a flight computer header.
+
+Run from the Simulation directory:
+    python benchmarks/benchmark_deployment_table.py [header.h]
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Config
+from controllers.controller_functions.deployment_table import (
+    DeploymentTable, TABLE_SHAPE, TILTED_TABLE_SHAPE, TILT_POINTS
+)
+from controllers.controller_functions.solve_deployment import solve_deployment
+
+config = Config()
+rng = np.random.default_rng(0)
+NUM_STATES = 500
+SHAPES = ((64, 64), (128, 128), TABLE_SHAPE, (512, 512))
+
+
+def coast_state(altitude_agl, deployment):
+    """(altitude, velocity) from which holding deployment reaches the target apogee exactly"""
+    cd = config.apogee_prediction_cd + deployment * config.airbrake_drag
+    k = 0.5 * config.air_density * cd * np.pi * config.rocket_radius ** 2
+    climb = config.target_apogee - altitude_agl
+    velocity = np.sqrt((np.exp(2 * k * climb / config.burnout_mass) - 1) * config.burnout_mass * 9.81 / k)
+    return float(altitude_agl), float(velocity)
+
+
+STATES = [coast_state(altitude_agl, deployment) for altitude_agl, deployment
+          in zip(rng.uniform(40.0, config.target_apogee - 1.0, NUM_STATES), rng.uniform(-0.25, 1.25, NUM_STATES))]
+
+
+def time_per_tick(solver, repeat=5):
+    def solve_all():
+        for altitude_agl, velocity in STATES:
+            solver(altitude_agl, velocity)
+    return min(timeit.repeat(solve_all, number=1, repeat=repeat)) / len(STATES) * 1e6
+
+
+def print_report(name, table):
+    report = table.accuracy_report(config)
+    print(f"  {name:<16} {table.deployments.size * 4 / 1024:7.0f} kB"
+          f"  {report['max_deployment_error']:8.4f} {report['p99_deployment_error']:8.4f}"
+          f"  {report['max_apogee_miss_m']:8.3f} {report['p99_apogee_miss_m']:8.3f} {report['mean_apogee_miss_m']:8.4f}")
+
+
+if __name__ == "__main__":
+    print("Lookup accuracy against solve_deployment (20000 states uniform over the grid)")
+    print(f"  {'Table':<16} {'Floats':>10}  {'Max dDep':>8} {'P99 dDep':>8}  {'Max miss':>8} {'P99 miss':>8} {'Mean miss':>8}")
+    for shape in SHAPES:
+        print_report(f"{shape[0]} x {shape[1]}", DeploymentTable.build(config, shape=shape))
+    tilted = DeploymentTable.build(config, shape=TILTED_TABLE_SHAPE, tilt_points=TILT_POINTS)
+    print_report(f"{TILTED_TABLE_SHAPE[0]} x {TILTED_TABLE_SHAPE[1]} x {TILT_POINTS}", tilted)
+    print("  (misses in m over states the brakes can reach the target from; the largest errors are")
+    print("   at the saturation edges near the target, where the deployment jumps within one cell)")
+
+    table = DeploymentTable.build(config)
+    solve_us = time_per_tick(lambda altitude_agl, velocity: solve_deployment(altitude_agl, velocity, config))
+    lookup_us = time_per_tick(table.lookup)
+    tilted_us = time_per_tick(lambda altitude_agl, velocity: tilted.lookup(altitude_agl, velocity, 0.95))
+    print(f"\nPer control tick ({NUM_STATES} coast states)")
+    print(f"  solve_deployment: {solve_us:8.2f} us")
+    print(f"  Table lookup:     {lookup_us:8.2f} us  ({solve_us / lookup_us:.1f}x faster)")
+    print(f"  Tilted lookup:    {tilted_us:8.2f} us")
+
+    if len(sys.argv) > 1:
+        table.write_header(sys.argv[1])
+        print(f"\nWrote {sys.argv[1]}")
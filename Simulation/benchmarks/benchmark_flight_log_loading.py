@@ -0,0 +1,74 @@
+"""
+Benchmark: reading the flight computer's logs in Log Data
+
+Times RealFlightProcessor.load_flight_log (preamble record plus the columns
+run_filter needs, float32) against pandas' C engine reading the whole table,
+the preamble skipped by line count and the summary lines after the data left
+out by nrows, and compares their memory.
+Logs without a data header (older firmware, aborted logs) or with a reboot
+within the data (which the loader stops at) are skipped.
+
+Run from the Simulation directory:
+    python benchmarks/benchmark_flight_log_loading.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "analyze_real_flight"))
+
+from config import Config
+from flight_log import TIME_COLUMN
+from real_flight_processing import RealFlightProcessor
+
+LOG_DIR = Path(__file__).parent.parent.parent / "Log Data"
+REPEAT = 3
+
+
+def layout(log_path):
+    """(lines before the header, data rows), or None without a header or after a reboot"""
+    lines = log_path.read_bytes().splitlines()
+    header = next((i for i, line in enumerate(lines) if line.startswith(TIME_COLUMN.encode())), None)
+    if header is None or any(b'Code compiled on' in line for line in lines[header:]):
+        return None
+    footer = 0
+    while not lines[-1 - footer][:1].isdigit():
+        footer += 1
+    return header, len(lines) - header - 1 - footer
+
+
+def best_ms(function):
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1e3, result
+
+
+def kib(df):
+    return df.memory_usage(deep=True).sum() / 1024
+
+
+if __name__ == "__main__":
+    processor = RealFlightProcessor(Config())
+    logs = [(log, layout(log)) for log in sorted(LOG_DIR.glob("*.CSV"))]
+    logs = [(log, lines) for log, lines in logs if lines is not None]
+    if not logs:
+        sys.exit(f"No flight logs with a data header in {LOG_DIR.resolve()}")
+
+    print(f"Flight log loading (best of {REPEAT}), against pandas read_csv (C engine) of the whole table")
+    print(f"  {'Log':<24} {'Rows':>6}  {'pandas full':>19}  {'load_flight_log':>19}  {'Speedup':>7}")
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for log, (skip_rows, num_rows) in logs:
+        pandas_ms, full = best_ms(lambda: pd.read_csv(log, skiprows=skip_rows, nrows=num_rows, engine='c'))
+        loader_ms, (flight_data, _) = best_ms(lambda: processor.load_flight_log(log))
+        for i, value in enumerate((pandas_ms, kib(full), loader_ms, kib(flight_data))):
+            totals[i] += value
+        print(f"  {log.stem:<24} {len(flight_data):>6}  {pandas_ms:7.1f} ms {kib(full):6.0f} KiB"
+              f"  {loader_ms:7.1f} ms {kib(flight_data):6.0f} KiB  {pandas_ms / loader_ms:6.1f}x")
+    print(f"  {'Total':<24} {'':>6}  {totals[0]:7.1f} ms {totals[1]:6.0f} KiB"
+          f"  {totals[2]:7.1f} ms {totals[3]:6.0f} KiB  {totals[0] / totals[2]:6.1f}x")
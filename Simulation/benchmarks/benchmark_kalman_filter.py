@@ -0,0 +1,129 @@
+"""
+Benchmark: KalmanAltitudeFilter against the matrix form, and its steady-state mode
+
+Feeds the same measurement streams to MatrixKalmanAltitudeFilter (the NumPy
+matrix-product reference) and KalmanAltitudeFilter, and reports the time per
+update and the largest difference of the altitude and velocity estimates.
+The streams are analyze_real_flight/flight4mod.csv at its logged times
+(launch to one second past apogee) and a simulated flight of Monte Carlo
+length at config.sampling_rate (benchmark_controller_ticks.synthetic_stream,
+with barometer-like altitude noise).
+
+The same streams then go through KalmanAltitudeFilter with steady_state=True,
+compared against full updates. The cached gain only takes over once dt, Q
+and R have stayed the same and the covariance has converged; the tick it
+took over at is reported ("never" on the logs, whose dt jitters).
+
+Exits with status 1 if any estimate differs from its reference (the matrix
+form, or full updates for the steady-state mode) by more than TOLERANCE.
+
+Run from the Simulation directory:
+    python benchmarks/benchmark_kalman_filter.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import Config
+from controllers.controller_functions.kalman_filter import KalmanAltitudeFilter, MatrixKalmanAltitudeFilter
+from benchmark_controller_ticks import synthetic_stream
+
+RECORDED_FLIGHT = Path(__file__).parent.parent / "analyze_real_flight" / "flight4mod.csv"
+REPEAT = 50
+# Largest allowed estimate difference from the reference (m, m/s)
+TOLERANCE = 1e-9
+
+
+def recorded_stream(path=RECORDED_FLIGHT):
+    """(time, altitude, acceleration) of a processed flight log, launch to one second past apogee"""
+    log = pd.read_csv(path)
+    log = log[log['state'] >= 2]
+    log_time = log['Time (us)'].to_numpy()
+    altitude = log['Altitude AGL (m)'].to_numpy()
+    keep = log_time <= log_time[np.argmax(altitude)] + 1.0
+    return log_time[keep], altitude[keep], log['IMU Global Acceleration z'].to_numpy()[keep]
+
+
+def simulated_stream(config, seed=0):
+    """(time, altitude, acceleration) of synthetic_stream with altitude noise of config.alt_std"""
+    stream_time, altitude, _, _, acceleration, _ = synthetic_stream(config, seed)
+    altitude = altitude + np.random.default_rng(seed + 1).normal(0.0, config.alt_std, len(stream_time))
+    return stream_time, altitude, acceleration
+
+
+def run(make_filter, config, stream):
+    """Estimates (n x 2) and time per update (s, best of REPEAT) of a fresh filter over stream"""
+    ticks = [tuple(map(float, tick)) for tick in zip(*stream)]
+    best = np.inf
+    for _ in range(REPEAT):
+        kalman = make_filter(config)
+        kalman.initialize(ticks[0][1], config.sampling_rate)
+        update = kalman.update
+        burn_time = config.burn_time
+        start = time.perf_counter()
+        for tick_time, altitude, acceleration in ticks:
+            update(altitude, acceleration, tick_time, burn_time)
+        best = min(best, time.perf_counter() - start)
+
+    # Untimed pass recording every estimate
+    kalman = make_filter(config)
+    kalman.initialize(ticks[0][1], config.sampling_rate)
+    estimates = np.array([kalman.update(altitude, acceleration, tick_time, config.burn_time)
+                          for tick_time, altitude, acceleration in ticks])
+    return estimates, best / len(ticks)
+
+
+def steady_state_tick(config, stream):
+    """Tick after which a steady_state filter used the cached gain, or None"""
+    kalman = KalmanAltitudeFilter(config, steady_state=True)
+    kalman.initialize(float(stream[1][0]), config.sampling_rate)
+    for i, (tick_time, altitude, acceleration) in enumerate(zip(*stream)):
+        kalman.update(float(altitude), float(acceleration), float(tick_time), config.burn_time)
+        if kalman._steady_settings is not None:
+            return i
+    return None
+
+
+if __name__ == "__main__":
+    config = Config()
+    streams = (
+        (RECORDED_FLIGHT.stem, recorded_stream()),
+        ("simulated flight", simulated_stream(config)),
+    )
+
+    print(f"Kalman filter per update (best of {REPEAT})")
+    print(f"  {'Stream':<18} {'Ticks':>5}  {'Matrix':>9}  {'Scalar':>9}  {'Speedup':>7}  "
+          f"{'Max dy (m)':>10}  {'Max dv (m/s)':>12}")
+    failed = False
+    full_updates = {}
+    for stream_name, stream in streams:
+        reference, matrix_time = run(MatrixKalmanAltitudeFilter, config, stream)
+        estimates, scalar_time = run(lambda config: KalmanAltitudeFilter(config, steady_state=False), config, stream)
+        full_updates[stream_name] = estimates, scalar_time
+        dy, dv = np.max(np.abs(estimates - reference), axis=0)
+        failed |= max(dy, dv) > TOLERANCE
+        print(f"  {stream_name:<18} {len(stream[0]):>5}  {matrix_time * 1e6:6.2f} us  {scalar_time * 1e6:6.2f} us  "
+              f"{matrix_time / scalar_time:6.1f}x  {dy:10.1e}  {dv:12.1e}")
+
+    print(f"\nSteady-state mode against full updates (best of {REPEAT})")
+    print(f"  {'Stream':<18} {'Ticks':>5}  {'Full':>9}  {'Steady':>9}  {'Speedup':>7}  "
+          f"{'Max dy (m)':>10}  {'Max dv (m/s)':>12}  {'Cached gain from':>16}")
+    for stream_name, stream in streams:
+        reference, full_time = full_updates[stream_name]
+        estimates, steady_time = run(lambda config: KalmanAltitudeFilter(config, steady_state=True), config, stream)
+        dy, dv = np.max(np.abs(estimates - reference), axis=0)
+        failed |= max(dy, dv) > TOLERANCE
+        tick = steady_state_tick(config, stream)
+        print(f"  {stream_name:<18} {len(stream[0]):>5}  {full_time * 1e6:6.2f} us  {steady_time * 1e6:6.2f} us  "
+              f"{full_time / steady_time:6.1f}x  {dy:10.1e}  {dv:12.1e}  "
+              f"{'never' if tick is None else f'tick {tick}':>16}")
+
+    print(f"All estimates within {TOLERANCE:g} of the reference" if not failed
+          else f"Estimates differ from the reference by more than {TOLERANCE:g}")
+    sys.exit(1 if failed else 0)
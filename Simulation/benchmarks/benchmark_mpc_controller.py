@@ -0,0 +1,81 @@
+"""
+Benchmark: per-tick cost of the MPC controller against its latency budget
+
+Times ControllerMPC.compute_control (one batched rollout of every candidate
+profile plus the cost argmin) on coast states, for the configured horizon
+and level count and a few alternatives, and checks the p99 against
+controller_mpc.TICK_BUDGET_US. The solve_deployment tick is shown for scale.
+
+Run from the Simulation directory:
+    python benchmarks/benchmark_mpc_controller.py
+"""
+import sys
+from pathlib import Path
+from time import perf_counter_ns
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Config
+from controllers.controller_mpc import ControllerMPC, TICK_BUDGET_US
+from controllers.controller_functions.solve_deployment import solve_deployment
+
+config = Config()
+rng = np.random.default_rng(0)
+NUM_STATES = 300
+REPEAT = 5
+# (horizon s, levels) to time; the first is the config default
+SETTINGS = ((config.mpc_horizon, config.mpc_levels), (0.5, 21), (2.0, 21), (1.0, 11), (1.0, 41))
+
+
+def coast_state(altitude_agl, deployment):
+    """(altitude, velocity) from which holding deployment reaches the target apogee exactly"""
+    cd = config.apogee_prediction_cd + deployment * config.airbrake_drag
+    k = 0.5 * config.air_density * cd * np.pi * config.rocket_radius ** 2
+    climb = config.target_apogee - altitude_agl
+    velocity = np.sqrt((np.exp(2 * k * climb / config.burnout_mass) - 1) * config.burnout_mass * 9.81 / k)
+    return float(altitude_agl), float(velocity)
+
+
+STATES = [coast_state(altitude_agl, deployment) for altitude_agl, deployment
+          in zip(rng.uniform(40.0, config.target_apogee - 1.0, NUM_STATES), rng.uniform(-0.25, 1.25, NUM_STATES))]
+LAST_DEPLOYMENTS = rng.uniform(0.0, 1.0, NUM_STATES).tolist()
+
+
+def tick_times_us(compute):
+    """Per-call times (us) of compute(altitude, velocity, last_deployment) over every state, REPEAT times"""
+    times = []
+    for _ in range(REPEAT):
+        for (altitude_agl, velocity), last_deployment in zip(STATES, LAST_DEPLOYMENTS):
+            start = perf_counter_ns()
+            compute(altitude_agl, velocity, last_deployment)
+            times.append(perf_counter_ns() - start)
+    return np.array(times) / 1e3
+
+
+def mpc_compute(horizon, levels):
+    config.mpc_horizon, config.mpc_levels = horizon, levels
+    controller = ControllerMPC(config)
+
+    def compute(altitude_agl, velocity, last_deployment):
+        controller.last_deployment = last_deployment
+        return controller.compute_control(altitude_agl, velocity, 0.0, 0.0, 0.0, 0.0, 0.0, 1 / config.sampling_rate)
+    return compute, len(controller.rollout), controller.rollout.horizon_steps
+
+
+if __name__ == "__main__":
+    print(f"MPC tick latency ({NUM_STATES} coast states x {REPEAT}, budget {TICK_BUDGET_US} us)")
+    print(f"  {'Horizon':>7} {'Levels':>6} {'Profiles':>8} {'Steps':>5}  {'P50 us':>8} {'P99 us':>8}  Budget")
+    defaults = SETTINGS[0]
+    for horizon, levels in SETTINGS:
+        compute, profiles, steps = mpc_compute(horizon, levels)
+        times = tick_times_us(compute)
+        p50, p99 = np.percentile(times, [50, 99])
+        verdict = "ok" if p99 <= TICK_BUDGET_US else "OVER"
+        marker = "  (config)" if (horizon, levels) == defaults else ""
+        print(f"  {horizon:>7.1f} {levels:>6} {profiles:>8} {steps:>5}  {p50:8.1f} {p99:8.1f}  {verdict}{marker}")
+    config.mpc_horizon, config.mpc_levels = defaults
+
+    times = tick_times_us(lambda altitude_agl, velocity, _: solve_deployment(altitude_agl, velocity, config))
+    print(f"\n  solve_deployment for scale: p50 {np.percentile(times, 50):.1f} us, p99 {np.percentile(times, 99):.1f} us")
@@ -0,0 +1,64 @@
+"""
+Benchmark: predict_apogee over a grid of coast states
+
+Times a Python loop of scalar predict_apogee calls against one
+predict_apogee_array call on a 1000 x 1000 (altitude, velocity) grid at a
+spread of deployments, and checks they agree, including the edge cases
+(velocity <= 0, negative deployments driving k <= 0).
+
+The loop runs on a strided subset of the grid; its per-point cost is the same.
+
+Run from the Simulation directory:
+    python benchmarks/benchmark_predict_apogee.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Config
+from controllers.controller_functions.predict_apogee import predict_apogee, predict_apogee_array
+
+GRID_SIZE = 1000
+LOOP_STRIDE = 50
+
+config = Config()
+
+
+def coast_grid():
+    altitudes = np.linspace(0.0, 300.0, GRID_SIZE)
+    velocities = np.linspace(-10.0, 120.0, GRID_SIZE)
+    altitude_grid, velocity_grid = np.meshgrid(altitudes, velocities, indexing='ij')
+    # Deployments vary along the altitude axis, past both ends of [0, 1]
+    deployment_grid = np.broadcast_to(np.linspace(-1.5, 1.5, GRID_SIZE)[:, None], altitude_grid.shape)
+    return altitude_grid.ravel(), velocity_grid.ravel(), deployment_grid.ravel()
+
+
+if __name__ == "__main__":
+    altitudes, velocities, deployments = coast_grid()
+    num_points = altitudes.size
+
+    start = time.perf_counter()
+    vectorized = predict_apogee_array(altitudes, velocities, deployments, config)
+    vectorized_s = time.perf_counter() - start
+
+    subset = slice(None, None, LOOP_STRIDE)
+    loop_points = list(zip(altitudes[subset].tolist(), velocities[subset].tolist(), deployments[subset].tolist()))
+    start = time.perf_counter()
+    looped = np.array([predict_apogee(a, v, d, config) for a, v, d in loop_points])
+    loop_s = time.perf_counter() - start
+
+    no_brake = predict_apogee_array(altitudes[subset], velocities[subset], 0.0, config, combined_cd=False)
+    looped_no_brake = np.array([predict_apogee(a, v, 0.0, config, combined_cd=False) for a, v, _ in loop_points])
+
+    loop_ns = loop_s / len(loop_points) * 1e9
+    vectorized_ns = vectorized_s / num_points * 1e9
+    print(f"predict_apogee on a {GRID_SIZE} x {GRID_SIZE} grid ({num_points:,} points)")
+    print(f"  scalar loop:          {loop_ns:8.1f} ns/point  ({loop_ns * num_points / 1e9:.2f} s for the grid)")
+    print(f"  predict_apogee_array: {vectorized_ns:8.1f} ns/point  ({vectorized_s:.3f} s, "
+          f"{loop_ns / vectorized_ns:.0f}x faster)")
+    print(f"  Max difference with brakes: {np.max(np.abs(vectorized[subset] - looped)):.2e} m")
+    print(f"  Max difference no brakes:   {np.max(np.abs(no_brake - looped_no_brake)):.2e} m")
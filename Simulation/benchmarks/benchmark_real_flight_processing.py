@@ -0,0 +1,140 @@
+"""
+Benchmark: RealFlightProcessor.run_filter over the recorded flight logs
+
+Times run_filter on each log in analyze_real_flight with the filter settings
+of example_usage.py, for the plain filter, with deployment filter windows
+(velocity-scaled altitude variance), with deployment rate limiting and with
+the thrust curve added. The printed diagnostics are discarded.
+
+Also times ThrustCurveInterpolator: constructing one (first parse of the
+.eng file and cached) and get_acceleration over the burn window of a log,
+one scalar call per row against one array call.
+
+Run from the Simulation directory:
+    python benchmarks/benchmark_real_flight_processing.py
+"""
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "analyze_real_flight"))
+
+from config import Config
+from real_flight_processing import RealFlightProcessor, ThrustCurveInterpolator, _thrust_curve_cache
+
+LOG_DIR = Path(__file__).parent.parent / "analyze_real_flight"
+LOGS = sorted(LOG_DIR.glob("*Flight *.CSV"))
+REPEAT = 5
+
+DEPLOYMENT_FILTER = dict(
+    deployment_model_y_std=0.25,
+    deployment_model_v_std=0.0125,
+    deployment_model_a_std=0.00065,
+    deployment_alt_std=0.26,
+    deployment_accel_std=0.05,
+    deployment_filter_ranges=[(1.5, 8)],
+    deployment_alt_std_velocity_scale=1,
+)
+SCENARIOS = (
+    ("filter", {}),
+    ("+ deployment windows", DEPLOYMENT_FILTER),
+    ("+ rate limiting", dict(DEPLOYMENT_FILTER, rate_limit_deployment=2.5)),
+    ("+ thrust curve", dict(DEPLOYMENT_FILTER, rate_limit_deployment=2.5, thrust_curve_interpolator=True)),
+)
+
+
+def example_config():
+    """Config with example_usage.py's filter parameters"""
+    config = Config()
+    config.alt_std = 0.26
+    config.accel_std = 0.05
+    config.model_y_std = 0.00025
+    config.model_v_std = 0.00125
+    config.model_a_std = 0.0065
+    return config
+
+
+def thrust_curve_interpolator(config):
+    """example_usage.py's ThrustCurveInterpolator (motor info printout discarded)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ThrustCurveInterpolator(
+            str(Path(__file__).parent.parent / config.engine_file),
+            config.burnout_mass + 0.027,
+            rocket_diameter=config.rocket_radius * 2,
+            drag_coefficient=config.apogee_prediction_cd
+        )
+
+
+def best_us(function, repeat=REPEAT):
+    """Best of repeat times of function() (us)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1e6
+
+
+def run_filter_ms(processor, flight_data, options):
+    """Best of REPEAT run_filter times (ms)"""
+    if options.get('thrust_curve_interpolator'):
+        options = dict(options, thrust_curve_interpolator=thrust_curve_interpolator(processor.config))
+    times = []
+    for _ in range(REPEAT):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            processor.run_filter(flight_data, handle_saturation=True, **options)
+            times.append(time.perf_counter() - start)
+    return min(times) * 1e3
+
+
+if __name__ == "__main__":
+    processor = RealFlightProcessor(example_config(), accel_saturation_threshold=2.95)
+    flights = [(log.stem, processor.load_flight_data(
+        log,
+        time_col='Time (us)',
+        altitude_col='Altitude AGL (m)',
+        accel_col='IMU Global Acceleration z',
+        accel_x_col='IMU Global Acceleration x',
+        accel_y_col='IMU Global Acceleration y',
+        state_col='Mode',
+        time_unit='us'
+    )) for log in LOGS]
+
+    print(f"run_filter per flight log (best of {REPEAT})")
+    print(f"  {'Log':<22} {'Rows':>5}  " + "  ".join(f"{name:>25}" for name, _ in SCENARIOS))
+    for name, flight_data in flights:
+        row = [run_filter_ms(processor, flight_data, options) for _, options in SCENARIOS]
+        print(f"  {name:<22} {len(flight_data):>5}  " + "  ".join(
+            f"{ms:8.1f} ms {ms * 1e3 / len(flight_data):6.2f} us/row" for ms in row))
+
+    config = processor.config
+    _thrust_curve_cache.clear()
+    first_us = best_us(lambda: thrust_curve_interpolator(config), repeat=1)
+    cached_us = best_us(lambda: thrust_curve_interpolator(config))
+    print(f"\nThrustCurveInterpolator construction: {first_us:.0f} us first parse, {cached_us:.0f} us cached")
+
+    # Burn window of the first log: state 2 from ignition to burnout, with the
+    # recorded estimates standing in for the filter's
+    interpolator = thrust_curve_interpolator(config)
+    log_name, flight_data = flights[0]
+    powered = flight_data[flight_data['state'] == 2]
+    thrust_times = (powered['time'] - powered['time'].iloc[0]).to_numpy()
+    in_burn = thrust_times <= interpolator.burn_time
+    thrust_times = thrust_times[in_burn]
+    velocities = powered['State Estimation v'].to_numpy()[in_burn]
+    altitudes = powered['State Estimation y'].to_numpy()[in_burn]
+    rows = list(zip(thrust_times.tolist(), velocities.tolist(), altitudes.tolist()))
+
+    loop_us = best_us(lambda: [interpolator.get_acceleration(t, v, y) for t, v, y in rows])
+    array_us = best_us(lambda: interpolator.get_acceleration(thrust_times, velocities, altitudes))
+    looped = np.array([interpolator.get_acceleration(t, v, y) for t, v, y in rows])
+    max_difference = np.max(np.abs(looped - interpolator.get_acceleration(thrust_times, velocities, altitudes)))
+    print(f"get_acceleration over the burn window of {log_name} ({len(rows)} rows)")
+    print(f"  scalar calls: {loop_us:8.1f} us  ({loop_us / len(rows):.2f} us/row)")
+    print(f"  array call:   {array_us:8.1f} us  ({loop_us / array_us:.0f}x, max difference {max_difference:.1e} m/s²)")
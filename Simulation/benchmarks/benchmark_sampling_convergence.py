@@ -0,0 +1,78 @@
+"""
+Benchmark: convergence of Monte Carlo apogee statistics by sampler
+
+Runs the same configuration with pseudo-random, Sobol and Latin hypercube
+inputs, each repeated from several seeds. The spread of the mean and std of
+apogee across repetitions is the error of each estimate at that sample count;
+(random spread / quasi-random spread)^2 is roughly how many times more
+pseudo-random flights give the same precision.
+
+Random and Sobol estimates at smaller sample counts are prefixes of the largest
+run. LHS designs are built for one sample count, so each count is its own run.
+
+Run from the Simulation directory:
+    python benchmarks/benchmark_sampling_convergence.py
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Config
+from monte_carlo import run_monte_carlo
+
+SAMPLE_COUNTS = [4, 8, 16, 32]
+REPETITIONS = 4
+WORKERS = 1
+
+
+def apogee_statistics(apogees):
+    return np.mean(apogees), np.std(apogees, ddof=1)
+
+
+def run_sampler(config, sampler, seed, num_simulations, base_dir):
+    run_dir = Path(base_dir) / f"{sampler}_{seed}_{num_simulations}"
+    monte_carlo, wall_time = run_monte_carlo(config, num_simulations, workers=WORKERS, seed=seed,
+                                             run_dir=run_dir, sampler=sampler)
+    return np.asarray(monte_carlo.results['apogee']), wall_time
+
+
+if __name__ == "__main__":
+    config = Config()
+    seeds = range(1, REPETITIONS + 1)
+
+    # statistics[sampler][n] = list of (mean, std), one per seed
+    statistics = {sampler: {n: [] for n in SAMPLE_COUNTS} for sampler in ("random", "sobol", "lhs")}
+    wall_times = {sampler: 0.0 for sampler in statistics}
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        for seed in seeds:
+            for sampler in ("random", "sobol"):
+                apogees, wall_time = run_sampler(config, sampler, seed, max(SAMPLE_COUNTS), base_dir)
+                wall_times[sampler] += wall_time
+                for n in SAMPLE_COUNTS:
+                    statistics[sampler][n].append(apogee_statistics(apogees[:n]))
+            for n in SAMPLE_COUNTS:
+                apogees, wall_time = run_sampler(config, "lhs", seed, n, base_dir)
+                wall_times["lhs"] += wall_time
+                statistics["lhs"][n].append(apogee_statistics(apogees))
+
+    print(f"\nSpread of apogee estimates over {REPETITIONS} seeds")
+    print(f"{'Samples':>8} {'Sampler':>8} {'Mean':>10} {'SD(mean)':>10} {'Std':>8} {'SD(std)':>9} {'Flights saved':>14}")
+    for n in SAMPLE_COUNTS:
+        random_spread = np.std([mean for mean, _ in statistics["random"][n]], ddof=1)
+        for sampler, per_n in statistics.items():
+            means = np.array([mean for mean, _ in per_n[n]])
+            stds = np.array([std for _, std in per_n[n]])
+            mean_spread = np.std(means, ddof=1)
+            saving = (random_spread / mean_spread) ** 2 if mean_spread > 0 else np.inf
+            print(f"{n:>8} {sampler:>8} {np.mean(means):>10.2f} {mean_spread:>10.3f} "
+                  f"{np.mean(stds):>8.2f} {np.std(stds, ddof=1):>9.3f} {saving:>13.1f}x")
+
+    print("\nTotal wall time")
+    for sampler, wall_time in wall_times.items():
+        print(f"  {sampler:>8}: {wall_time:8.1f} s")
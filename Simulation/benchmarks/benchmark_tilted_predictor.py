@@ -0,0 +1,112 @@
+"""
+Benchmark: drag-curve and tilt-aware apogee predictor against predict_apogee
+
+Accuracy: apogees of both predictors against a reference coast, a 2D point
+mass integrated with solve_ivp, with Cd of the input drag curves at the
+current Mach (the airbrake curve through the same RocketPy Function as the
+simulated air brakes) and the gravity turn. States are spread over the
+coast with tilts from vertical of 0 to 30 degrees and held deployments of 0
+to 1. predict_apogee uses config's constant Cds and no tilt.
+
+Cost: per-call time of predict_apogee and of predict_apogee_tilted with the
+tilt from the state quaternion.
+
+Run from the Simulation directory:
+    python benchmarks/benchmark_tilted_predictor.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Config
+from controllers.controller_functions.drag_table import (
+    load_drag_table, cos_pitch_from_quaternion, speed_of_sound
+)
+from controllers.controller_functions.predict_apogee import predict_apogee, predict_apogee_tilted
+from simulation_functions.airbrake_drag_curve import load_airbrake_drag_curve, create_drag_coefficient_function
+
+config = Config()
+rng = np.random.default_rng(0)
+NUM_STATES = 200
+TILT_BANDS = ((0, 5), (5, 15), (15, 30))
+
+rocket_curve = np.loadtxt(config.rocket_drag_curve_file, delimiter=',', skiprows=1, ndmin=2)
+airbrake_cd = create_drag_coefficient_function(load_airbrake_drag_curve(config.airbrake_drag_curve_file))
+sound_speed = speed_of_sound(config.env_elevation)
+area = np.pi * config.rocket_radius ** 2
+
+
+def reference_apogee(altitude_agl, velocity, deployment, tilt):
+    """Apogee of a point mass launched along the rocket axis, tilted from vertical by tilt (rad)"""
+    def coast(t, state):
+        _, vx, vy = state
+        speed = np.hypot(vx, vy)
+        mach = speed / sound_speed
+        cd = np.interp(mach, rocket_curve[:, 0], rocket_curve[:, 1]) + airbrake_cd.get_value_opt(deployment, mach)
+        drag = 0.5 * config.air_density * cd * area * speed / config.burnout_mass
+        return [vy, -drag * vx, -9.81 - drag * vy]
+
+    def apogee(t, state):
+        return state[2]
+    apogee.terminal, apogee.direction = True, -1
+
+    speed = velocity / np.cos(tilt)
+    solution = solve_ivp(coast, (0.0, 60.0), [altitude_agl, speed * np.sin(tilt), velocity],
+                         events=apogee, rtol=1e-10, atol=1e-10)
+    return float(solution.y_events[0][0][0])
+
+
+def quaternion(tilt):
+    """Unit quaternion tilting the rocket axis from vertical by tilt (rad) about x"""
+    return np.cos(tilt / 2), np.sin(tilt / 2), 0.0, 0.0
+
+
+def sample_states(tilt_range):
+    altitudes = rng.uniform(20.0, 180.0, NUM_STATES)
+    velocities = rng.uniform(15.0, 70.0, NUM_STATES)
+    deployments = rng.uniform(0.0, 1.0, NUM_STATES)
+    tilts = np.radians(rng.uniform(*tilt_range, NUM_STATES))
+    return list(zip(altitudes.tolist(), velocities.tolist(), deployments.tolist(), tilts.tolist()))
+
+
+def time_per_call(function, states, repeat=5):
+    def call_all():
+        for state in states:
+            function(*state)
+    return min(timeit.repeat(call_all, number=1, repeat=repeat)) / len(states) * 1e6
+
+
+if __name__ == "__main__":
+    drag_table = load_drag_table(config)
+
+    def constant_cd(altitude_agl, velocity, deployment, e0, e1, e2, e3):
+        return predict_apogee(altitude_agl, velocity, deployment, config)
+
+    def tilted(altitude_agl, velocity, deployment, e0, e1, e2, e3):
+        return predict_apogee_tilted(altitude_agl, velocity, deployment, config,
+                                     cos_pitch_from_quaternion(e0, e1, e2, e3), drag_table)
+
+    print(f"Apogee error against the reference coast ({NUM_STATES} states per tilt band, m)")
+    print(f"  {'Tilt deg':>9}  {'predict_apogee':>20}  {'predict_apogee_tilted':>22}")
+    print(f"  {'':>9}  {'mean |err|':>10} {'max |err|':>9}  {'mean |err|':>11} {'max |err|':>10}")
+    timing_states = []
+    for tilt_range in TILT_BANDS:
+        states = sample_states(tilt_range)
+        calls = [(a, v, d) + quaternion(tilt) for a, v, d, tilt in states]
+        timing_states += calls
+        reference = np.array([reference_apogee(*state) for state in states])
+        constant_error = np.abs([constant_cd(*call) for call in calls] - reference)
+        tilted_error = np.abs([tilted(*call) for call in calls] - reference)
+        print(f"  {tilt_range[0]:>4}-{tilt_range[1]:<4}  {constant_error.mean():10.3f} {constant_error.max():9.3f}"
+              f"  {tilted_error.mean():11.3f} {tilted_error.max():10.3f}")
+
+    constant_us = time_per_call(constant_cd, timing_states)
+    tilted_us = time_per_call(tilted, timing_states)
+    print(f"\nPer call ({len(timing_states)} states)")
+    print(f"  predict_apogee:        {constant_us:6.2f} us")
+    print(f"  predict_apogee_tilted: {tilted_us:6.2f} us  (incl. tilt from the quaternion, {tilted_us / constant_us:.1f}x)")
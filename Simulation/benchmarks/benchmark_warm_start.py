@@ -0,0 +1,88 @@
+"""
+Benchmark: warm-started Monte Carlo flights against full flights
+
+Flies the same samples (same seed and index) of several controllers twice:
+in full, and as a coast from the sample's burnout state. The burnout state
+goes through an on-disk BurnoutCache, flown on the first request and read
+back on the second, so the warm flight below is the one a cached batch runs.
+
+Every exported output and the deployment time series must agree within
+TOLERANCE; the script exits with status 1 if any sample does not. It also
+times both paths.
+
+Run from the Simulation directory:
+    python benchmarks/benchmark_warm_start.py
+"""
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Config
+from simulation_functions.burnout_cache import BurnoutCache
+from simulation_functions.monte_carlo_runner import run_sample
+from simulation_functions.setup_stochastic import setup_stochastic_models
+
+CONTROLLERS = ["BANGBANG", "PID", "OPTIMIZERPID"]
+NUM_SAMPLES = 8
+SEED = 0
+# Largest allowed difference of any output (m, s, m/s or deployment 0-1)
+TOLERANCE = 1e-6
+
+
+def max_difference(full, warm):
+    """Largest difference between the outputs of two samples, and the output it is in"""
+    worst = (0.0, "-")
+    for key, value in full.items():
+        if key == 'deployment_timeseries':
+            if len(value['time']) != len(warm[key]['time']):
+                return np.inf, f"{key} ({len(value['time'])} vs {len(warm[key]['time'])} ticks)"
+            for field in ('time', 'deployment'):
+                difference = np.max(np.abs(np.asarray(value[field]) - np.asarray(warm[key][field])), initial=0.0)
+                worst = max(worst, (difference, f"{key} {field}"), key=lambda item: item[0])
+        else:
+            worst = max(worst, (abs(float(value) - float(warm[key])), key), key=lambda item: item[0])
+    return worst
+
+
+if __name__ == "__main__":
+    # Negative static margin warnings from the sampled centers of mass
+    warnings.filterwarnings("ignore")
+
+    print(f"Warm start against full flights ({NUM_SAMPLES} samples, seed {SEED}, tolerance {TOLERANCE:g})")
+    print(f"  {'Controller':<14} {'Max difference':>15}  {'In':<36} {'Full':>9} {'Warm':>9} {'Speedup':>7}")
+    failed = False
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for controller in CONTROLLERS:
+            config = Config()
+            config.control_algorithm = controller
+            models = setup_stochastic_models(config)
+            cache = BurnoutCache(cache_dir)
+
+            worst, full_time, warm_time = (0.0, "-"), 0.0, 0.0
+            for sample_index in range(NUM_SAMPLES):
+                start = time.perf_counter()
+                _, full = run_sample(models, SEED, sample_index)
+                full_time += time.perf_counter() - start
+
+                # First request flies and caches the burn; the timed one reads it back
+                run_sample(models, SEED, sample_index, burnout_cache=BurnoutCache(cache_dir))
+                start = time.perf_counter()
+                _, warm = run_sample(models, SEED, sample_index, burnout_cache=cache)
+                warm_time += time.perf_counter() - start
+
+                difference, output = max_difference(full, warm)
+                if difference > worst[0]:
+                    worst = (difference, f"{output} (sample {sample_index})")
+
+            failed |= worst[0] > TOLERANCE
+            print(f"  {controller:<14} {worst[0]:>15.3g}  {worst[1]:<36} {full_time / NUM_SAMPLES * 1e3:6.0f} ms "
+                  f"{warm_time / NUM_SAMPLES * 1e3:6.0f} ms {full_time / warm_time:6.1f}x")
+
+    print("All outputs within tolerance" if not failed else "Warm-started flights differ from full flights")
+    sys.exit(1 if failed else 0)
@@ -110,11 +110,21 @@ class Config:
     model_y_std = _get_csv_value("Kalman Model Y STD", 0.05)
     model_v_std = _get_csv_value("Kalman Model V STD", 0.1)
     model_a_std = _get_csv_value("Kalman Model A STD", 0.015)
+    kalman_steady_state = False  # Use the cached steady-state gain while dt, Q and R are unchanged
 
     use_airbrake = _get_csv_value("Airbrakes Enabled (T/F)", True, bool)
 
     # Control algorithm selection
-    control_algorithm = "OPTIMIZERPID" # BANGBANG, PID, OPTIMIZER, OPTIMIZERPID, FILE
+    control_algorithm = "OPTIMIZERPID" # BANGBANG, PID, OPTIMIZER, OPTIMIZERPID, LUT, MPC, FILE
+
+    # Lookup-table controller parameters (only used if control_algorithm = "LUT")
+    lut_file = None # .npz from DeploymentTable.save; None builds the table from this config
+    lut_tilt = False # Add a cos(tilt) axis to the built table and look up with the rocket's tilt
+
+    # Model-predictive controller parameters (only used if control_algorithm = "MPC")
+    mpc_horizon = 1.0 # Seconds of rate-limited deployment moves rolled out per tick
+    mpc_levels = 21 # Deployment levels per profile segment (mpc_levels^2 candidate profiles)
+    mpc_actuation_weight = 0.5 # Cost of one full stroke of deployment travel, in m^2 of apogee error
 
     # File-based controller parameters (only used if control_algorithm = "FILE")
     deployment_file_path = "output/real_flight_results_with_thrust.csv"
@@ -122,6 +132,8 @@ class Config:
     deployment_file_deployment_col = None
     deployment_file_time_unit = None
     state_estimation = "KALMAN" # KALMAN, ALTIMETER, ACCELEROMETER
+    profile_control_tick = False # Time each stage of the control tick (see StageTimer)
+    tilted_apogee_prediction = False # Predict apogee from the drag curve files and the rocket's tilt (predict_apogee_tilted)
 
     # Control parameters
     kp = 0.24 # Set up for CD PID. For apogee PID: _get_csv_value("KP (1/s)", 0.24)
@@ -3,8 +3,20 @@ from controllers.controller_pid import ControllerPID
 from controllers.controller_bangbang import ControllerBangBang
 from controllers.controller_optimizer import ControllerOptimizer
 from controllers.controller_optimizer_pid import ControllerOptimizerPID
+from controllers.controller_lut import ControllerLUT
+from controllers.controller_mpc import ControllerMPC
 from controllers.controller_file import ControllerFile
 
+# Controllers selectable through config.control_algorithm ("FILE" is handled separately)
+CONTROLLERS = {
+    "PID": ControllerPID,
+    "BANGBANG": ControllerBangBang,
+    "OPTIMIZER": ControllerOptimizer,
+    "OPTIMIZERPID": ControllerOptimizerPID,
+    "LUT": ControllerLUT,
+    "MPC": ControllerMPC,
+}
+
 
 def Control(config: Config, deployment_file: str = None):
     """
@@ -42,16 +54,9 @@ def Control(config: Config, deployment_file: str = None):
     # Otherwise use algorithm from config
     algorithm = config.control_algorithm.upper()
 
-    if algorithm == "PID":
-        return ControllerPID(config)
-    elif algorithm == "BANGBANG":
-        return ControllerBangBang(config)
-    elif algorithm == "OPTIMIZER":
-        return ControllerOptimizer(config)
-    elif algorithm == "OPTIMIZERPID":
-        return ControllerOptimizerPID(config)
-    else:
+    if algorithm not in CONTROLLERS:
         raise ValueError(
             f"Unknown control algorithm: '{config.control_algorithm}'. "
-            f"Available options: 'PID', 'BANGBANG', 'OPTIMIZER', 'OPTIMIZERPID', 'FILE'"
-        )
\ No newline at end of file
+            f"Available options: {', '.join(repr(name) for name in CONTROLLERS)}, 'FILE'"
+        )
+    return CONTROLLERS[algorithm](config)
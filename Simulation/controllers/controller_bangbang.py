@@ -6,6 +6,8 @@ from config import Config
 
 class ControllerBangBang(ControllerBase):
 
+    __slots__ = ()
+
     def __init__(self, config: Config):
         super().__init__(config)
 
@@ -3,8 +3,13 @@ from abc import ABC, abstractmethod
 
 from .controller_functions.kalman_filter import KalmanAltitudeFilter
 from config import Config
-from .controller_functions.predict_apogee import predict_apogee
+from .controller_functions.predict_apogee import predict_apogee, predict_apogee_tilted
+from .controller_functions.drag_table import load_drag_table, cos_pitch_from_quaternion
 from .controller_functions.convert_p_2_alt import find_altitude
+from .controller_functions.telemetry import TelemetryRecorder
+from .controller_functions.stage_timer import (
+    StageTimer, SENSORS, KALMAN, PREDICT_APOGEE, COMPUTE_CONTROL, ACTUATION, TELEMETRY
+)
 
 
 def quaternion_to_rotation_matrix(e0, e1, e2, e3):
@@ -29,6 +34,14 @@ def correct_accelerometer_orientation(accel_body, e0, e1, e2, e3):
 
 class ControllerBase(ABC):
 
+    # Slotted so the controllers Monte Carlo creates per flight carry no
+    # per-instance __dict__; subclasses declare their own additions
+    __slots__ = (
+        'config', 'last_deployment', 'last_time', 'last_velocity', 'calculated_v', 'calculated_agl',
+        'last_measurement_agl', 'last_calculated_velocity', 'filter_init', 'control_active',
+        'kalman_filter', 'data', 'p_0', 'profiler', 'drag_table',
+    )
+
     def __init__(self, config: Config):
         self.config = config
 
@@ -43,16 +56,21 @@ class ControllerBase(ABC):
         self.control_active = False
         self.kalman_filter = KalmanAltitudeFilter(self.config)
 
-        # Data storage
-        self.data = {
-            'time': [], 'sim_altitude_agl': [], 'raw_altitude_agl': [], 'filtered_altitude_agl': [],
-            'sim_velocity': [], 'filtered_velocity': [], 'deployment': [], 'desired_deployment': [],
-            'predicted_apogee': [], 'predicted_apogee_no_brake': [],'control_active': [],
-            'filtered_acceleration': [], 'error': [], 'raw_acceleration': [], 'sim_acceleration': []
-        }
+        # Data storage (one column per TELEMETRY_COLUMNS entry)
+        self.data = TelemetryRecorder()
 
         self.p_0 = 0
 
+        # Per-stage tick timing, only when asked for
+        self.profiler = StageTimer() if config.profile_control_tick else None
+
+        # Drag curve Cd table, only for the tilted apogee predictor
+        self.drag_table = load_drag_table(config) if config.tilted_apogee_prediction else None
+
+    def set_telemetry_level(self, level):
+        """Start a fresh log at level "full" (every tick) or "summary" (see TelemetryRecorder)"""
+        self.data = TelemetryRecorder(level=level)
+
     @abstractmethod
     def compute_control(self, filtered_altitude, filtered_velocity, filtered_acceleration,
                        predicted_apogee_w_brake, predicted_apogee_no_brake,
@@ -89,6 +107,9 @@ class ControllerBase(ABC):
 
         # Only update state if this is a new timestep (to handle multiple calls per timestep)
         if time - self.last_time >= 1.0 / sampling_rate * 0.5:  # More than half a sampling period and control active
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.start()
 
             # Create sensor objects
             barometer = sensors[0]
@@ -111,6 +132,8 @@ class ControllerBase(ABC):
                 else:
                     # Use raw Z-axis measurement (assumes rocket is vertical)
                     measurement_accel = accelerometer.measurement[2]
+                if profiler is not None:
+                    profiler.lap(SENSORS)
 
                 filtered_y = measurement_agl
                 filtered_v = 0
@@ -127,15 +150,28 @@ class ControllerBase(ABC):
                 else:
                     # Use raw Z-axis measurement (assumes rocket is vertical)
                     measurement_accel = accelerometer.measurement[2]
+                if profiler is not None:
+                    profiler.lap(SENSORS)
 
                 self.kalman_filter.update(measurement_agl, measurement_accel, time, self.config.burn_time)
                 filtered_y = self.kalman_filter.getYEstimate()
                 filtered_v = self.kalman_filter.getVEstimate()
                 filtered_a = self.kalman_filter.getAEstimate()
-
-            predicted_apogee_w_brake = predict_apogee(filtered_y, filtered_v, self.last_deployment, self.config)
-            predicted_apogee_no_brake = predict_apogee(filtered_y, filtered_v, self.last_deployment, self.config,
-                                                       combined_cd=False)
+                if profiler is not None:
+                    profiler.lap(KALMAN)
+
+            if self.drag_table is not None:
+                cos_pitch = cos_pitch_from_quaternion(e0, e1, e2, e3)
+                predicted_apogee_w_brake = predict_apogee_tilted(filtered_y, filtered_v, self.last_deployment,
+                                                                 self.config, cos_pitch, self.drag_table)
+                predicted_apogee_no_brake = predict_apogee_tilted(filtered_y, filtered_v, 0.0,
+                                                                  self.config, cos_pitch, self.drag_table)
+            else:
+                predicted_apogee_w_brake = predict_apogee(filtered_y, filtered_v, self.last_deployment, self.config)
+                predicted_apogee_no_brake = predict_apogee(filtered_y, filtered_v, self.last_deployment, self.config,
+                                                           combined_cd=False)
+            if profiler is not None:
+                profiler.lap(PREDICT_APOGEE)
 
             # Calculate both errors
             error_w_brake = predicted_apogee_w_brake - self.config.target_apogee
@@ -177,6 +213,9 @@ class ControllerBase(ABC):
                     predicted_apogee_w_brake, predicted_apogee_no_brake,
                     error_w_brake, error_no_brake, dt
                 )
+            if profiler is not None:
+                profiler.lap(COMPUTE_CONTROL)
+
             # Ensure desired deployment is in valid range
             desired_deployment = np.clip(desired_deployment, 0.0, 1.0)
 
@@ -193,6 +232,8 @@ class ControllerBase(ABC):
             else:
                 air_brakes.deployment_level = self.last_deployment
                 desired_deployment = 0
+            if profiler is not None:
+                profiler.lap(ACTUATION)
 
             # Store data for analysis (use error_w_brake for logging)
             error = error_w_brake
@@ -204,21 +245,14 @@ class ControllerBase(ABC):
                 sim_accel = 0
             self.last_velocity = velocity
 
-            self.data['time'].append(round(time, 3))
-            self.data['sim_altitude_agl'].append(round(altitude_agl, 3))
-            self.data['raw_altitude_agl'].append(round(measurement_agl, 3))
-            self.data['filtered_altitude_agl'].append(round(filtered_y, 3))
-            self.data['sim_velocity'].append(round(state[5], 3))
-            self.data['filtered_velocity'].append(round(filtered_v, 3))
-            self.data['deployment'].append(round(air_brakes.deployment_level, 3))
-            self.data['desired_deployment'].append(round(desired_deployment, 3))
-            self.data['predicted_apogee'].append(round(predicted_apogee_w_brake, 3))
-            self.data['predicted_apogee_no_brake'].append(round(predicted_apogee_no_brake, 3))
-            self.data['control_active'].append(round(self.control_active, 3))
-            self.data['filtered_acceleration'].append(round(filtered_a, 3))
-            self.data['error'].append(round(error, 3))
-            self.data['raw_acceleration'].append(round(measurement_accel, 3))
-            self.data['sim_acceleration'].append(round(sim_accel, 3))
+            self.data.record(
+                time, altitude_agl, measurement_agl, filtered_y,
+                state[5], filtered_v, air_brakes.deployment_level, desired_deployment,
+                predicted_apogee_w_brake, predicted_apogee_no_brake, self.control_active,
+                filtered_a, error, measurement_accel, sim_accel,
+            )
+            if profiler is not None:
+                profiler.lap(TELEMETRY)
 
         else:
             # Same timestep
@@ -1,12 +1,19 @@
-import pandas as pd
 import numpy as np
-from scipy.interpolate import interp1d
 from .controller_base import ControllerBase
+from .controller_functions.deployment_schedule import compile_schedule
+from .controller_functions.stage_timer import (
+    SENSORS, KALMAN, PREDICT_APOGEE, COMPUTE_CONTROL, ACTUATION, TELEMETRY
+)
 from config import Config
 
 
 class ControllerFile(ControllerBase):
 
+    __slots__ = (
+        'deployment_file', 'time_col', 'deployment_col', 'time_unit', 'deployment_schedule',
+        'deployment_time_data', 'deployment_value_data', 'max_time',
+    )
+
     def __init__(self, config: Config, deployment_file: str,
                  time_col: str = None, deployment_col: str = None,
                  time_unit: str = None):
@@ -19,7 +26,7 @@ class ControllerFile(ControllerBase):
         self.time_unit = time_unit if time_unit is not None else 's'
 
         # Load deployment data
-        self.deployment_interpolator = None
+        self.deployment_schedule = None
         self.deployment_time_data = None
         self.deployment_value_data = None
         self.max_time = 0.0
@@ -33,7 +40,7 @@ class ControllerFile(ControllerBase):
         print(f"  Data points: {len(self.deployment_time_data)}")
 
     def _load_deployment_data(self):
-        """Load deployment data from CSV file"""
+        """Load the deployment schedule, shared with every controller replaying the same file"""
         import os
 
         # Check if file exists
@@ -49,41 +56,17 @@ class ControllerFile(ControllerBase):
                 f"  3. Change 'Control Algorithm' in config.csv to PID/BANGBANG/etc.\n"
             )
 
-        # Load deployment data from CSV file
-        df = pd.read_csv(self.deployment_file)
-
-        # Validate columns exist
-        if self.time_col not in df.columns:
-            available_cols = ', '.join(df.columns[:10])  # Show first 10 columns
-            raise ValueError(
-                f"Time column '{self.time_col}' not found in {self.deployment_file}\n"
-                f"Available columns: {available_cols}..."
-            )
-        if self.deployment_col not in df.columns:
-            available_cols = ', '.join(df.columns[:10])
-            raise ValueError(
-                f"Deployment column '{self.deployment_col}' not found in {self.deployment_file}\n"
-                f"Available columns: {available_cols}..."
-            )
-
-        # Extract time and deployment data
-        time_data = df[self.time_col].values
-        deployment_data = df[self.deployment_col].values
-
-        # Convert time to seconds if needed
-        if self.time_unit == 'us':
-            time_data = (time_data - time_data[0]) / 1e6
-        elif self.time_unit == 'ms':
-            time_data = (time_data - time_data[0]) / 1e3
-        elif self.time_unit == 's':
-            time_data = time_data - time_data[0]
-        else:
-            raise ValueError(f"Invalid time_unit '{self.time_unit}'. Must be 'us', 'ms', or 's'")
+        # Only the two columns are read, resampled onto the control ticks once per process
+        self.deployment_schedule = compile_schedule(
+            self.deployment_file, self.time_col, self.deployment_col, self.time_unit, self.config.sampling_rate
+        )
 
         # Store data
+        time_data = self.deployment_schedule.time_data
+        deployment_data = self.deployment_schedule.deployment_data
         self.deployment_time_data = time_data
         self.deployment_value_data = deployment_data
-        self.max_time = time_data[-1]
+        self.max_time = self.deployment_schedule.max_time
 
         # Verify data was loaded correctly
         if self.max_time <= 0:
@@ -94,15 +77,6 @@ class ControllerFile(ControllerBase):
             print(f"  WARNING: All deployment values are 0!")
             print(f"  Check that '{self.deployment_col}' column has non-zero values")
 
-        # Create interpolator
-        self.deployment_interpolator = interp1d(
-            time_data,
-            deployment_data,
-            kind='linear',
-            bounds_error=False,
-            fill_value=(deployment_data[0], deployment_data[-1])  # Hold first/last values outside range
-        )
-
     def get_deployment(self, time: float) -> float:
         """
         Get interpolated deployment at given time
@@ -113,10 +87,10 @@ class ControllerFile(ControllerBase):
         Returns:
             Deployment value (0-1)
         """
-        if self.deployment_interpolator is None:
+        if self.deployment_schedule is None:
             return 0.0
 
-        return float(self.deployment_interpolator(time))
+        return self.deployment_schedule.value(time)
 
     def compute_control(self, filtered_altitude, filtered_velocity, filtered_acceleration,
                        predicted_apogee_w_brake, predicted_apogee_no_brake,
@@ -147,7 +121,8 @@ class ControllerFile(ControllerBase):
         Returns:
             Deployment value (0-1)
         """
-        from .controller_functions.predict_apogee import predict_apogee
+        from .controller_functions.predict_apogee import predict_apogee, predict_apogee_tilted
+        from .controller_functions.drag_table import cos_pitch_from_quaternion
         from .controller_functions.convert_p_2_alt import find_altitude
 
         # Extract state
@@ -164,6 +139,10 @@ class ControllerFile(ControllerBase):
 
         # Only update state if this is a new timestep
         if time - self.last_time >= 1.0 / sampling_rate * 0.5:
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.start()
+
             # Create sensor objects
             barometer = sensors[0]
             accelerometer = sensors[1]
@@ -182,6 +161,8 @@ class ControllerFile(ControllerBase):
                     )
                 else:
                     measurement_accel = accelerometer.measurement[2]
+                if profiler is not None:
+                    profiler.lap(SENSORS)
 
                 filtered_y = measurement_agl
                 filtered_v = 0
@@ -196,15 +177,28 @@ class ControllerFile(ControllerBase):
                     )
                 else:
                     measurement_accel = accelerometer.measurement[2]
+                if profiler is not None:
+                    profiler.lap(SENSORS)
 
                 self.kalman_filter.update(measurement_agl, measurement_accel, time, self.config.burn_time)
                 filtered_y = self.kalman_filter.getYEstimate()
                 filtered_v = self.kalman_filter.getVEstimate()
                 filtered_a = self.kalman_filter.getAEstimate()
+                if profiler is not None:
+                    profiler.lap(KALMAN)
 
             # Predict apogee with current deployment (use last_deployment for prediction)
-            predicted_apogee_w_brake = predict_apogee(filtered_y, filtered_v, self.last_deployment, self.config)
-            predicted_apogee_no_brake = predict_apogee(filtered_y, filtered_v, 0.0, self.config, combined_cd=False)
+            if self.drag_table is not None:
+                cos_pitch = cos_pitch_from_quaternion(e0, e1, e2, e3)
+                predicted_apogee_w_brake = predict_apogee_tilted(filtered_y, filtered_v, self.last_deployment,
+                                                                 self.config, cos_pitch, self.drag_table)
+                predicted_apogee_no_brake = predict_apogee_tilted(filtered_y, filtered_v, 0.0,
+                                                                  self.config, cos_pitch, self.drag_table)
+            else:
+                predicted_apogee_w_brake = predict_apogee(filtered_y, filtered_v, self.last_deployment, self.config)
+                predicted_apogee_no_brake = predict_apogee(filtered_y, filtered_v, 0.0, self.config, combined_cd=False)
+            if profiler is not None:
+                profiler.lap(PREDICT_APOGEE)
 
             # Calculate error
             error_w_brake = predicted_apogee_w_brake - self.config.target_apogee
@@ -213,6 +207,8 @@ class ControllerFile(ControllerBase):
             # Get interpolated deployment from file
             desired_deployment = self.get_deployment(time)
             desired_deployment = np.clip(desired_deployment, 0.0, 1.0)
+            if profiler is not None:
+                profiler.lap(COMPUTE_CONTROL)
 
             # Apply rate limiting and control activation logic
             dt = 1 / sampling_rate
@@ -227,6 +223,8 @@ class ControllerFile(ControllerBase):
                 air_brakes.deployment_level = self.last_deployment
                 desired_deployment = 0
                 deployment = self.last_deployment
+            if profiler is not None:
+                profiler.lap(ACTUATION)
 
             # Compute sim acceleration
             if dt > 0:
@@ -236,21 +234,14 @@ class ControllerFile(ControllerBase):
             self.last_velocity = velocity
 
             # Log data
-            self.data['time'].append(round(time, 3))
-            self.data['sim_altitude_agl'].append(round(altitude_agl, 3))
-            self.data['raw_altitude_agl'].append(round(measurement_agl, 3))
-            self.data['filtered_altitude_agl'].append(round(filtered_y, 3))
-            self.data['sim_velocity'].append(round(velocity, 3))
-            self.data['filtered_velocity'].append(round(filtered_v, 3))
-            self.data['deployment'].append(round(air_brakes.deployment_level, 3))
-            self.data['desired_deployment'].append(round(desired_deployment, 3))
-            self.data['predicted_apogee'].append(round(predicted_apogee_w_brake, 3))
-            self.data['predicted_apogee_no_brake'].append(round(predicted_apogee_no_brake, 3))
-            self.data['control_active'].append(round(self.control_active, 3))
-            self.data['filtered_acceleration'].append(round(filtered_a, 3))
-            self.data['error'].append(round(error, 3))
-            self.data['raw_acceleration'].append(round(measurement_accel, 3))
-            self.data['sim_acceleration'].append(round(sim_accel, 3))
+            self.data.record(
+                time, altitude_agl, measurement_agl, filtered_y,
+                velocity, filtered_v, air_brakes.deployment_level, desired_deployment,
+                predicted_apogee_w_brake, predicted_apogee_no_brake, self.control_active,
+                filtered_a, error, measurement_accel, sim_accel,
+            )
+            if profiler is not None:
+                profiler.lap(TELEMETRY)
 
             self.last_time = time
         else:
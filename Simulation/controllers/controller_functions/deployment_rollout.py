@@ -0,0 +1,138 @@
+from math import pi
+
+import numpy as np
+
+
+class DeploymentRollout:
+    """
+    Coast to apogee under many deployment profiles at once
+
+    Each candidate profile moves the brakes toward a first deployment level
+    for the first half of the horizon and toward a second level for the rest,
+    at most max_deployment_rate per second, holding each tick's deployment
+    until the next tick as the simulation does. Every pair of levels is a
+    candidate, so levels=21 rolls out 441 profiles.
+
+    The drag model is predict_apogee's (Cd = rocket_cd + deployment *
+    airbrake_drag, no gravity turn), stepped in closed form: with constant k
+    over a tick, v = vt tan(atan(v0 / vt) - dt g / vt) where vt^2 = m g / k,
+    and the climb is (m / 2k) ln((vt^2 + v0^2) / (vt^2 + v^2)). After the
+    horizon the rest of the climb is predict_apogee's formula at the last
+    deployment, so a constant profile reproduces predict_apogee exactly.
+
+    All work is in preallocated arrays, one NumPy call per operation per tick
+    of the horizon.
+
+    Args:
+        config: Config object (drag, mass and max_deployment_rate)
+        dt: Controller period (s)
+        horizon_steps: Ticks of the horizon
+        levels: Deployment levels per segment
+    """
+
+    __slots__ = (
+        'dt', 'horizon_steps', 'switch_step', 'max_change', 'mass', 'k_rocket', 'k_airbrake',
+        'first_levels', 'second_levels', 'deployment', 'travel', 'next_deployment',
+        '_velocity', '_altitude', '_k', '_vt2', '_scratch', '_target',
+    )
+
+    def __init__(self, config, dt, horizon_steps, levels):
+        if horizon_steps < 1 or levels < 2:
+            raise ValueError(f"Rollout needs horizon_steps >= 1 and levels >= 2, got {horizon_steps} and {levels}")
+        self.dt = dt
+        self.horizon_steps = horizon_steps
+        self.switch_step = (horizon_steps + 1) // 2
+        self.max_change = config.max_deployment_rate * dt
+        self.mass = config.burnout_mass
+
+        # k = k_rocket + deployment * k_airbrake, as in predict_apogee
+        area_factor = 0.5 * config.air_density * pi * config.rocket_radius ** 2
+        self.k_rocket = area_factor * config.apogee_prediction_cd
+        self.k_airbrake = area_factor * config.airbrake_drag
+
+        grid = np.linspace(0.0, 1.0, levels)
+        self.first_levels, self.second_levels = (axis.ravel() for axis in np.meshgrid(grid, grid, indexing='ij'))
+
+        num_profiles = levels * levels
+        self.deployment = np.empty(num_profiles)
+        self.travel = np.empty(num_profiles)
+        self.next_deployment = np.empty(num_profiles)
+        self._velocity = np.empty(num_profiles)
+        self._altitude = np.empty(num_profiles)
+        self._k = np.empty(num_profiles)
+        self._vt2 = np.empty(num_profiles)
+        self._scratch = np.empty(num_profiles)
+        self._target = np.empty(num_profiles)
+
+    def __len__(self):
+        return len(self.first_levels)
+
+    def _move(self, levels):
+        """Rate-limited step of every profile's deployment toward levels (travel accumulated)"""
+        change, deployment = self._scratch, self.deployment
+        np.subtract(levels, deployment, out=change)
+        np.clip(change, -self.max_change, self.max_change, out=change)
+        np.add(deployment, change, out=deployment)
+        np.abs(change, out=change)
+        np.add(self.travel, change, out=self.travel)
+
+    def _set_drag(self):
+        """k and terminal velocity squared of every profile at its current deployment"""
+        np.multiply(self.deployment, self.k_airbrake, out=self._k)
+        np.add(self._k, self.k_rocket, out=self._k)
+        np.divide(self.mass * 9.81, self._k, out=self._vt2)
+
+    def _climb(self, velocity, out):
+        """(m / 2k) ln(1 + v^2 / vt^2) for every profile, written to out"""
+        np.square(velocity, out=out)
+        np.divide(out, self._vt2, out=out)
+        np.log1p(out, out=out)
+        np.multiply(out, self.mass / 2, out=out)
+        np.divide(out, self._k, out=out)
+
+    def evaluate(self, altitude_agl, velocity, current_deployment):
+        """
+        Predicted apogee of every profile from a state
+
+        Also fills self.next_deployment (each profile's deployment after the
+        first tick, i.e. what to command now) and self.travel (total deployment
+        travel over the horizon).
+
+        Returns:
+            Array of predicted apogees (m AGL), one per profile (reused between calls)
+        """
+        deployment, v, y = self.deployment, self._velocity, self._altitude
+        scratch, target = self._scratch, self._target
+        deployment.fill(current_deployment)
+        self.travel.fill(0.0)
+        v.fill(velocity)
+        y.fill(altitude_agl)
+        g_dt = 9.81 * self.dt
+
+        for step in range(self.horizon_steps):
+            self._move(self.first_levels if step < self.switch_step else self.second_levels)
+            if step == 0:
+                self.next_deployment[:] = deployment
+            self._set_drag()
+
+            # Climb this tick = climb to apogee now - climb to apogee after it
+            self._climb(v, target)
+            np.add(y, target, out=y)
+
+            # v = vt tan(atan(v / vt) - dt g / vt), stopping at apogee
+            vt = np.sqrt(self._vt2, out=scratch)
+            np.divide(v, vt, out=v)
+            np.arctan(v, out=v)
+            np.divide(g_dt, vt, out=target)
+            np.subtract(v, target, out=v)
+            np.maximum(v, 0.0, out=v)
+            np.tan(v, out=v)
+            np.multiply(v, vt, out=v)
+
+            self._climb(v, target)
+            np.subtract(y, target, out=y)
+
+        # The rest of the climb at the final deployment
+        self._climb(v, target)
+        np.add(y, target, out=target)
+        return target
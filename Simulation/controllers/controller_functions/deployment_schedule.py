@@ -0,0 +1,103 @@
+import os
+from math import floor
+
+import numpy as np
+import pandas as pd
+
+TIME_UNITS = {'us': 1e6, 'ms': 1e3, 's': 1.0}
+
+# Compiled schedules by (file, modification time, columns, unit, sampling rate),
+# so every controller of a process shares one copy
+_schedule_cache = {}
+
+
+def load_deployment_columns(deployment_file, time_col, deployment_col):
+    """
+    Read only the time and deployment columns of a deployment CSV
+
+    Real-flight results files are wide; the header is read first so a missing
+    column can be reported, then only the two columns are parsed.
+
+    Returns:
+        Tuple of (time_data, deployment_data) arrays
+    """
+    columns = pd.read_csv(deployment_file, nrows=0).columns
+    for kind, column in (("Time", time_col), ("Deployment", deployment_col)):
+        if column not in columns:
+            available_cols = ', '.join(columns[:10])  # Show first 10 columns
+            raise ValueError(
+                f"{kind} column '{column}' not found in {deployment_file}\n"
+                f"Available columns: {available_cols}..."
+            )
+
+    df = pd.read_csv(deployment_file, usecols=[time_col, deployment_col])
+    return df[time_col].to_numpy(dtype=np.float64), df[deployment_col].to_numpy(dtype=np.float64)
+
+
+class DeploymentSchedule:
+    """
+    Deployment-vs-time schedule resampled onto a controller's sampling grid
+
+    The file's samples are linearly interpolated once, at construction, onto
+    t = k / sampling_rate. value(time) is then index arithmetic on that grid:
+    exact at the controller's tick times, linear between them, and holding the
+    first/last value outside the file's time range (as interp1d did with
+    fill_value=(first, last)).
+
+    Immutable once built, so one instance can serve every controller replaying
+    the same file (see compile_schedule).
+
+    Args:
+        time_data: Times of the file's samples, in seconds from the first
+        deployment_data: Deployment (0-1) at each time
+        sampling_rate: Controller frequency (Hz)
+    """
+
+    __slots__ = ('time_data', 'deployment_data', 'sampling_rate', 'max_time', '_grid')
+
+    def __init__(self, time_data, deployment_data, sampling_rate):
+        self.time_data = np.asarray(time_data, dtype=np.float64)
+        self.deployment_data = np.asarray(deployment_data, dtype=np.float64)
+        self.sampling_rate = sampling_rate
+        self.max_time = float(self.time_data[-1])
+
+        # One extra point past the end so value() can always read index + 1
+        num_ticks = max(int(np.ceil(self.max_time * sampling_rate)), 0) + 2
+        grid_times = np.arange(num_ticks) / sampling_rate
+        self._grid = np.interp(grid_times, self.time_data, self.deployment_data).tolist()
+
+    def value(self, time):
+        """Deployment at time (s)"""
+        position = time * self.sampling_rate
+        if position <= 0:
+            return self._grid[0]
+        index = floor(position)
+        if index >= len(self._grid) - 1:
+            return self._grid[-1]
+        fraction = position - index
+        start = self._grid[index]
+        return start + fraction * (self._grid[index + 1] - start)
+
+    def __len__(self):
+        return len(self._grid)
+
+
+def compile_schedule(deployment_file, time_col, deployment_col, time_unit, sampling_rate):
+    """
+    DeploymentSchedule of a deployment CSV, loaded once per process
+
+    Later calls with the same file (unchanged on disk), columns, unit and
+    sampling rate return the same instance, so Monte Carlo samples replaying a
+    file do not re-read it.
+    """
+    if time_unit not in TIME_UNITS:
+        raise ValueError(f"Invalid time_unit '{time_unit}'. Must be 'us', 'ms', or 's'")
+
+    key = (os.path.abspath(deployment_file), os.stat(deployment_file).st_mtime_ns,
+           time_col, deployment_col, time_unit, sampling_rate)
+    if key not in _schedule_cache:
+        time_data, deployment_data = load_deployment_columns(deployment_file, time_col, deployment_col)
+        # Convert time to seconds from the first sample
+        time_data = (time_data - time_data[0]) / TIME_UNITS[time_unit]
+        _schedule_cache[key] = DeploymentSchedule(time_data, deployment_data, sampling_rate)
+    return _schedule_cache[key]
@@ -0,0 +1,348 @@
+import os
+from math import pi, cos, radians
+
+import numpy as np
+
+from .predict_apogee import predict_apogee_array
+from .solve_deployment import solve_deployment
+
+# Config values a table is built from; a loaded table must match them
+TABLE_PARAMETERS = (
+    'target_apogee', 'apogee_prediction_cd', 'airbrake_drag', 'burnout_mass', 'air_density', 'rocket_radius',
+)
+
+# Default grids: altitude x velocity points, and cos(tilt) points when tilted.
+# Sized to fit the flight computer's flash as floats (256 kB and 448 kB).
+TABLE_SHAPE = (256, 256)
+TILTED_TABLE_SHAPE = (128, 128)
+TILT_POINTS = 7
+MAX_TILT_DEGREES = 30.0
+
+# Tables by (file, modification time) or by built config values and grid,
+# so every controller of a process shares one copy
+_table_cache = {}
+
+
+def _c_float(value):
+    """C float literal of value"""
+    text = f"{value:.7g}"
+    if '.' not in text and 'e' not in text:
+        text += ".0"
+    return text + "f"
+
+
+def table_parameters(config):
+    """Tuple of the TABLE_PARAMETERS values of config"""
+    return tuple(float(getattr(config, name)) for name in TABLE_PARAMETERS)
+
+
+def full_brake_velocity(altitude_agl, config):
+    """Velocity from which the rocket, fully deployed, just reaches the target"""
+    cd = config.apogee_prediction_cd + config.airbrake_drag
+    k = 0.5 * config.air_density * cd * pi * config.rocket_radius ** 2
+    climb = config.target_apogee - altitude_agl
+    return float(np.sqrt((np.exp(2 * k * climb / config.burnout_mass) - 1) * config.burnout_mass * 9.81 / k))
+
+
+def _cell(x, axis):
+    """(cell index, fraction within the cell) of x on a uniform axis, clamped to the grid"""
+    start, scale, last = axis
+    position = (x - start) * scale
+    if position <= 0.0:
+        return 0, 0.0
+    index = int(position)
+    if index > last:
+        return last, 1.0
+    return index, position - index
+
+
+class DeploymentTable:
+    """
+    Optimal deployment precomputed over a filtered (altitude, velocity) grid
+
+    Each node holds solve_deployment's deployment for that state, so a
+    controller can replace the per-tick solve with a lookup: bilinear in
+    altitude and velocity, and linear in cos(tilt) when the table has a tilt
+    axis. The grid is uniform on every axis, so finding the cell is index
+    arithmetic. States outside the grid read its edge, which is saturated for
+    the default ranges: velocities above the top one overshoot the target even
+    fully deployed, and the altitude axis ends at the target.
+
+    Args:
+        altitudes: Altitude axis (m AGL), uniformly spaced
+        velocities: Velocity axis (m/s), uniformly spaced
+        deployments: Deployment at each node, shape (altitudes, velocities)
+                     or (altitudes, velocities, cos_pitches)
+        parameters: table_parameters of the config the table was built from
+        cos_pitches: Optional cos(tilt) axis, uniformly spaced
+    """
+
+    __slots__ = (
+        'altitudes', 'velocities', 'cos_pitches', 'deployments', 'parameters',
+        '_axes', '_values', '_strides',
+    )
+
+    def __init__(self, altitudes, velocities, deployments, parameters, cos_pitches=None):
+        self.altitudes = np.asarray(altitudes, dtype=np.float64)
+        self.velocities = np.asarray(velocities, dtype=np.float64)
+        self.cos_pitches = None if cos_pitches is None else np.asarray(cos_pitches, dtype=np.float64)
+        self.deployments = np.ascontiguousarray(deployments, dtype=np.float64)
+        self.parameters = tuple(float(value) for value in parameters)
+
+        axes = [self.altitudes, self.velocities]
+        if self.cos_pitches is not None:
+            axes.append(self.cos_pitches)
+        if self.deployments.shape != tuple(len(axis) for axis in axes):
+            raise ValueError(
+                f"Deployment table shape {self.deployments.shape} does not match its axes "
+                f"{tuple(len(axis) for axis in axes)}"
+            )
+        for axis in axes:
+            if len(axis) < 2 or not np.allclose(np.diff(axis), axis[1] - axis[0]):
+                raise ValueError("Deployment table axes need at least 2 uniformly spaced points")
+
+        # (start, 1 / step, last cell index) per axis and a flat node list for lookup()
+        self._axes = tuple((float(axis[0]), float(1 / (axis[1] - axis[0])), len(axis) - 2) for axis in axes)
+        self._values = self.deployments.ravel().tolist()
+        self._strides = tuple(stride // self.deployments.itemsize for stride in self.deployments.strides)
+
+    @classmethod
+    def build(cls, config, shape=TABLE_SHAPE, altitude_range=None, velocity_range=None,
+              tilt_points=None, max_tilt_degrees=MAX_TILT_DEGREES):
+        """
+        Table of solve_deployment over a grid for config
+
+        Args:
+            config: Config object (drag, mass and target apogee)
+            shape: (altitude points, velocity points)
+            altitude_range: (min, max) altitude (m AGL). Defaults to 0 to the target
+            velocity_range: (min, max) velocity (m/s). Defaults to 0 to the velocity
+                            that just reaches the target from the ground fully deployed
+            tilt_points: Number of cos(tilt) points from cos(max_tilt_degrees) to 1,
+                         or None for a vertical-only table
+            max_tilt_degrees: Largest tilt of the tilt axis
+        """
+        if altitude_range is None:
+            altitude_range = (0.0, config.target_apogee)
+        if velocity_range is None:
+            velocity_range = (0.0, full_brake_velocity(0.0, config))
+
+        altitudes = np.linspace(*altitude_range, shape[0])
+        velocities = np.linspace(*velocity_range, shape[1])
+        cos_pitches = None
+        if tilt_points is not None:
+            cos_pitches = np.linspace(cos(radians(max_tilt_degrees)), 1.0, tilt_points)
+
+        deployments = np.empty((len(altitudes), len(velocities)) + (() if cos_pitches is None else (len(cos_pitches),)))
+        for i, altitude_agl in enumerate(altitudes.tolist()):
+            for j, velocity in enumerate(velocities.tolist()):
+                if cos_pitches is None:
+                    deployments[i, j] = solve_deployment(altitude_agl, velocity, config)
+                else:
+                    for m, cos_pitch in enumerate(cos_pitches.tolist()):
+                        deployments[i, j, m] = solve_deployment(altitude_agl, velocity, config, cos_pitch)
+
+        return cls(altitudes, velocities, deployments, table_parameters(config), cos_pitches)
+
+    def lookup(self, altitude_agl, velocity, cos_pitch=1.0):
+        """Interpolated deployment at a state (cos_pitch is ignored without a tilt axis)"""
+        values = self._values
+        i, fa = _cell(altitude_agl, self._axes[0])
+        j, fv = _cell(velocity, self._axes[1])
+        a_stride, v_stride = self._strides[0], self._strides[1]
+        n00 = i * a_stride + j * v_stride
+        n10 = n00 + a_stride
+
+        if self.cos_pitches is None:
+            low = values[n00] + fv * (values[n00 + v_stride] - values[n00])
+            high = values[n10] + fv * (values[n10 + v_stride] - values[n10])
+            return low + fa * (high - low)
+
+        # Linear along the tilt axis between two bilinear lookups
+        m, ft = _cell(cos_pitch, self._axes[2])
+        result = 0.0
+        for offset, weight in ((m, 1.0 - ft), (m + 1, ft)):
+            n0 = n00 + offset
+            n1 = n10 + offset
+            low = values[n0] + fv * (values[n0 + v_stride] - values[n0])
+            high = values[n1] + fv * (values[n1 + v_stride] - values[n1])
+            result += weight * (low + fa * (high - low))
+        return result
+
+    def check_config(self, config):
+        """Raise ValueError if config's drag, mass or target differ from the table's"""
+        for name, table_value, value in zip(TABLE_PARAMETERS, self.parameters, table_parameters(config)):
+            if not np.isclose(table_value, value, rtol=1e-9, atol=0.0):
+                raise ValueError(
+                    f"Deployment table was built for {name} = {table_value}, but config has {value}.\n"
+                    f"Rebuild it with DeploymentTable.build(config)"
+                )
+
+    def save(self, path):
+        """Write the table to an .npz file (see load)"""
+        arrays = dict(altitudes=self.altitudes, velocities=self.velocities,
+                      deployments=self.deployments, parameters=np.array(self.parameters))
+        if self.cos_pitches is not None:
+            arrays['cos_pitches'] = self.cos_pitches
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Table saved by save()"""
+        with np.load(path) as table_file:
+            return cls(
+                altitudes=table_file['altitudes'],
+                velocities=table_file['velocities'],
+                deployments=table_file['deployments'],
+                parameters=table_file['parameters'],
+                cos_pitches=table_file['cos_pitches'] if 'cos_pitches' in table_file else None,
+            )
+
+    def write_header(self, path):
+        """
+        Write the table as a C++ header for the flight computer
+
+        The header defines the grid, the node values as a float array in flash
+        and deploymentTable::lookup(y, v, cosPitch), the same interpolation as
+        lookup(), to stand in for control::computeDeployment before its rate
+        limiter.
+        """
+        tilted = self.cos_pitches is not None
+        names = ('ALTITUDE', 'VELOCITY', 'COS_PITCH')
+        lines = [
+            "#pragma once",
+            "",
+            "/*",
+            "Deployment lookup table generated by the simulation (DeploymentTable.write_header)",
+            "Regenerate it when the rocket, airbrake or target apogee changes. Built for:",
+        ]
+        lines += [f"    {name} = {value!r}" for name, value in zip(TABLE_PARAMETERS, self.parameters)]
+        lines += ["*/", "namespace deploymentTable{"]
+        for name, (start, scale, last) in zip(names, self._axes):
+            lines += [
+                f"    const double {name}_START = {start!r};",
+                f"    const double {name}_PER_STEP = {scale!r};  // 1 / grid step",
+                f"    const int {name}_POINTS = {last + 2};",
+            ]
+
+        dims = "[ALTITUDE_POINTS][VELOCITY_POINTS]" + ("[COS_PITCH_POINTS]" if tilted else "")
+        lines.append(f"    const float DEPLOYMENT{dims} PROGMEM = {{")
+        for plane in self.deployments:
+            if tilted:
+                rows = ", ".join("{" + ", ".join(_c_float(value) for value in node) + "}" for node in plane)
+            else:
+                rows = ", ".join(_c_float(value) for value in plane)
+            lines.append(f"        {{{rows}}},")
+        lines.append("    };")
+
+        lines += [
+            "",
+            "    inline double cell(double x, double start, double perStep, int points, int& index){",
+            "        double position = (x - start) * perStep;",
+            "        index = position < 0 ? 0 : (int)position;",
+            "        if(index > points - 2) index = points - 2;",
+            "        double fraction = position - index;",
+            "        return fraction < 0 ? 0 : (fraction > 1 ? 1 : fraction);",
+            "    }",
+            "",
+            "    inline double lookup(double y, double v, double cosPitch){",
+            "        int i, j, m = 0;",
+            "        double fa = cell(y, ALTITUDE_START, ALTITUDE_PER_STEP, ALTITUDE_POINTS, i);",
+            "        double fv = cell(v, VELOCITY_START, VELOCITY_PER_STEP, VELOCITY_POINTS, j);",
+        ]
+        if tilted:
+            lines += [
+                "        double ft = cell(cosPitch, COS_PITCH_START, COS_PITCH_PER_STEP, COS_PITCH_POINTS, m);",
+                "        double result = 0;",
+                "        for(int k = 0; k <= 1; k++){",
+                "            double low = DEPLOYMENT[i][j][m + k] + fv * (DEPLOYMENT[i][j + 1][m + k] - DEPLOYMENT[i][j][m + k]);",
+                "            double high = DEPLOYMENT[i + 1][j][m + k] + fv * (DEPLOYMENT[i + 1][j + 1][m + k] - DEPLOYMENT[i + 1][j][m + k]);",
+                "            result += (k ? ft : 1 - ft) * (low + fa * (high - low));",
+                "        }",
+                "        return result;",
+            ]
+        else:
+            lines += [
+                "        double low = DEPLOYMENT[i][j] + fv * (DEPLOYMENT[i][j + 1] - DEPLOYMENT[i][j]);",
+                "        double high = DEPLOYMENT[i + 1][j] + fv * (DEPLOYMENT[i + 1][j + 1] - DEPLOYMENT[i + 1][j]);",
+                "        return low + fa * (high - low);",
+            ]
+        lines += ["    }", "}", ""]
+
+        with open(path, "w") as header:
+            header.write("\n".join(lines))
+
+    def accuracy_report(self, config, num_states=20000, seed=0):
+        """
+        Lookup error against the exact solver (solve_deployment)
+
+        States are drawn uniformly over the grid (and tilt axis). The apogee
+        miss is predict_apogee's apogee with the looked-up deployment minus the
+        target, over states the brakes can bring to the target (where the exact
+        miss is 0); saturated states have no miss to compare.
+
+        Returns:
+            Dict of states, reachable states, max/mean/p99 absolute deployment
+            error and max/mean/p99 absolute apogee miss (m)
+        """
+        rng = np.random.default_rng(seed)
+        altitudes = rng.uniform(self.altitudes[0], self.altitudes[-1], num_states)
+        velocities = rng.uniform(self.velocities[0], self.velocities[-1], num_states)
+        if self.cos_pitches is None:
+            cos_pitches = np.ones(num_states)
+        else:
+            cos_pitches = rng.uniform(self.cos_pitches[0], self.cos_pitches[-1], num_states)
+
+        exact = np.array([solve_deployment(a, v, config, c) for a, v, c
+                          in zip(altitudes.tolist(), velocities.tolist(), cos_pitches.tolist())])
+        looked_up = np.array([self.lookup(a, v, c) for a, v, c
+                              in zip(altitudes.tolist(), velocities.tolist(), cos_pitches.tolist())])
+        deployment_error = np.abs(looked_up - exact)
+
+        # Tilt enters predict_apogee as the equivalent deployment of Cd / cos_pitch
+        rocket_cd = config.apogee_prediction_cd
+        equivalent = ((rocket_cd + looked_up * config.airbrake_drag) / cos_pitches - rocket_cd) / config.airbrake_drag
+        reachable = (exact > 0.0) & (exact < 1.0)
+        miss = np.abs(predict_apogee_array(altitudes, velocities, equivalent, config) - config.target_apogee)[reachable]
+
+        def stats(values):
+            if len(values) == 0:
+                return np.nan, np.nan, np.nan
+            return float(values.max()), float(values.mean()), float(np.percentile(values, 99))
+
+        report = {'states': num_states, 'reachable_states': int(reachable.sum())}
+        for name, values in (('deployment_error', deployment_error), ('apogee_miss_m', miss)):
+            report[f'max_{name}'], report[f'mean_{name}'], report[f'p99_{name}'] = stats(values)
+        return report
+
+
+def load_table(config):
+    """
+    DeploymentTable for config, loaded or built once per process
+
+    Uses config.lut_file when set (checked against config), otherwise builds a
+    table from config, with a tilt axis if config.lut_tilt.
+    """
+    lut_file = getattr(config, 'lut_file', None)
+    if lut_file is not None:
+        if not os.path.exists(lut_file):
+            raise FileNotFoundError(
+                f"\nDeployment table not found: {lut_file}\n\n"
+                f"Build one with DeploymentTable.build(config).save(path), or set\n"
+                f"lut_file = None to build it from the config at startup.\n"
+            )
+        key = (os.path.abspath(lut_file), os.stat(lut_file).st_mtime_ns)
+        if key not in _table_cache:
+            _table_cache[key] = DeploymentTable.load(lut_file)
+        table = _table_cache[key]
+        table.check_config(config)
+        return table
+
+    if getattr(config, 'lut_tilt', False):
+        shape, tilt_points = TILTED_TABLE_SHAPE, TILT_POINTS
+    else:
+        shape, tilt_points = TABLE_SHAPE, None
+    key = (table_parameters(config), shape, tilt_points)
+    if key not in _table_cache:
+        _table_cache[key] = DeploymentTable.build(config, shape=shape, tilt_points=tilt_points)
+    return _table_cache[key]
@@ -0,0 +1,112 @@
+import os
+from math import sqrt
+
+import numpy as np
+
+# Grid of the precomputed Cd table: deployment 0-1 by Mach 0-MAX_MACH
+DRAG_TABLE_SHAPE = (51, 51)
+MAX_MACH = 1.0
+
+# Tables by drag curve files (and their modification times) and grid,
+# so every controller of a process shares one copy
+_drag_table_cache = {}
+
+
+def speed_of_sound(elevation):
+    """Speed of sound (m/s) of the standard atmosphere at elevation (m), as RocketPy's default environment"""
+    temperature = 288.15 - 0.0065 * elevation
+    return sqrt(1.4 * 287.05 * temperature)
+
+
+def cos_pitch_from_quaternion(e0, e1, e2, e3):
+    """Cosine of the rocket axis' tilt from vertical, 1 - 2(e1^2 + e2^2) for a unit quaternion"""
+    norm = e0 * e0 + e1 * e1 + e2 * e2 + e3 * e3
+    if norm <= 0:
+        return 1.0
+    return 1 - 2 * (e1 * e1 + e2 * e2) / norm
+
+
+class DragTable:
+    """
+    Combined rocket + airbrake Cd over a uniform (deployment, Mach) grid
+
+    Built once from the same input CSVs as the simulated rocket: the rocket
+    curve interpolated linearly in Mach with constant ends (as RocketPy's
+    power-off drag) plus the airbrake curve evaluated through the RocketPy
+    Function the air brakes use. cd() is then a bilinear lookup, cheap enough
+    for every control tick; inputs outside the grid read its edge.
+
+    Args:
+        deployments: Deployment axis, uniformly spaced
+        machs: Mach axis, uniformly spaced
+        cd: Combined Cd at each node, shape (deployments, machs)
+    """
+
+    __slots__ = ('deployments', 'machs', 'cd_grid', '_axes', '_values', '_stride')
+
+    def __init__(self, deployments, machs, cd):
+        self.deployments = np.asarray(deployments, dtype=np.float64)
+        self.machs = np.asarray(machs, dtype=np.float64)
+        self.cd_grid = np.ascontiguousarray(cd, dtype=np.float64)
+        if self.cd_grid.shape != (len(self.deployments), len(self.machs)):
+            raise ValueError(
+                f"Drag table shape {self.cd_grid.shape} does not match its axes "
+                f"({len(self.deployments)}, {len(self.machs)})"
+            )
+
+        # (start, 1 / step, last cell index) per axis and a flat node list for cd()
+        self._axes = tuple((float(axis[0]), float(1 / (axis[1] - axis[0])), len(axis) - 2)
+                           for axis in (self.deployments, self.machs))
+        self._values = self.cd_grid.ravel().tolist()
+        self._stride = len(self.machs)
+
+    @classmethod
+    def from_files(cls, rocket_drag_curve_file, airbrake_drag_curve_file, shape=DRAG_TABLE_SHAPE, max_mach=MAX_MACH):
+        """Table of rocket + airbrake Cd from the drag curve CSVs (see config.*_drag_curve_file)"""
+        from simulation_functions.airbrake_drag_curve import (
+            load_airbrake_drag_curve, create_drag_coefficient_function
+        )
+
+        deployments = np.linspace(0.0, 1.0, shape[0])
+        machs = np.linspace(0.0, max_mach, shape[1])
+
+        rocket_curve = np.loadtxt(rocket_drag_curve_file, delimiter=',', skiprows=1, ndmin=2)
+        rocket_cd = np.interp(machs, rocket_curve[:, 0], rocket_curve[:, 1])
+
+        airbrake_cd = create_drag_coefficient_function(load_airbrake_drag_curve(airbrake_drag_curve_file))
+        cd = np.array([[rocket_cd[j] + airbrake_cd.get_value_opt(deployment, mach)
+                        for j, mach in enumerate(machs.tolist())] for deployment in deployments.tolist()])
+        return cls(deployments, machs, cd)
+
+    def cd(self, deployment, mach):
+        """Combined Cd at a deployment and Mach number"""
+        (d_start, d_scale, d_last), (m_start, m_scale, m_last) = self._axes
+
+        position = (deployment - d_start) * d_scale
+        if position <= 0.0:
+            i, fd = 0, 0.0
+        else:
+            i = int(position)
+            i, fd = (d_last, 1.0) if i > d_last else (i, position - i)
+        position = (mach - m_start) * m_scale
+        if position <= 0.0:
+            j, fm = 0, 0.0
+        else:
+            j = int(position)
+            j, fm = (m_last, 1.0) if j > m_last else (j, position - j)
+
+        values = self._values
+        n0 = i * self._stride + j
+        n1 = n0 + self._stride
+        low = values[n0] + fm * (values[n0 + 1] - values[n0])
+        high = values[n1] + fm * (values[n1 + 1] - values[n1])
+        return low + fd * (high - low)
+
+
+def load_drag_table(config):
+    """DragTable of config's drag curve files, built once per process (rebuilt if a file changes)"""
+    files = (config.rocket_drag_curve_file, config.airbrake_drag_curve_file)
+    key = tuple((os.path.abspath(path), os.stat(path).st_mtime_ns) for path in files)
+    if key not in _drag_table_cache:
+        _drag_table_cache[key] = DragTable.from_files(*files)
+    return _drag_table_cache[key]
@@ -1,8 +1,331 @@
 import numpy as np
+from scipy.linalg import solve_discrete_are
+
+# Steady-state solutions are keyed by dt rounded to this many decimals, so
+# floating-point jitter in the controller's tick times does not split them
+STEADY_STATE_DT_DECIMALS = 9
+
+# Relative distance from the steady-state covariance at which the filter
+# switches to the cached gain
+STEADY_STATE_TOLERANCE = 1e-9
+
+STEADY_STATE_CACHE_SIZE = 256
+
+# (rounded dt, Q bytes, R bytes) -> (gain, updated covariance) as float tuples,
+# or None where the Riccati equation has no stabilizing solution
+_steady_state_cache = {}
+
+
+def _transition_matrix(dt):
+    return np.array([
+        [1.0, dt, 0.5 * dt * dt],
+        [0.0, 1.0, dt],
+        [0.0, 0.0, 1.0]
+    ])
+
+
+def steady_state_solution(dt, Q, R, H):
+    """
+    Converged gain and covariance of the filter for a fixed dt, Q and R
+
+    Solves the discrete algebraic Riccati equation for the predicted
+    covariance, then applies one measurement update to it.
+
+    Returns:
+        Tuple of (K, P) with the 3x2 gain and the 3x3 updated covariance, or
+        None if the Riccati equation has no stabilizing solution
+    """
+    phi = _transition_matrix(dt)
+    try:
+        predicted = solve_discrete_are(phi.T, H.T, Q, R)
+    except (np.linalg.LinAlgError, ValueError):
+        return None
+    K = predicted @ H.T @ np.linalg.inv(H @ predicted @ H.T + R)
+    return K, (np.eye(3) - K @ H) @ predicted
+
+
+def _cached_steady_state(key, dt, Q, R, H):
+    if key not in _steady_state_cache:
+        if len(_steady_state_cache) >= STEADY_STATE_CACHE_SIZE:
+            _steady_state_cache.clear()
+        solution = steady_state_solution(dt, Q, R, H)
+        if solution is not None:
+            K, P = solution
+            (p00, p01, p02), (_, p11, p12), (_, _, p22) = P.tolist()
+            solution = (tuple(K.ravel().tolist()), (p00, p01, p02, p11, p12, p22))
+        _steady_state_cache[key] = solution
+    return _steady_state_cache[key]
 
 
 class KalmanAltitudeFilter:
-    """Kalman filter for altitude and velocity estimation"""
+    """
+    Kalman filter for altitude and velocity estimation
+
+    Constant-acceleration model with state [position, velocity, acceleration]
+    and measurements [altitude, acceleration]. The predict and update steps are
+    written out entry by entry on Python floats: at 3 states and 2 measurements
+    NumPy's per-call overhead costs far more than the arithmetic. The error
+    covariance is kept symmetric (its 6 unique entries); Q and R are read from
+    their arrays every update, so they can be changed between updates.
+
+    x, P, K, z and phi read as the usual NumPy matrices (copies; assign to x or P
+    to change the state). MatrixKalmanAltitudeFilter is the matrix-product form.
+
+    Steady-state mode (steady_state=True, or config.kalman_steady_state): once
+    dt, Q and R have stayed the same for consecutive updates and the covariance
+    has converged to the Riccati solution for them, updates use that cached
+    gain and skip covariance propagation. Any change of dt, Q or R falls back
+    to full updates until the covariance converges again.
+    """
+
+    __slots__ = (
+        'config', 'steady_state', 'initialized', 'previous_time', 'burn_time', '_y', '_v', '_a', '_z', 'I',
+        '_dt', 'H', 'R', 'Q', '_p00', '_p01', '_p02', '_p11', '_p12', '_p22', '_K', '_noise_key', '_noise',
+        '_previous_settings', '_steady_settings',
+    )
+
+    def __init__(self, config, steady_state=None):
+        self.config = config
+        self.steady_state = config.kalman_steady_state if steady_state is None else steady_state
+        self.initialized = False
+        self.previous_time = None
+        self.burn_time = config.burn_time
+
+        # State estimate [position, velocity, acceleration]
+        self._y = 0.0
+        self._v = 0.0
+        self._a = 0.0
+
+        # Measurement vector [altitude, acceleration]
+        self._z = (0.0, 0.0)
+
+        # 3x3 identity matrix
+        self.I = np.eye(3)
+
+        # Time step of the last predict (defines phi)
+        self._dt = 0.0
+
+        # State to measurement matrix [altitude, acceleration]
+        self.H = np.array([
+            [1.0, 0.0, 0.0],  # altitude measurement
+            [0.0, 0.0, 1.0]   # acceleration measurement
+        ])
+
+        # Measurement covariance [altitude, acceleration]
+        self.R = np.array([
+            [config.alt_std * config.alt_std, 0.0],
+            [0.0, config.accel_std * config.accel_std]
+        ])
+
+        # Process covariance
+        self.Q = np.array([
+            [config.model_y_std * config.model_y_std, 0.0, 0.0],
+            [0.0, config.model_v_std * config.model_v_std, 0.0],
+            [0.0, 0.0, config.model_a_std * config.model_a_std]
+        ])
+
+        # Error covariance (upper triangle)
+        self._set_identity_covariance()
+
+        # Kalman gain (3x2, row-major)
+        self._K = (0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+        # Entries of Q and R as floats, refreshed when their contents change
+        self._noise_key = None
+        self._noise = None
+
+        # Settings of the previous update, and those the cached gain is in use for
+        self._previous_settings = None
+        self._steady_settings = None
+
+    def _set_identity_covariance(self):
+        self._p00, self._p01, self._p02 = 1.0, 0.0, 0.0
+        self._p11, self._p12 = 1.0, 0.0
+        self._p22 = 1.0
+
+    def initialize(self, initial_altitude_agl: float, sampling_rate: int):
+        """Initialize filter with initial altitude"""
+        self._y, self._v, self._a = float(initial_altitude_agl), 0.0, 0.0
+        self._set_identity_covariance()  # Reset to identity matrix
+        self._steady_settings = None
+        self.initialized = True
+
+    def updateKalmanFilter(self, measurement_agl: float, measurement_accel: float, dt: float, time: float):
+        """Standard Kalman Filter - Predict then Update"""
+        # Plain floats from here on; NumPy scalars would make every operation slower
+        measurement_agl, measurement_accel, dt = float(measurement_agl), float(measurement_accel), float(dt)
+        # Q and R can be edited in place between updates, so compare their bytes
+        # (much cheaper than reading the entries back out of NumPy every update)
+        noise_key = (self.Q.tobytes(), self.R.tobytes())
+        if noise_key != self._noise_key:
+            (q00, q01, q02), (_, q11, q12), (_, _, q22) = self.Q.tolist()
+            (r00, r01), (r10, r11) = self.R.tolist()
+            self._noise_key = noise_key
+            self._noise = (q00, q01, q02, q11, q12, q22, r00, r01, r10, r11)
+        q00, q01, q02, q11, q12, q22, r00, r01, r10, r11 = self._noise
+        half_dt2 = 0.5 * dt * dt
+        self._dt = dt
+
+        # 1. PREDICT STEP
+        # x = phi x
+        y = self._y + dt * self._v + half_dt2 * self._a
+        v = self._v + dt * self._a
+        a = self._a
+
+        settings = None
+        if self.steady_state:
+            settings = (round(dt, STEADY_STATE_DT_DECIMALS), noise_key)
+            if settings == self._steady_settings:
+                # Converged: the gain is fixed and P stays at its steady-state value
+                self._z = (measurement_agl, measurement_accel)
+                k00, k01, k10, k11, k20, k21 = self._K
+                innovation_y = measurement_agl - y
+                innovation_a = measurement_accel - a
+                self._y = y + k00 * innovation_y + k01 * innovation_a
+                self._v = v + k10 * innovation_y + k11 * innovation_a
+                self._a = a + k20 * innovation_y + k21 * innovation_a
+                return
+
+        # P = phi P phi^T + Q, with A = phi P
+        p00, p01, p02 = self._p00, self._p01, self._p02
+        p11, p12, p22 = self._p11, self._p12, self._p22
+        a00 = p00 + dt * p01 + half_dt2 * p02
+        a01 = p01 + dt * p11 + half_dt2 * p12
+        a02 = p02 + dt * p12 + half_dt2 * p22
+        a11 = p11 + dt * p12
+        a12 = p12 + dt * p22
+        p00 = a00 + dt * a01 + half_dt2 * a02 + q00
+        p01 = a01 + dt * a02 + q01
+        p02 = a02 + q02
+        p11 = a11 + dt * a12 + q11
+        p12 = a12 + q12
+        p22 = p22 + q22
+
+        # 2. update step
+        self._z = (measurement_agl, measurement_accel)
+
+        # Kalman gain K = P H^T S^-1 with S = H P H^T + R; H picks position and acceleration
+        s00 = p00 + r00
+        s01 = p02 + r01
+        s10 = p02 + r10
+        s11 = p22 + r11
+        inv_det = 1.0 / (s00 * s11 - s01 * s10)
+        i00, i01, i10, i11 = s11 * inv_det, -s01 * inv_det, -s10 * inv_det, s00 * inv_det
+        k00, k01 = p00 * i00 + p02 * i10, p00 * i01 + p02 * i11
+        k10, k11 = p01 * i00 + p12 * i10, p01 * i01 + p12 * i11
+        k20, k21 = p02 * i00 + p22 * i10, p02 * i01 + p22 * i11
+        self._K = (k00, k01, k10, k11, k20, k21)
+
+        # Update state estimate
+        innovation_y = measurement_agl - y
+        innovation_a = measurement_accel - a
+        self._y = y + k00 * innovation_y + k01 * innovation_a
+        self._v = v + k10 * innovation_y + k11 * innovation_a
+        self._a = a + k20 * innovation_y + k21 * innovation_a
+
+        # Update covariance P = (I - K H) P
+        self._p00 = p00 - k00 * p00 - k01 * p02
+        self._p01 = p01 - k00 * p01 - k01 * p12
+        self._p02 = p02 - k00 * p02 - k01 * p22
+        self._p11 = p11 - k10 * p01 - k11 * p12
+        self._p12 = p12 - k10 * p02 - k11 * p22
+        self._p22 = p22 - k20 * p02 - k21 * p22
+
+        if settings is not None:
+            # Only settings held for consecutive updates get a Riccati solve
+            if settings == self._previous_settings:
+                self._check_steady_state(settings, dt)
+            self._previous_settings = settings
+
+    def _check_steady_state(self, settings, dt):
+        """Switch to the cached gain for settings once the covariance has converged to it"""
+        solution = _cached_steady_state(settings, dt, self.Q, self.R, self.H)
+        if solution is None:
+            return
+        K, P = solution
+        covariance = (self._p00, self._p01, self._p02, self._p11, self._p12, self._p22)
+        scale = max(abs(entry) for entry in P)
+        if max(abs(entry - steady) for entry, steady in zip(covariance, P)) <= STEADY_STATE_TOLERANCE * scale:
+            self._K = K
+            self._p00, self._p01, self._p02, self._p11, self._p12, self._p22 = P
+            self._steady_settings = settings
+
+    def update(self, measurement_agl: float, measurement_accel: float, time: float, motor_burn_time: float):
+        """Update filter and return estimates"""
+        # Calculate dt
+        if self.previous_time is not None:
+            dt = time - self.previous_time
+        else:
+            dt = 1.0 / self.config.sampling_rate
+
+        dt = max(dt, 1e-6)  # Prevent zero dt
+
+        # Update the Kalman filter
+        self.updateKalmanFilter(measurement_agl, measurement_accel, dt, time)
+
+        self.previous_time = time
+
+        return self._y, self._v
+
+    def getYEstimate(self):
+        """Get position estimate"""
+        return self._y
+
+    def getVEstimate(self):
+        """Get velocity estimate"""
+        return self._v
+
+    def getAEstimate(self):
+        """Get acceleration estimate"""
+        return self._a
+
+    @property
+    def x(self):
+        """State estimate vector [position, velocity, acceleration] (3x1)"""
+        return np.array([[self._y], [self._v], [self._a]])
+
+    @x.setter
+    def x(self, value):
+        self._y, self._v, self._a = (float(entry) for entry in np.ravel(value))
+
+    @property
+    def P(self):
+        """Error covariance (3x3)"""
+        return np.array([
+            [self._p00, self._p01, self._p02],
+            [self._p01, self._p11, self._p12],
+            [self._p02, self._p12, self._p22]
+        ])
+
+    @P.setter
+    def P(self, value):
+        (self._p00, self._p01, self._p02), (_, self._p11, self._p12), (_, _, self._p22) = \
+            np.asarray(value, dtype=float).tolist()
+        self._steady_settings = None
+
+    @property
+    def z(self):
+        """Measurement vector of the last update [altitude, acceleration] (2x1)"""
+        return np.array([[self._z[0]], [self._z[1]]])
+
+    @property
+    def K(self):
+        """Kalman gain of the last update (3x2)"""
+        return np.array(self._K).reshape(3, 2)
+
+    @property
+    def phi(self):
+        """State transition matrix of the last update"""
+        return _transition_matrix(self._dt)
+
+
+class MatrixKalmanAltitudeFilter:
+    """
+    Matrix form of KalmanAltitudeFilter
+
+    Same filter written with NumPy matrix products. Kept as the reference the
+    scalar implementation is checked against; it is several times slower per update.
+    """
 
     def __init__(self, config):
         self.config = config
@@ -1,5 +1,12 @@
 from math import pi, log
 
+import numpy as np
+
+from .drag_table import load_drag_table, speed_of_sound
+
+# Floor of cos(tilt), so a rocket past horizontal does not divide by ~0
+MIN_COS_PITCH = 0.1
+
 def predict_apogee(altitude_agl, velocity, current_deployment, config, combined_cd = True):
     """Apogee predictor for control algorithm with combined rocket and airbrake drag"""
     if velocity <= 0:
@@ -32,4 +39,80 @@ def predict_apogee(altitude_agl, velocity, current_deployment, config, combined_
     delta_altitude = (config.burnout_mass / (2 * k)) * log(log_arg)
     predicted_apogee_agl = altitude_agl + delta_altitude
 
-    return predicted_apogee_agl
\ No newline at end of file
+    return predicted_apogee_agl
+
+def predict_apogee_array(altitude_agl, velocity, current_deployment, config, combined_cd=True):
+    """
+    Array version of predict_apogee for offline studies
+
+    Broadcasts altitude_agl, velocity and current_deployment against each other
+    (scalars, lists or arrays) and returns the apogees with the broadcast shape.
+    Points where predict_apogee returns the altitude unchanged (velocity <= 0,
+    non-positive k or log argument) do so here too. Controllers should keep
+    calling predict_apogee, which is faster for one state.
+    """
+    altitude_agl, velocity, current_deployment = np.broadcast_arrays(
+        np.asarray(altitude_agl, dtype=np.float64),
+        np.asarray(velocity, dtype=np.float64),
+        np.asarray(current_deployment, dtype=np.float64),
+    )
+
+    rocket_cd = config.apogee_prediction_cd
+    if combined_cd == True:
+        combined_cd = rocket_cd + current_deployment * config.airbrake_drag
+    else:
+        combined_cd = np.full(velocity.shape, rocket_cd, dtype=np.float64)
+
+    rocket_reference_area = pi * (config.rocket_radius ** 2)
+    k = 0.5 * config.air_density * combined_cd * rocket_reference_area
+    log_arg = k * velocity ** 2 / (config.burnout_mass * 9.81) + 1
+
+    # Invalid points get k = 1 and log argument 1, so their climb is exactly 0
+    valid = (velocity > 0) & (k > 0) & (log_arg > 0)
+    k = np.where(valid, k, 1.0)
+    log_arg = np.where(valid, log_arg, 1.0)
+
+    delta_altitude = (config.burnout_mass / (2 * k)) * np.log(log_arg)
+    predicted_apogee_agl = altitude_agl + delta_altitude
+
+    # 0-d inputs give a NumPy scalar, like indexing an array
+    return predicted_apogee_agl[()]
+
+def predict_apogee_tilted(altitude_agl, velocity, current_deployment, config, cos_pitch=1.0, drag_table=None):
+    """
+    Apogee predictor with the drag curve Cd and the rocket's tilt
+
+    Same closed form as predict_apogee, with the firmware's control::getApogee
+    drag: Cd divided by cos_pitch, since the drag along a path tilted from
+    vertical adds Cd / cos(tilt) of deceleration to the vertical velocity. Cd
+    is the combined rocket + airbrake Cd of the input drag curves at the
+    current Mach number (airspeed velocity / cos_pitch), from a DragTable.
+
+    Args:
+        altitude_agl: Altitude above ground (m)
+        velocity: Vertical velocity (m/s)
+        current_deployment: Airbrake deployment (0-1)
+        config: Config object (mass, radius, air density, drag curve files)
+        cos_pitch: Cosine of the tilt from vertical (see cos_pitch_from_quaternion)
+        drag_table: DragTable to use; controllers keep one (load_drag_table
+                    checks the files on every call)
+
+    Returns:
+        Predicted apogee (m AGL)
+    """
+    if velocity <= 0:
+        return altitude_agl
+    if drag_table is None:
+        drag_table = load_drag_table(config)
+    if cos_pitch < MIN_COS_PITCH:
+        cos_pitch = MIN_COS_PITCH
+
+    mach = velocity / cos_pitch / speed_of_sound(config.env_elevation)
+    cd = drag_table.cd(current_deployment, mach) / cos_pitch
+
+    k = 0.5 * config.air_density * cd * pi * config.rocket_radius ** 2
+    if k <= 0:
+        return altitude_agl
+
+    delta_altitude = (config.burnout_mass / (2 * k)) * log((k * velocity ** 2) / (config.burnout_mass * 9.81) + 1)
+    return altitude_agl + delta_altitude
@@ -0,0 +1,42 @@
+class SlidingWindowSum:
+    """
+    Running sum of the last `size` appended values
+
+    Ring buffer of fixed size with a running total, so append and sum are O(1)
+    and memory does not grow with flight length. The total is recomputed from
+    the buffer each time the ring wraps, which keeps floating-point drift from
+    adding/subtracting bounded at no extra amortized cost.
+
+    A size of 0 or less keeps no window and sums everything appended, as
+    list[-0:] does.
+    """
+
+    __slots__ = ('size', '_buffer', '_index', '_count', '_total')
+
+    def __init__(self, size):
+        self.size = max(int(size), 0)
+        self._buffer = [0.0] * self.size
+        self._index = 0
+        self._count = 0
+        self._total = 0.0
+
+    def append(self, value):
+        """Add a value, dropping the oldest once the window is full"""
+        self._count += 1
+        if not self.size:
+            self._total += value
+            return
+        self._total += value - self._buffer[self._index]
+        self._buffer[self._index] = value
+        self._index += 1
+        if self._index == self.size:
+            self._index = 0
+            self._total = sum(self._buffer)
+
+    def sum(self):
+        """Sum of the values in the window"""
+        return self._total
+
+    def __len__(self):
+        """Number of values in the window"""
+        return min(self._count, self.size) if self.size else self._count
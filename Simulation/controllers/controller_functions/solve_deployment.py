@@ -0,0 +1,59 @@
+from math import pi, exp
+
+from scipy.special import lambertw
+
+from .predict_apogee import predict_apogee
+
+
+def solve_deployment(altitude_agl, velocity, config, cos_pitch=1.0):
+    """
+    Deployment whose predict_apogee apogee equals config.target_apogee
+
+    Inverts predict_apogee's log-drag formula instead of searching it. With
+    x = k v^2 / (m g) the climb is (v^2 / 2g) ln(1 + x) / x, so reaching the
+    target needs ln(1 + x) = r x with r = 2 g (target - altitude) / v^2, whose
+    non-zero root is 1 + x = -W_-1(-r e^-r) / r (Lambert W, lower branch).
+    The drag parameter k then gives the combined Cd and the deployment.
+
+    Saturates like the firmware's control::computeDeployment: 0 if the rocket
+    falls short of the target with the brakes retracted, 1 if it overshoots it
+    fully deployed. Unlike the firmware's 6-step bisection the result is exact.
+
+    With cos_pitch < 1 the drag coefficient is divided by it, as the
+    firmware's control::getApogee does for a tilted rocket.
+
+    Args:
+        altitude_agl: Altitude above ground (m)
+        velocity: Vertical velocity (m/s)
+        config: Config object (drag, mass and target apogee of predict_apogee)
+        cos_pitch: Cosine of the rocket's tilt from vertical
+
+    Returns:
+        Deployment level from 0 to 1
+    """
+    target_apogee = config.target_apogee
+    rocket_cd = config.apogee_prediction_cd
+
+    # Check bounds (a tilted rocket's Cd / cos_pitch, as an equivalent deployment)
+    retracted, deployed = 0.0, 1.0
+    if cos_pitch != 1.0:
+        retracted = (rocket_cd / cos_pitch - rocket_cd) / config.airbrake_drag
+        deployed = ((rocket_cd + config.airbrake_drag) / cos_pitch - rocket_cd) / config.airbrake_drag
+    if predict_apogee(altitude_agl, velocity, retracted, config) < target_apogee:
+        return 0.0
+    if predict_apogee(altitude_agl, velocity, deployed, config) > target_apogee:
+        return 1.0
+    if velocity <= 0:
+        # Already at apogee, which every deployment predicts
+        return 0.0
+
+    # 0 < r < 1 between the bounds; r -> 1 is the drag-free climb
+    r = 2 * 9.81 * (target_apogee - altitude_agl) / velocity ** 2
+    x = -lambertw(-r * exp(-r), -1).real / r - 1
+
+    k = x * config.burnout_mass * 9.81 / velocity ** 2
+    combined_cd = k / (0.5 * config.air_density * pi * config.rocket_radius ** 2) * cos_pitch
+    deployment = (combined_cd - rocket_cd) / config.airbrake_drag
+
+    # Rounding can step just outside the bounds the checks above guarantee
+    return min(max(deployment, 0.0), 1.0)
@@ -0,0 +1,107 @@
+from bisect import bisect_right
+from time import perf_counter_ns
+
+import numpy as np
+
+# Stages of ControllerBase.controller, in tick order
+STAGES = ('sensors', 'kalman', 'predict_apogee', 'compute_control', 'actuation', 'telemetry')
+SENSORS, KALMAN, PREDICT_APOGEE, COMPUTE_CONTROL, ACTUATION, TELEMETRY = range(len(STAGES))
+
+# Histogram bin edges (ns): 10 log-spaced bins per decade from 100 ns to 100 ms.
+# Bin 0 counts durations below the first edge, the last bin those above the last.
+HISTOGRAM_EDGES_NS = tuple(np.geomspace(1e2, 1e8, 61).tolist())
+NUM_BINS = len(HISTOGRAM_EDGES_NS) + 1
+
+
+class StageTimer:
+    """
+    Per-stage durations of the control tick, as histograms
+
+    The controller calls start() when a tick begins and lap(stage) as each
+    stage ends; a lap is the time since the previous start() or lap(). Only
+    counts per log-spaced bin and the exact total per stage are kept, so memory
+    is fixed however long the flight. Timers from many flights add up with
+    merge() (see from_samples for Monte Carlo results).
+
+    Opt-in through config.profile_control_tick; controllers without a timer
+    skip every hook.
+    """
+
+    __slots__ = ('_mark', '_counts', '_totals')
+
+    def __init__(self):
+        self._mark = 0
+        self._counts = [[0] * NUM_BINS for _ in STAGES]
+        self._totals = [0] * len(STAGES)
+
+    def start(self):
+        """Mark the start of a tick"""
+        self._mark = perf_counter_ns()
+
+    def lap(self, stage):
+        """Attribute the time since the last mark to stage (an index into STAGES)"""
+        now = perf_counter_ns()
+        duration = now - self._mark
+        self._totals[stage] += duration
+        self._counts[stage][bisect_right(HISTOGRAM_EDGES_NS, duration)] += 1
+        self._mark = now
+
+    def histograms(self):
+        """Dict of stage -> counts per bin"""
+        return {stage: np.array(counts, dtype=np.float64) for stage, counts in zip(STAGES, self._counts)}
+
+    def totals(self):
+        """Dict of stage -> total time (s), as one-element arrays"""
+        return {stage: np.array([total / 1e9]) for stage, total in zip(STAGES, self._totals)}
+
+    def merge(self, other):
+        """Add another timer's laps to this one"""
+        for i in range(len(STAGES)):
+            self._totals[i] += other._totals[i]
+            self._counts[i] = [a + b for a, b in zip(self._counts[i], other._counts[i])]
+        return self
+
+    @classmethod
+    def from_samples(cls, histograms, totals):
+        """
+        Combined timer of many flights
+
+        Args:
+            histograms: Per-flight histograms() dicts (e.g. a Monte Carlo
+                        results['stage_time_histogram'])
+            totals: Matching per-flight totals() dicts (results['stage_time_total'])
+        """
+        timer = cls()
+        for histogram, total in zip(histograms, totals):
+            for i, stage in enumerate(STAGES):
+                timer._counts[i] = [a + int(b) for a, b in zip(timer._counts[i], histogram[stage])]
+                timer._totals[i] += int(round(float(total[stage][0]) * 1e9))
+        return timer
+
+    def summary(self):
+        """
+        DataFrame with one row per stage
+
+        Percentiles are the upper edge of the histogram bin they fall in, so
+        they are accurate to the bin width (about 26%).
+        """
+        import pandas as pd
+
+        upper_edges_us = np.append(HISTOGRAM_EDGES_NS, np.inf) / 1e3
+        grand_total = sum(self._totals)
+        rows = []
+        for stage, counts, total in zip(STAGES, self._counts, self._totals):
+            ticks = sum(counts)
+            row = {
+                'Stage': stage,
+                'Ticks': ticks,
+                'Mean_us': total / ticks / 1e3 if ticks else np.nan,
+                'Total_ms': total / 1e6,
+                'Share_pct': 100 * total / grand_total if grand_total else np.nan,
+            }
+            cumulative = np.cumsum(counts)
+            for percentile in (50, 90, 99):
+                name = f'P{percentile}_us'
+                row[name] = upper_edges_us[np.searchsorted(cumulative, ticks * percentile / 100)] if ticks else np.nan
+            rows.append(row)
+        return pd.DataFrame(rows)
@@ -0,0 +1,127 @@
+import numpy as np
+
+# Columns logged on every control tick, in the order record() takes them
+TELEMETRY_COLUMNS = (
+    'time', 'sim_altitude_agl', 'raw_altitude_agl', 'filtered_altitude_agl',
+    'sim_velocity', 'filtered_velocity', 'deployment', 'desired_deployment',
+    'predicted_apogee', 'predicted_apogee_no_brake', 'control_active',
+    'filtered_acceleration', 'error', 'raw_acceleration', 'sim_acceleration',
+)
+
+TELEMETRY_LEVELS = ("full", "summary")
+
+# Decimals kept when telemetry is exported (CSV, DataFrames)
+EXPORT_DECIMALS = 3
+
+INITIAL_CAPACITY = 256
+
+
+class TelemetryRecorder:
+    """
+    Controller log backed by preallocated float64 columns
+
+    Replaces the dict of Python lists the controllers used to append to. Each
+    column is one contiguous row of a (columns, capacity) array that doubles
+    when full, so a tick is one array write and column() is a view, not a copy.
+    Values are stored unrounded; round with EXPORT_DECIMALS when exporting.
+
+    At level "summary" nothing per tick is kept, only the tick count and the
+    last value, minimum and maximum of every column (for bulk Monte Carlo runs).
+
+    Reads like the old dict: recorder['deployment'], recorder.get('time', []),
+    'time' in recorder and recorder.keys() keep working.
+    """
+
+    __slots__ = ('columns', 'level', '_index', '_count', '_buffer', '_last', '_min', '_max')
+
+    def __init__(self, columns=TELEMETRY_COLUMNS, level="full", capacity=INITIAL_CAPACITY):
+        if level not in TELEMETRY_LEVELS:
+            raise ValueError(f"Telemetry level must be one of {TELEMETRY_LEVELS}, got {level!r}")
+        self.columns = tuple(columns)
+        self.level = level
+        self._index = {name: i for i, name in enumerate(self.columns)}
+        self._count = 0
+
+        if level == "full":
+            self._buffer = np.empty((len(self.columns), capacity), dtype=np.float64)
+        else:
+            self._last = np.full(len(self.columns), np.nan)
+            self._min = np.full(len(self.columns), np.inf)
+            self._max = np.full(len(self.columns), -np.inf)
+
+    def record(self, *values):
+        """Log one tick, one value per column in column order"""
+        if self.level == "summary":
+            row = np.asarray(values, dtype=np.float64)
+            self._last = row
+            # fmin/fmax skip NaN entries
+            self._min = np.fmin(self._min, row)
+            self._max = np.fmax(self._max, row)
+        else:
+            if self._count == self._buffer.shape[1]:
+                grown = np.empty((len(self.columns), 2 * self._buffer.shape[1]), dtype=np.float64)
+                grown[:, :self._count] = self._buffer
+                self._buffer = grown
+            self._buffer[:, self._count] = values
+        self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    def column(self, name):
+        """Read-only view of a column's logged values"""
+        if self.level == "summary":
+            raise ValueError(
+                f"Telemetry was recorded at summary level, so '{name}' has no per-tick values.\n"
+                f"Replay the flight with full telemetry to get them."
+            )
+        view = self._buffer[self._index[name], :self._count]
+        view.flags.writeable = False
+        return view
+
+    def last(self, name):
+        """Most recently logged value of a column (NaN before the first tick)"""
+        if self._count == 0:
+            return np.nan
+        if self.level == "summary":
+            return float(self._last[self._index[name]])
+        return float(self._buffer[self._index[name], self._count - 1])
+
+    def max(self, name):
+        """Largest logged value of a column, ignoring NaN (NaN before the first tick)"""
+        if self.level == "summary":
+            value = self._max[self._index[name]]
+            return float(value) if np.isfinite(value) else np.nan
+        column = self.column(name)
+        return float(np.nanmax(column)) if column.size and not np.all(np.isnan(column)) else np.nan
+
+    def min(self, name):
+        """Smallest logged value of a column, ignoring NaN (NaN before the first tick)"""
+        if self.level == "summary":
+            value = self._min[self._index[name]]
+            return float(value) if np.isfinite(value) else np.nan
+        column = self.column(name)
+        return float(np.nanmin(column)) if column.size and not np.all(np.isnan(column)) else np.nan
+
+    def export(self, decimals=EXPORT_DECIMALS):
+        """Dict of rounded column copies, for files and reports"""
+        return {name: np.round(self.column(name), decimals) for name in self.columns}
+
+    # Dict-style access, so code written against the old dict of lists still works
+    def __getitem__(self, name):
+        return self.column(name)
+
+    def get(self, name, default=None):
+        return self.column(name) if name in self._index else default
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def keys(self):
+        return self.columns
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def items(self):
+        return ((name, self.column(name)) for name in self.columns)
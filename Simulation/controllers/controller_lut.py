@@ -0,0 +1,33 @@
+from .controller_base import ControllerBase
+from .controller_functions.deployment_table import load_table
+from .controller_functions.drag_table import cos_pitch_from_quaternion
+from config import Config
+
+
+class ControllerLUT(ControllerBase):
+    """
+    Optimizer controller reading its deployment from a precomputed table
+
+    Same target as ControllerOptimizer (solve_deployment's deployment), but each
+    tick is a bilinear lookup in a DeploymentTable over the filtered altitude
+    and velocity. With a tilted table the rocket's cos(tilt) is taken from the
+    state quaternion, as the flight computer takes it from the IMU.
+    """
+
+    __slots__ = ('table', 'cos_pitch')
+
+    def __init__(self, config: Config):
+        super().__init__(config)
+
+        self.table = load_table(config)
+        self.cos_pitch = 1.0
+
+    def controller(self, time, sampling_rate, state, state_history, observed_variables, air_brakes, sensors):
+        if self.table.cos_pitches is not None:
+            self.cos_pitch = cos_pitch_from_quaternion(state[6], state[7], state[8], state[9])
+        return super().controller(time, sampling_rate, state, state_history, observed_variables, air_brakes, sensors)
+
+    def compute_control(self, filtered_altitude, filtered_velocity, filtered_acceleration,
+                       predicted_apogee_w_brake, predicted_apogee_no_brake,
+                       error_w_brake, error_no_brake, dt):
+        return self.table.lookup(filtered_altitude, filtered_velocity, self.cos_pitch)
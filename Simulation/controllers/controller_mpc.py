@@ -0,0 +1,42 @@
+import numpy as np
+
+from .controller_base import ControllerBase
+from .controller_functions.deployment_rollout import DeploymentRollout
+from config import Config
+
+# Per-tick latency the rollout is sized for (see benchmarks/benchmark_mpc_controller.py),
+# about 1% of a 10 Hz control period so thousand-flight Monte Carlo runs stay cheap
+TICK_BUDGET_US = 1000
+
+
+class ControllerMPC(ControllerBase):
+    """
+    Model-predictive controller over batched deployment rollouts
+
+    Each tick rolls out every candidate profile of a DeploymentRollout from
+    the filtered state and commands the first move of the one with the lowest
+    (apogee - target)^2 + mpc_actuation_weight * deployment travel.
+    """
+
+    __slots__ = ('rollout', 'cost')
+
+    def __init__(self, config: Config):
+        super().__init__(config)
+
+        horizon_steps = max(int(round(config.mpc_horizon * config.sampling_rate)), 1)
+        self.rollout = DeploymentRollout(config, 1 / config.sampling_rate, horizon_steps, config.mpc_levels)
+        self.cost = np.empty(len(self.rollout))
+
+    def compute_control(self, filtered_altitude, filtered_velocity, filtered_acceleration,
+                       predicted_apogee_w_brake, predicted_apogee_no_brake,
+                       error_w_brake, error_no_brake, dt):
+        if filtered_velocity <= 0:
+            # At or past apogee, which every profile predicts
+            return 0.0
+
+        apogees = self.rollout.evaluate(filtered_altitude, filtered_velocity, self.last_deployment)
+        cost = self.cost
+        np.subtract(apogees, self.config.target_apogee, out=cost)
+        np.square(cost, out=cost)
+        cost += self.config.mpc_actuation_weight * self.rollout.travel
+        return float(self.rollout.next_deployment[np.argmin(cost)])
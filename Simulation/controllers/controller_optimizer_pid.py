@@ -1,52 +1,26 @@
 import numpy as np
-from scipy.optimize import minimize_scalar
 
 from .controller_base import ControllerBase
-from .controller_functions.predict_apogee import predict_apogee
+from .controller_functions.solve_deployment import solve_deployment
 from config import Config
 
 
 class ControllerOptimizerPID(ControllerBase):
 
+    __slots__ = ('last_error',)
+
     def __init__(self, config: Config):
         super().__init__(config)
 
         self.last_deployment = 0
-        self.i_error = 0
-        self.i_error_list = []
         self.last_error = 0
-        self.frequency = config.sampling_rate
-        self.i_window = config.i_window
 
     def compute_control(self, filtered_altitude, filtered_velocity, filtered_acceleration,
                        predicted_apogee_w_brake, predicted_apogee_no_brake,
                        error_w_brake, error_no_brake, dt):
-        # Optimizer calculates its own error internally
-
-        def objective(deployment):
-            # Clip deployment to valid range
-            deployment = np.clip(deployment, 0.0, 1.0)
-
-            # Predict apogee with this deployment value
-            pred_apogee = predict_apogee(
-                filtered_altitude,
-                filtered_velocity,
-                deployment,
-                self.config
-            )
-
-            # Return error
-            error = abs(pred_apogee - self.config.target_apogee)
-            return error
-
-        # Solve for optimal deployment using scipy
-        result = minimize_scalar(
-            objective,
-            bounds=(0.0, 1.0),
-            method='bounded'
-        )
-
-        desired_deployment = result.x
+        # Optimizer calculates its own error internally: solve for the
+        # deployment that puts the predicted apogee on target
+        desired_deployment = solve_deployment(filtered_altitude, filtered_velocity, self.config)
 
         # Deadbanding
         if abs(error_w_brake) < self.config.deadband:
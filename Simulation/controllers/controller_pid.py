@@ -1,21 +1,25 @@
 import numpy as np
 
 from .controller_base import ControllerBase
+from .controller_functions.sliding_window import SlidingWindowSum
 from config import Config
 
 
 class ControllerPID(ControllerBase):
 
+    __slots__ = ('i_error', 'i_error_window', 'last_desired_deployment', 'last_error', 'frequency', 'i_window')
+
     def __init__(self, config: Config):
         super().__init__(config)
 
         # PID-specific state
         self.i_error = 0
-        self.i_error_list = []
         self.last_desired_deployment = 0
         self.last_error = 0
         self.frequency = config.sampling_rate
         self.i_window = config.i_window
+        # Integral over the last i_window seconds of ticks
+        self.i_error_window = SlidingWindowSum(self.frequency * self.i_window)
 
     def compute_control(self, filtered_altitude, filtered_velocity, filtered_acceleration,
                        predicted_apogee_w_brake, predicted_apogee_no_brake,
@@ -23,10 +27,10 @@ class ControllerPID(ControllerBase):
         # Use error from predicted apogee with brake
         error = error_w_brake
         # Accumulate integral error with sliding window
-        self.i_error_list.append(error * dt)
+        self.i_error_window.append(error * dt)
         if self.control_active and self.last_time > self.config.burn_time + 1.5:
             # Only integrate when control is active and after motor burn + settling time
-            self.i_error = sum(self.i_error_list[-(self.frequency * self.i_window):])
+            self.i_error = self.i_error_window.sum()
 
         # Calculate error derivative
         d_error = (error - self.last_error) / dt
@@ -1,67 +1,181 @@
 from monte_carlo import run_monte_carlo
 from config import Config
-import csv
 import numpy as np
 import pandas as pd
 import os
 
-burnout_mass_low = 0.525
-burnout_mass_high = 0.625
-n_points = 10
-n_simulations = 1000
-config = Config()
+DATA_POINT_DIR = os.path.join('output', 'mass finder', 'data points')
+SUMMARY_PATH = os.path.join('output', 'mass finder', 'mass_finder_summary.csv')
 
-delta_mass = (burnout_mass_high - burnout_mass_low) / (n_points - 1)
 
-summary_data = []
+def evaluate_mass(burnout_mass, num_simulations, seed, workers=1, warm_start=False):
+    """
+    Monte Carlo of the apogee error with the controllers assuming burnout_mass
 
-# clear data point folder
-for filename in os.listdir("output/mass finder/data points"):
-    file_path = os.path.join("output/mass finder/data points", filename)
-    os.unlink(file_path)
+    Every mass flies the same Sobol samples (common random numbers), so the
+    mean error changes smoothly with mass instead of jumping with sampling
+    noise. Only the apogee predictor reads burnout_mass, so with warm_start
+    every mass shares the cached burnout states and only flies the coast.
+    Asking for more samples at a mass already flown only flies the new ones.
 
-for n in range(n_points):
-
-    print(f"Running data point {n+1} of {n_points}")
-
-    burnout_mass = burnout_mass_low + n * delta_mass
+    Returns:
+        Dict with the mass, its config, results and wall time
+    """
     config = Config(burnout_mass=burnout_mass)
-    monte_carlo, wall_time = run_monte_carlo(config=config, num_simulations=n_simulations)
-
+    monte_carlo, wall_time = run_monte_carlo(config=config, num_simulations=num_simulations, workers=workers,
+                                             seed=seed, warm_start=warm_start, sampler="sobol")
     apogees_agl = np.array(monte_carlo.results['apogee']) - config.env_elevation
     errors = apogees_agl - config.target_apogee + config.apogee_offset
-    deployments = np.array(monte_carlo.results['max_airbrake_deployment'])
+    return {
+        'mass': burnout_mass,
+        'config': config,
+        'apogees_agl': apogees_agl,
+        'errors': errors,
+        'deployments': np.array(monte_carlo.results['max_airbrake_deployment']),
+        'mean_error': np.mean(errors),
+        # 95% confidence interval half-width of the mean error
+        'error_ci': 1.96 * np.std(errors, ddof=1) / np.sqrt(len(errors)),
+        'wall_time': wall_time,
+    }
 
-    # Create detailed CSV for this mass configuration
-    detail_filename = f'data_point_{burnout_mass:.4f}_kg.csv'
-    detail_filepath = os.path.join('output', 'mass finder', 'data points', detail_filename)
 
-    detail_data = {
-        'Simulation': range(1, len(apogees_agl) + 1),
-        'Apogee_AGL_m': apogees_agl + config.apogee_offset,
-        'Error_m': errors,
-        'Deployment_pct': deployments
+def find_burnout_mass(mass_low=0.525, mass_high=0.625, target_error=0.0, mass_tolerance=0.001,
+                      initial_simulations=32, max_simulations=512, seed=0, workers=1, max_iterations=30,
+                      warm_start=False):
+    """
+    Find the burnout mass whose mean apogee error equals target_error
+
+    Illinois (modified regula falsi) iterations on the bracket, at a sample
+    count that doubles whenever the root is pinned down better than the
+    sampling noise allows. After each increase the bracket is narrowed around
+    the current estimate and re-evaluated at the new count.
+
+    Args:
+        mass_low, mass_high: Bracket (kg). The mean error minus target_error must
+                             change sign across it.
+        target_error: Mean apogee error to aim for (m)
+        mass_tolerance: Required precision of the mass (kg), both from the
+                        bracket and from the confidence interval of the mean error
+        initial_simulations: Samples per mass in the first iterations
+        max_simulations: Sample cap per mass
+        seed: Seed shared by every mass (common random numbers)
+        workers: Worker processes per Monte Carlo
+        max_iterations: Cap on solver iterations
+        warm_start: Fly only the coast of each mass from cached burnout states
+                    (see run_monte_carlo)
+
+    Returns:
+        Tuple of (burnout_mass, points), where points maps each evaluated mass
+        to its latest evaluate_mass result
+    """
+    num_simulations = initial_simulations
+    points = {}
+
+    def residual(mass):
+        points[mass] = evaluate_mass(mass, num_simulations, seed, workers, warm_start)
+        return points[mass]['mean_error'] - target_error
+
+    def bracket(low, high):
+        f_low, f_high = residual(low), residual(high)
+        if np.sign(f_low) == np.sign(f_high):
+            raise ValueError(
+                f"Mean error - target ({target_error} m) does not change sign between {low:.4f} kg "
+                f"({f_low:+.3f} m) and {high:.4f} kg ({f_high:+.3f} m) at {num_simulations} samples.\n"
+                f"Widen the mass bracket."
+            )
+        return low, high, f_low, f_high
+
+    low, high, f_low, f_high = bracket(mass_low, mass_high)
+    retained_side = 0
+
+    for iteration in range(max_iterations):
+        mass = high - f_high * (high - low) / (f_high - f_low)
+        f_mass = residual(mass)
+        print(f"Iteration {iteration + 1}: {mass:.5f} kg -> mean error {points[mass]['mean_error']:+.3f} "
+              f"± {points[mass]['error_ci']:.3f} m ({num_simulations} samples)")
+
+        # Illinois step: halve the residual of an end kept twice in a row
+        if np.sign(f_mass) == np.sign(f_high):
+            high, f_high = mass, f_mass
+            if retained_side == -1:
+                f_low /= 2
+            retained_side = -1
+        else:
+            low, f_low = mass, f_mass
+            if retained_side == 1:
+                f_high /= 2
+            retained_side = 1
+
+        if high - low > mass_tolerance and abs(f_mass) > 0.1 * points[mass]['error_ci']:
+            continue
+
+        # Converged at this sample count; check the mass against the sampling noise
+        slope = (points[high]['mean_error'] - points[low]['mean_error']) / (high - low)
+        mass_uncertainty = points[mass]['error_ci'] / abs(slope) if slope != 0 else np.inf
+        if mass_uncertainty <= mass_tolerance or num_simulations >= max_simulations:
+            break
+
+        num_simulations = min(2 * num_simulations, max_simulations)
+        window = max(4 * mass_uncertainty, mass_tolerance)
+        try:
+            low, high, f_low, f_high = bracket(max(mass - window, mass_low), min(mass + window, mass_high))
+        except ValueError:
+            low, high, f_low, f_high = bracket(mass_low, mass_high)
+        retained_side = 0
+
+    return mass, points
+
+
+def summary_row(point, detail_filename):
+    """Summary CSV row of one evaluated mass"""
+    config = point['config']
+    return {
+        'Burnout_Mass_kg': point['mass'],
+        'Mean_Apogee_m': np.mean(point['apogees_agl']) + config.apogee_offset,
+        'Std_Apogee_m': np.std(point['apogees_agl']),
+        'Mean_Error_m': point['mean_error'],
+        'Mean_Deployment_pct': np.mean(point['deployments']),
+        'Simulations': len(point['errors']),
+        'Mean_Error_CI_m': point['error_ci'],
+        'Detail_File': detail_filename,
+        'Wall_Time': point['wall_time']
     }
 
-    detail_df = pd.DataFrame(detail_data)
-    detail_df.to_csv(detail_filepath, index=False)
 
-    # Add summary statistics to summary data
-    summary_data.append({
-        'Burnout_Mass_kg': burnout_mass,
-        'Mean_Apogee_m': np.mean(apogees_agl) + config.apogee_offset,
-        'Std_Apogee_m': np.std(apogees_agl),
-        'Mean_Error_m': np.mean(errors),
-        'Mean_Deployment_pct': np.mean(deployments),
-        'Detail_File': detail_filename,
-        'Wall_Time': wall_time
-    })
+# Guarded so worker processes can re-import this module safely
+if __name__ == "__main__":
+    burnout_mass_low = 0.525
+    burnout_mass_high = 0.625
+    n_workers = os.cpu_count() or 1
+
+    burnout_mass, points = find_burnout_mass(burnout_mass_low, burnout_mass_high, workers=n_workers)
+
+    # clear data point folder
+    for filename in os.listdir(DATA_POINT_DIR):
+        file_path = os.path.join(DATA_POINT_DIR, filename)
+        os.unlink(file_path)
+
+    summary_data = []
+    for index, mass in enumerate(sorted(points)):
+        point = points[mass]
 
+        # Create detailed CSV for this mass configuration; the refinement evaluates
+        # masses closer than 1e-4 kg, so the name also carries the point's index
+        detail_filename = f'data_point_{index:02d}_{mass:.5f}_kg.csv'
+        detail_df = pd.DataFrame({
+            'Simulation': range(1, len(point['apogees_agl']) + 1),
+            'Apogee_AGL_m': point['apogees_agl'] + point['config'].apogee_offset,
+            'Error_m': point['errors'],
+            'Deployment_pct': point['deployments']
+        })
+        detail_df.to_csv(os.path.join(DATA_POINT_DIR, detail_filename), index=False)
 
+        summary_data.append(summary_row(point, detail_filename))
 
-# Write summary CSV
-summary_df = pd.DataFrame(summary_data)
-summary_filepath = os.path.join('output', 'mass finder', 'mass_finder_summary.csv')
-summary_df.to_csv(summary_filepath, index=False)
+    # Write summary CSV
+    summary_df = pd.DataFrame(summary_data)
+    summary_df.to_csv(SUMMARY_PATH, index=False)
 
-print(f"Mass finder complete. Summary saved to {summary_filepath}")
\ No newline at end of file
+    total_flights = sum(len(point['errors']) for point in points.values())
+    print(f"Burnout mass for zero mean error: {burnout_mass:.4f} kg ({len(points)} masses, {total_flights} flights)")
+    print(f"Mass finder complete. Summary saved to {SUMMARY_PATH}")
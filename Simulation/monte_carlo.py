@@ -1,226 +1,342 @@
+import copy
 import sys
 from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 import time
-from rocketpy import MonteCarlo
-from rocketpy.stochastic import (
-    StochasticEnvironment,
-    StochasticRocket,
-    StochasticFlight,
-    StochasticGenericMotor
-)
 
 script_dir = Path(__file__).parent
 sys.path.insert(0, str(script_dir))
 
 from config import Config
-from controller import Control
-from simulation_functions.setup_environment import setup_environment
-from simulation_functions.setup_rocket import setup_rocket
-
-class CustomStochasticRocket(StochasticRocket):
-    def __init__(self, rocket, controller_class, config, *args, **kwargs):
-        super().__init__(rocket, *args, **kwargs)
-        self.controller_class = controller_class
-        self.config = config
-        self._airbrake_config = {
-            'drag_coefficient_curve': config.airbrake_drag_curve_file,
-            'sampling_rate': config.sampling_rate,
-            'reference_area': 3.14159 * (config.rocket_radius ** 2),
-            'clamp': True,
-            'initial_observed_variables': [0],
-            'override_rocket_drag': False,
-            'name': "Air Brakes",
-        }
-
-    def create_object(self):
-        new_rocket = super().create_object()
-        from rocketpy import Barometer, Accelerometer
-        import pandas as pd
-
-        barometer = Barometer(
-            sampling_rate=self.config.sampling_rate,
-            measurement_range=self.config.barometer_range,
-            resolution=self.config.barometer_resolution,
-            noise_density=self.config.barometer_noise_density,
-            noise_variance=self.config.barometer_noise_variance,
-            random_walk_density=self.config.barometer_random_walk_density,
-            constant_bias=self.config.barometer_constant_bias,
-            operating_temperature=self.config.barometer_operating_temperature,
-            temperature_bias=self.config.barometer_temperature_bias,
-            temperature_scale_factor=self.config.barometer_temperature_scale_factor,
-            name="Barometer"
-        )
-        new_rocket.add_sensor(barometer, position=(0, 0, self.config.barometer_position))
-
-        accelerometer = Accelerometer(
-            sampling_rate=self.config.sampling_rate,
-            measurement_range=self.config.accel_range,
-            resolution=self.config.accel_resolution,
-            noise_density=self.config.accel_noise_density,
-            noise_variance=self.config.accel_noise_variance,
-            random_walk_density=self.config.accel_random_walk_density,
-            constant_bias=self.config.accel_constant_bias,
-            operating_temperature=self.config.accel_operating_temp,
-            temperature_bias=self.config.accel_temperature_bias,
-            temperature_scale_factor=self.config.accel_temperature_scale_factor,
-            cross_axis_sensitivity=self.config.accel_cross_axis_sensitivity,
-            name="Accelerometer"
-        )
-        new_rocket.add_sensor(accelerometer, position=(0, 0, self.config.accele_position))
-
-        # Apply variance to airbrake drag coefficient
-        airbrake_cd_multiplier = np.random.normal(1.0, self.config.airbrake_cd_std)
-
-        # Load and modify airbrake drag curve
-        drag_curve_file = self._airbrake_config['drag_coefficient_curve']
-        df = pd.read_csv(drag_curve_file)
-        # Multiply the drag coefficient values (second column) by the random multiplier
-        df.iloc[:, 1] = df.iloc[:, 1] * airbrake_cd_multiplier
-        # Convert to list of [deployment, drag_coefficient] pairs
-        modified_drag_curve = df.values.tolist()
-
-        controller_instance = self.controller_class(self.config)
-
-        # Store controller instance on rocket for later access
-        new_rocket._controller_instance = controller_instance
-
-        new_rocket.add_air_brakes(
-            drag_coefficient_curve=modified_drag_curve,
-            controller_function=controller_instance.controller,
-            sampling_rate=self._airbrake_config['sampling_rate'],
-            reference_area=self._airbrake_config['reference_area'],
-            clamp=self._airbrake_config['clamp'],
-            initial_observed_variables=self._airbrake_config['initial_observed_variables'],
-            override_rocket_drag=self._airbrake_config['override_rocket_drag'],
-            name=self._airbrake_config['name'],
-        )
+from simulation_functions.setup_stochastic import setup_stochastic_models
+from simulation_functions.monte_carlo_runner import run_samples, nominal_inputs, controller_configs, replay_sample
+from simulation_functions.monte_carlo_store import MonteCarloStore, default_run_dir, append_paired
+from simulation_functions.convergence import ConvergenceMonitor, OUTPUTS as CONVERGENCE_OUTPUTS
+from simulation_functions.sampling import sampler_name, parse_sampler_name
+from controller import CONTROLLERS
+from controllers.controller_functions.stage_timer import StageTimer
+
+# Written to the run directory of batches run with config.profile_control_tick
+STAGE_TIMING_NAME = "stage_timing.csv"
+
+def run_monte_carlo(config, num_simulations=100, workers=1, seed=None, run_dir=None, chunk_size=50,
+                    input_log="compact", warm_start=False, sampler="random", collect="timeseries"):
+    """
+    Run a Monte Carlo batch into a resumable run directory and load its results
+
+    Results are appended to the run's store every chunk_size samples. Calling this
+    again for the same run only simulates the samples that are not stored yet.
+
+    Args:
+        config: Config object
+        num_simulations: Number of samples
+        workers: Number of worker processes. Each worker rebuilds its own stochastic
+                 models and controllers. Results do not depend on this value.
+        seed: Base seed. Sample i always uses a stream derived from (seed, i), so a
+              run is reproducible from its seed. If None, the seed of an existing run
+              in run_dir is reused, or a fresh seed is drawn.
+        run_dir: Run directory. Defaults to output/monte_carlo/<controller>_<config hash>
+                 (with _seed<seed> appended when a seed is given).
+        chunk_size: Samples per stored chunk
+        input_log: "compact" stores the nominal inputs once and only the sampled
+                   scalars per sample. "full" writes RocketPy's complete inputs
+                   dict per sample as JSON (large, slow to load).
+        warm_start: Start each flight from a cached state at coast lockout, so only
+                    the coast is integrated when the same samples are flown again
+                    (e.g. sweeping gains or target_apogee). The cache lives in
+                    output/monte_carlo/burnout_cache.
+        sampler: "random" draws every input pseudo-randomly. "sobol" and "lhs" draw
+                 the sampled inputs from a scrambled Sobol sequence or a Latin
+                 hypercube, which gives stable statistics with fewer flights.
+                 Sobol runs can be extended; an LHS design is built for exactly
+                 num_simulations samples.
+        collect: "timeseries" stores every sample's deployment time series.
+                 "summary" keeps only the scalar outputs; use
+                 replay_monte_carlo_sample for the full telemetry of any sample.
+
+    Returns:
+        Tuple of (monte_carlo, wall_time), where monte_carlo is a MonteCarloResults
+    """
+    start_time = time.time()
+
+    design_size = num_simulations if sampler == "lhs" else None
+    if run_dir is None:
+        run_dir = default_run_dir(config, seed, sampler=sampler_name(sampler, design_size), collect=collect)
+    store = MonteCarloStore(run_dir)
+    seed = store.open(config, seed, input_log, warm_start, sampler_name(sampler, design_size), collect)
+    print(f"Monte Carlo seed: {seed} | Run directory: {run_dir}")
+
+    if input_log == "compact" and not store.nominal_inputs_path.exists():
+        store.write_nominal_inputs(nominal_inputs(setup_stochastic_models(config)))
+
+    completed = store.num_completed()
+    if completed < num_simulations:
+        if completed:
+            print(f"Resuming after {completed} stored samples")
+        store.append(run_samples(config, seed, range(completed, num_simulations), workers=workers,
+                                 input_log=input_log, warm_start=warm_start, sampler=sampler,
+                                 design_size=design_size, collect=collect), chunk_size)
+
+    monte_carlo = store.load(num_simulations)
+    if config.profile_control_tick:
+        export_stage_timing(monte_carlo, Path(run_dir) / STAGE_TIMING_NAME)
+
+    end_time = time.time()
+    wall_time = end_time - start_time
+
+    return monte_carlo, wall_time
 
-        return new_rocket
 
-def run_monte_carlo(config, num_simulations=100):
+def export_stage_timing(monte_carlo, path):
+    """
+    Write the control tick stage timing of a profiled batch to CSV
+
+    Combines every sample's histograms (config.profile_control_tick) into one
+    StageTimer and writes its summary, one row per stage.
+
+    Returns:
+        The combined StageTimer
+    """
+    timer = StageTimer.from_samples(monte_carlo.results['stage_time_histogram'],
+                                    monte_carlo.results['stage_time_total'])
+    timer.summary().to_csv(path, index=False)
+    print(f"Stage timing saved to {path}")
+    return timer
+
+def run_adaptive_monte_carlo(config, max_simulations=1000, batch_size=50, apogee_tolerance=1.0,
+                             apogee_std_tolerance=None, deployment_tolerance=0.02, confidence=0.95,
+                             min_simulations=100, workers=1, seed=None, run_dir=None, input_log="compact",
+                             warm_start=False, sampler="random", collect="timeseries"):
+    """
+    Run a Monte Carlo in batches until the requested precision is reached
+
+    After every batch the confidence intervals of the apogee error and max
+    deployment statistics are checked (see ConvergenceMonitor), and the run
+    stops once all of them are narrow enough or max_simulations is reached.
+    Batches go to the same resumable store as run_monte_carlo, so a later
+    call with tighter tolerances continues where this one stopped.
+
+    Args:
+        config: Config object
+        max_simulations: Sample budget
+        batch_size: Samples simulated between convergence checks (and per stored chunk)
+        apogee_tolerance, apogee_std_tolerance, deployment_tolerance, confidence,
+        min_simulations: Stopping rule, see ConvergenceMonitor
+        workers, seed, run_dir, input_log, warm_start, collect: See run_monte_carlo
+        sampler: "random" or "sobol". LHS designs cannot grow batch by batch.
+
+    Returns:
+        Tuple of (monte_carlo, wall_time, convergence), where convergence is the
+        ConvergenceMonitor of the run
+    """
     start_time = time.time()
-    nominal_controller = Control(config)
-    environment = setup_environment(config)
-    rocket, motor = setup_rocket(config, nominal_controller.controller)
-
-    from rocketpy import Flight
-    nominal_flight = Flight(
-        rocket=rocket,
-        environment=environment,
-        rail_length=config.rail_length,
-        inclination=90,
-        heading=0,
-        terminate_on_apogee=config.terminate_on_apogee
-    )
 
-    # Wind configuration: supports both normal and uniform distributions
-    # For normal: wind_std = (multiplier, std)
-    # For uniform: wind_std = (min, max, "uniform")
-    if len(config.wind_std) == 3 and config.wind_std[2] == "uniform":
-        # Uniform distribution: (min, max, "uniform")
-        wind_min, wind_max = config.wind_std[0], config.wind_std[1]
-        stochastic_env = StochasticEnvironment(
-            environment=environment,
-            wind_velocity_x_factor=(wind_min, wind_max, "uniform"),
-            wind_velocity_y_factor=(wind_min, wind_max, "uniform"),
-        )
-    else:
-        # Normal distribution: (multiplier, std)
-        wind_multiplier, wind_std = config.wind_std
-        stochastic_env = StochasticEnvironment(
-            environment=environment,
-            wind_velocity_x_factor=(wind_multiplier, wind_std),
-            wind_velocity_y_factor=(wind_multiplier, wind_std),
+    if sampler == "lhs":
+        raise ValueError("An LHS design is fixed to its sample count. Use sampler='sobol' for adaptive runs.")
+    if run_dir is None:
+        run_dir = default_run_dir(config, seed, sampler=sampler_name(sampler), collect=collect)
+    monitor = ConvergenceMonitor(config, apogee_tolerance, apogee_std_tolerance, deployment_tolerance,
+                                 confidence, min_simulations)
+
+    store = MonteCarloStore(run_dir)
+    seed = store.open(config, seed, input_log, warm_start, sampler_name(sampler), collect)
+    print(f"Monte Carlo seed: {seed} | Run directory: {run_dir}")
+
+    if input_log == "compact" and not store.nominal_inputs_path.exists():
+        store.write_nominal_inputs(nominal_inputs(setup_stochastic_models(config)))
+
+    completed = store.num_completed()
+    if completed:
+        print(f"Resuming after {completed} stored samples")
+
+    # Each check only reads the chunks written since the last one. A resumed run
+    # may hold more samples than the check needs; the rest wait in pending.
+    pending = {key: np.empty(0) for key in CONVERGENCE_OUTPUTS}
+    chunks_read = 0
+    num_simulations = 0
+    while True:
+        num_simulations = min(num_simulations + batch_size, max_simulations)
+        if completed < num_simulations:
+            store.append(run_samples(config, seed, range(completed, num_simulations), workers=workers,
+                                     input_log=input_log, warm_start=warm_start, sampler=sampler,
+                                     collect=collect), batch_size)
+            completed = num_simulations
+
+        if monitor.num_samples + len(pending['apogee']) < num_simulations:
+            new_outputs, num_chunks = store.load_outputs(CONVERGENCE_OUTPUTS, chunks_read)
+            chunks_read += num_chunks
+            pending = {key: np.concatenate((pending[key], new_outputs[key])) for key in pending}
+        batch = num_simulations - monitor.num_samples
+        monitor.update({key: values[:batch] for key, values in pending.items()})
+        pending = {key: values[batch:] for key, values in pending.items()}
+
+        print(monitor.status())
+        if monitor.converged():
+            print(f"Converged after {num_simulations} samples")
+            break
+        if num_simulations >= max_simulations:
+            print(f"Sample budget of {max_simulations} reached before convergence")
+            break
+
+    monte_carlo = store.load(num_simulations)
+    if config.profile_control_tick:
+        export_stage_timing(monte_carlo, Path(run_dir) / STAGE_TIMING_NAME)
+
+    end_time = time.time()
+    wall_time = end_time - start_time
+
+    return monte_carlo, wall_time, monitor
+
+def run_paired_monte_carlo(config, controllers, num_simulations=100, workers=1, seed=None, run_dir=None,
+                           chunk_size=50, input_log="compact", warm_start=False, sampler="random",
+                           collect="timeseries"):
+    """
+    Fly every controller against the same sampled inputs (common random numbers)
+
+    Each sample is drawn once and flown once per controller, sharing the
+    environment, airframe and motor construction. With warm_start, the burn up to
+    coast lockout is also flown only once per sample. Results are stored per
+    controller under run_dir/<controller>, each a normal resumable run that
+    load_monte_carlo can read.
+
+    Args:
+        config: Config object (control_algorithm is replaced per controller)
+        controllers: Control algorithm names, e.g. ("BANGBANG", "OPTIMIZERPID", "PID")
+        num_simulations, workers, seed, chunk_size, input_log, warm_start, sampler, collect: See run_monte_carlo
+        run_dir: Run directory. Defaults to output/monte_carlo/paired_<config hash>
+                 (with _seed<seed> appended when a seed is given).
+
+    Returns:
+        Tuple of (dict of controller name -> MonteCarloResults, wall_time)
+    """
+    start_time = time.time()
+
+    unknown = [name for name in controllers if name.upper() not in CONTROLLERS]
+    if unknown:
+        raise ValueError(
+            f"Unknown control algorithm(s): {', '.join(unknown)}. "
+            f"Available options: {', '.join(CONTROLLERS)}"
         )
 
-    nominal_impulse = motor.total_impulse
-    stochastic_motor = StochasticGenericMotor(
-        generic_motor=motor,
-        total_impulse=(nominal_impulse, config.impulse_std),
-    )
+    design_size = num_simulations if sampler == "lhs" else None
+    if run_dir is None:
+        run_dir = default_run_dir(config, seed, prefix="paired", sampler=sampler_name(sampler, design_size),
+                                  collect=collect)
+    configs = controller_configs(config, controllers)
+    stores = [MonteCarloStore(Path(run_dir) / name.lower()) for name in controllers]
+
+    # The first store fixes the seed, the others must agree with it
+    for store, controller_config in zip(stores, configs):
+        seed = store.open(controller_config, seed, input_log, warm_start, sampler_name(sampler, design_size),
+                          collect)
+    print(f"Monte Carlo seed: {seed} | Run directory: {run_dir}")
+
+    if input_log == "compact" and not all(store.nominal_inputs_path.exists() for store in stores):
+        nominal = nominal_inputs(setup_stochastic_models(config))
+        for store in stores:
+            store.write_nominal_inputs(nominal)
+
+    completed = min(store.num_completed() for store in stores)
+    if completed < num_simulations:
+        if completed:
+            print(f"Resuming after {completed} stored samples")
+        append_paired(stores, run_samples(config, seed, range(completed, num_simulations), workers=workers,
+                                          input_log=input_log, controllers=controllers,
+                                          warm_start=warm_start, sampler=sampler,
+                                          design_size=design_size, collect=collect), chunk_size)
+
+    results = {name: store.load(num_simulations) for name, store in zip(controllers, stores)}
 
-    stochastic_rocket = CustomStochasticRocket(
-        rocket=rocket,
-        controller_class=Control,
-        config=config,
-        mass=(config.dry_mass, config.mass_std),
-        center_of_mass_without_motor=(config.com_no_motor, config.com_std),
-        power_off_drag_factor=(1.0, config.rocket_cd_std),
-        power_on_drag_factor=(1.0, config.rocket_cd_std),
-    )
+    end_time = time.time()
+    wall_time = end_time - start_time
 
-    stochastic_rocket.add_motor(stochastic_motor, position=config.motor_position)
+    return results, wall_time
 
-    stochastic_flight = StochasticFlight(
-        flight=nominal_flight,
-        inclination=(90, 0),
-        heading=(0, 0),
-    )
+def paired_differences(results, config):
+    """
+    Paired comparison of absolute apogee error for every pair of controllers
+
+    Both controllers flew the same samples, so the per-sample difference cancels
+    the shared variation (wind, impulse, mass, ...) and ranks them with far
+    fewer samples than comparing two independent distributions.
 
-    def get_max_deployment(flight):
-        """Extract max airbrake deployment from controller data"""
-        try:
-            # Access controller instance directly from rocket
-            if hasattr(flight.rocket, '_controller_instance'):
-                controller_instance = flight.rocket._controller_instance
-                if hasattr(controller_instance, 'data') and 'deployment' in controller_instance.data:
-                    deployments = controller_instance.data['deployment']
-                    if deployments:
-                        valid_deployments = [d for d in deployments if isinstance(d, (int, float)) and not np.isnan(d)]
-                        if valid_deployments:
-                            return float(max(valid_deployments))
-
-            return 0.0
-
-        except Exception as e:
-            print(f"Error in get_max_deployment: {e}")
-            return 0.0
-
-    def get_deployment_timeseries(flight):
-        """Extract deployment time series from controller data"""
-        try:
-            # Access controller instance directly from rocket
-            if hasattr(flight.rocket, '_controller_instance'):
-                controller_instance = flight.rocket._controller_instance
-                if hasattr(controller_instance, 'data'):
-                    time_data = controller_instance.data.get('time', [])
-                    deployment_data = controller_instance.data.get('deployment', [])
-                    if time_data and deployment_data:
-                        return {'time': list(time_data), 'deployment': list(deployment_data)}
-
-            return {'time': [], 'deployment': []}
-
-        except Exception as e:
-            print(f"Error in get_deployment_timeseries: {e}")
-            return {'time': [], 'deployment': []}
-
-    data_collector = {
-        'max_airbrake_deployment': get_max_deployment,
-        'deployment_timeseries': get_deployment_timeseries,
+    Args:
+        results: Dict of controller name -> MonteCarloResults from run_paired_monte_carlo
+        config: Config object
+
+    Returns:
+        DataFrame with one row per controller pair (A, B). Negative differences
+        mean A lands closer to the target.
+    """
+    import pandas as pd
+
+    target = config.target_apogee - config.apogee_offset
+    abs_errors = {
+        name: np.abs(np.asarray(monte_carlo.results['apogee']) - config.env_elevation - target)
+        for name, monte_carlo in results.items()
     }
 
-    # Create output directory for Monte Carlo files
-    mc_output_dir = Path("output/monte_carlo")
-    mc_output_dir.mkdir(parents=True, exist_ok=True)
+    rows = []
+    names = list(results)
+    for i, name_a in enumerate(names):
+        for name_b in names[i + 1:]:
+            differences = abs_errors[name_a] - abs_errors[name_b]
+            n = len(differences)
+            mean = np.mean(differences)
+            std = np.std(differences, ddof=1) if n > 1 else np.nan
+            standard_error = std / np.sqrt(n)
+            rows.append({
+                'Controller_A': name_a,
+                'Controller_B': name_b,
+                'Samples': n,
+                'Mean_Abs_Error_Diff_m': mean,
+                'Std_Diff_m': std,
+                'CI95_Low_m': mean - 1.96 * standard_error,
+                'CI95_High_m': mean + 1.96 * standard_error,
+                'A_Better_Fraction': np.mean(differences < 0),
+            })
+
+    return pd.DataFrame(rows)
+
+def load_monte_carlo(run_dir, num_simulations=None):
+    """Load a stored Monte Carlo run without simulating anything"""
+    return MonteCarloStore(run_dir).load(num_simulations)
+
+def replay_monte_carlo_sample(run_dir, sample_index, config=None):
+    """
+    Fly one sample of a stored run again, by itself, with full telemetry
 
-    monte_carlo = MonteCarlo(
-        filename=str(mc_output_dir / "results"),
-        environment=stochastic_env,
-        rocket=stochastic_rocket,
-        flight=stochastic_flight,
-        data_collector=data_collector,
-    )
+    The seed, controller, sampler and warm start mode come from the run's
+    manifest, so batches can collect summaries only and any outlier can be
+    traced afterwards.
 
-    monte_carlo.simulate(number_of_simulations=num_simulations, append=False)
+    Args:
+        run_dir: Run directory (for paired runs, the controller's subdirectory)
+        sample_index: Index of the sample to replay
+        config: Config the run was made with (Config() if None). Its
+                control_algorithm is taken from the manifest.
 
-    end_time = time.time()
-    wall_time = end_time - start_time
+    Returns:
+        SampleReplay with the Flight, inputs, outputs, controller telemetry
+        and sensor data of the sample
+    """
+    manifest = MonteCarloStore(run_dir).read_manifest()
+    if manifest is None:
+        raise FileNotFoundError(f"No Monte Carlo run found in {run_dir}")
 
-    return monte_carlo, wall_time
+    config = copy.copy(config if config is not None else Config())
+    config.control_algorithm = manifest['controller']
+    kind, design_size = parse_sampler_name(manifest.get('sampler', "random"))
+
+    return replay_sample(config, manifest['seed'], sample_index, warm_start=manifest.get('warm_start', False),
+                         sampler=kind, design_size=design_size, expected_config_hash=manifest['config_hash'])
 
 def create_plot(monte_carlo, config):
+    # Also accepts a run directory
+    if isinstance(monte_carlo, (str, Path)):
+        monte_carlo = load_monte_carlo(monte_carlo)
+
     output_dir = Path("output")
     output_dir.mkdir(exist_ok=True)
 
@@ -236,8 +352,12 @@ def create_plot(monte_carlo, config):
         'Error_m': apogees_agl - config.target_apogee + config.apogee_offset,
     }
 
-    # Extract stochastic input parameters from inputs_log
-    if hasattr(monte_carlo, 'inputs_log') and monte_carlo.inputs_log:
+    # Extract stochastic input parameters, straight from the columns when logged compactly
+    if getattr(monte_carlo, 'inputs', None):
+        for key, values in monte_carlo.inputs.items():
+            if key != 'index':
+                csv_data[key] = values
+    elif hasattr(monte_carlo, 'inputs_log') and monte_carlo.inputs_log:
         # inputs_log is a list of dictionaries, one per simulation
         for key in monte_carlo.inputs_log[0].keys():
             # Extract each parameter across all simulations
@@ -318,21 +438,21 @@ def create_plot(monte_carlo, config):
         plt.savefig(deployment_plot_path, dpi=150, bbox_inches='tight')
         plt.close('all')
 
-def compare_monte_carlo(num):
+def compare_monte_carlo(num, workers=1, seed=None):
     config = Config()
 
-    # Run Monte Carlo simulations with different control algorithms
-    print("Running Monte Carlo with BANGBANG controller...")
-    config.control_algorithm = "BANGBANG"
-    monte_carlo1, wall_time1 = run_monte_carlo(config=config, num_simulations=num)
-
-    print("Running Monte Carlo with OPTIMIZERPID controller...")
-    config.control_algorithm = "OPTIMIZERPID"
-    monte_carlo2, wall_time2 = run_monte_carlo(config=config, num_simulations=num)
-
-    print("Running Monte Carlo with PID controller...")
-    config.control_algorithm = "PID"
-    monte_carlo3, wall_time3 = run_monte_carlo(config=config, num_simulations=num)
+    # Every controller flies the same sampled inputs, so differences are paired
+    print("Running paired Monte Carlo with BANGBANG, OPTIMIZERPID and PID controllers...")
+    results, wall_time = run_paired_monte_carlo(
+        config=config,
+        controllers=("BANGBANG", "OPTIMIZERPID", "PID"),
+        num_simulations=num,
+        workers=workers,
+        seed=seed,
+    )
+    monte_carlo1 = results["BANGBANG"]
+    monte_carlo2 = results["OPTIMIZERPID"]
+    monte_carlo3 = results["PID"]
 
     output_dir = Path("output")
     output_dir.mkdir(exist_ok=True)
@@ -471,22 +591,33 @@ def compare_monte_carlo(num):
     print(f"  Mean Apogee: {np.mean(apogees_agl_1):.2f} m")
     print(f"  Std Dev: {np.std(apogees_agl_1):.2f} m")
     print(f"  Mean Error: {np.mean(apogees_agl_1) - (config.target_apogee - config.apogee_offset):.2f} m")
-    print(f"  Wall Time: {wall_time1:.2f} s")
 
     print(f"\nOPTIMIZERPID:")
     print(f"  Mean Apogee: {np.mean(apogees_agl_2):.2f} m")
     print(f"  Std Dev: {np.std(apogees_agl_2):.2f} m")
     print(f"  Mean Error: {np.mean(apogees_agl_2) - (config.target_apogee - config.apogee_offset):.2f} m")
-    print(f"  Wall Time: {wall_time2:.2f} s")
 
     print(f"\nPID:")
     print(f"  Mean Apogee: {np.mean(apogees_agl_3):.2f} m")
     print(f"  Std Dev: {np.std(apogees_agl_3):.2f} m")
     print(f"  Mean Error: {np.mean(apogees_agl_3) - (config.target_apogee - config.apogee_offset):.2f} m")
-    print(f"  Wall Time: {wall_time3:.2f} s")
+
+    # Paired differences of absolute error (negative: A lands closer to target)
+    paired_df = paired_differences(results, config)
+    paired_csv_path = output_dir / "monte_carlo_comparison_paired.csv"
+    paired_df.to_csv(paired_csv_path, index=False)
+
+    print(f"\nPaired |error| differences (A - B):")
+    for _, row in paired_df.iterrows():
+        print(f"  {row['Controller_A']} - {row['Controller_B']}: {row['Mean_Abs_Error_Diff_m']:+.3f} m "
+              f"(95% CI {row['CI95_Low_m']:+.3f} to {row['CI95_High_m']:+.3f} m, "
+              f"A better in {row['A_Better_Fraction'] * 100:.0f}% of samples)")
+
+    print(f"\nWall Time: {wall_time:.2f} s")
 
     print(f"\nOutput files:")
     print(f"  - {output_dir / 'monte_carlo_comparison_2.csv'}")
+    print(f"  - {paired_csv_path}")
     print(f"  - {output_dir / 'monte_carlo_comparison_apogee.png'}")
     print(f"  - {output_dir / 'monte_carlo_comparison_deployment.png'}")
 
@@ -0,0 +1,62 @@
+import numpy as np
+from rocketpy import Function
+
+
+def load_airbrake_drag_curve(csv_path):
+    """
+    Load and validate the airbrake drag curve once
+
+    Args:
+        csv_path: Path to CSV with deployment_level, mach and cd columns (one header row)
+
+    Returns:
+        Read-only (n, 3) array of [deployment_level, mach, cd] rows
+    """
+    table = np.loadtxt(csv_path, delimiter=',', skiprows=1, ndmin=2)
+
+    if table.shape[1] != 3:
+        raise ValueError(
+            f"Airbrake drag curve {csv_path} must have 3 columns "
+            f"(deployment_level, mach, cd), found {table.shape[1]}"
+        )
+    if not np.all(np.isfinite(table)):
+        raise ValueError(f"Airbrake drag curve {csv_path} contains non-numeric values")
+    if np.any(table[:, 0] < 0) or np.any(table[:, 0] > 1):
+        raise ValueError(f"Airbrake drag curve {csv_path} has deployment levels outside 0-1")
+    if np.any(table[:, 2] < 0):
+        raise ValueError(f"Airbrake drag curve {csv_path} has negative drag coefficients")
+
+    table.setflags(write=False)
+    return table
+
+
+def create_drag_coefficient_function(table):
+    """RocketPy Function over (deployment level, mach), built once and shared by every sample"""
+    return Function(table, inputs=["Deployment Level", "Mach"], outputs="Drag Coefficient")
+
+
+class ScaledDragCoefficient:
+    """
+    Airbrake drag coefficient scaled by a per-sample Cd multiplier
+
+    Stands in for AirBrakes.drag_coefficient. The shared Function is never copied,
+    the multiplier is applied on each evaluation instead.
+    """
+
+    def __init__(self, drag_coefficient, multiplier):
+        self.drag_coefficient = drag_coefficient
+        self.multiplier = multiplier
+        self._get_value_opt = drag_coefficient.get_value_opt
+
+    def get_value_opt(self, deployment_level, mach):
+        # Called by Flight on every derivative evaluation while the airbrakes are deployed
+        return self.multiplier * self._get_value_opt(deployment_level, mach)
+
+    def __call__(self, deployment_level, mach):
+        return self.multiplier * self.drag_coefficient(deployment_level, mach)
+
+    def __getattr__(self, name):
+        # Anything else (plots, prints, source, ...) comes from the nominal Function
+        if name in ('drag_coefficient', '_get_value_opt'):
+            raise AttributeError(name)
+        return getattr(self.drag_coefficient, name)
@@ -0,0 +1,322 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+from rocketpy import Flight
+from rocketpy.mathutils.vector_matrix import Vector
+
+from simulation_functions.monte_carlo_store import config_values, values_hash
+
+BURNOUT_CACHE_DIR = "output/monte_carlo/burnout_cache"
+
+# Config values only read by the controllers. Changing them cannot change the
+# flight before coast lockout, so they are left out of the cache key.
+CONTROLLER_CONFIG_FIELDS = {
+    'control_algorithm', 'deployment_file_path', 'deployment_file_time_col',
+    'deployment_file_deployment_col', 'deployment_file_time_unit', 'state_estimation',
+    'kp', 'ki', 'kd', 'deadband', 'i_window', 'apogee_offset', 'target_apogee',
+    'max_deployment_rate', 'apogee_prediction_cd', 'airbrake_drag', 'use_airbrake',
+    'alt_std', 'accel_std', 'model_y_std', 'model_v_std', 'model_a_std',
+    'use_orientation_correction', 'lut_file', 'lut_tilt',
+    'mpc_horizon', 'mpc_levels', 'mpc_actuation_weight',
+    'tilted_apogee_prediction',
+    # Only the apogee predictor reads it; the airframe mass is dry_mass
+    'burnout_mass',
+}
+
+# Flight outputs decided before lockout, taken from the burn segment
+BURN_OUTPUTS = (
+    'out_of_rail_time', 'out_of_rail_velocity', 'out_of_rail_stability_margin',
+    'initial_stability_margin', 'max_mach_number',
+)
+
+
+def lockout_time(config):
+    """
+    Time the burn segment ends: halfway between the last controller sample
+    before config.burn_time and the first one at or after it
+
+    Ending between samples keeps every locked-out call in the burn segment and
+    the first active call in the coast segment, whatever the float rounding.
+    """
+    sample_period = 1 / config.sampling_rate
+    first_active = 0
+    while first_active * sample_period < config.burn_time:
+        first_active += 1
+    return (first_active - 0.5) * sample_period
+
+
+class LockoutFlight(Flight):
+    """
+    Flight whose integrator restarts at coast lockout
+
+    RocketPy runs controllers between solver steps when time_overshoot is set,
+    so a deployment takes effect at the end of the step that passed its tick
+    and the result depends on where the steps fall. A warm-started coast
+    starts a fresh solver at lockout_time; flying every full flight with a
+    phase boundary there gives both the same steps, so a warm start reproduces
+    the full flight instead of landing up to a meter of apogee away.
+
+    Args:
+        restart_time: Time of the phase boundary (lockout_time(config))
+        Other arguments as for Flight
+    """
+
+    def __init__(self, *args, restart_time, **kwargs):
+        self.restart_time = restart_time
+        super().__init__(*args, **kwargs)
+
+    def _Flight__simulate(self, verbose):
+        # Phases are [launch, max_time] here; rail exit is inserted before the restart
+        if self.flight_phases[0].t < self.restart_time < self.max_time:
+            self.flight_phases.add_phase(self.restart_time, self.u_dot_generalized, clear=False, index=1)
+        super()._Flight__simulate(verbose)
+
+
+def burnout_key(config, sampled_inputs, sensor_seeds):
+    """
+    Cache key of a sample's burn segment
+
+    Built from the sampled inputs, the sensor noise seeds and every config
+    value except the controller-only ones, so sweeping gains, controllers or
+    target_apogee reuses the same burnout states. Input files (engine, drag
+    curves) count by content, as in config_hash, so editing one flies the
+    burn again.
+    """
+    burn_config = {name: value for name, value in config_values(config).items()
+                   if name not in CONTROLLER_CONFIG_FIELDS}
+    inputs = {name: value for name, value in sampled_inputs.items() if name != 'index'}
+    payload = json.dumps([values_hash(burn_config), inputs, sensor_seeds], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class BurnoutRecorder:
+    """
+    Stand-in controller for the burn segment
+
+    Records what every locked-out controller call would have seen, so the
+    real controllers can be brought to their lockout state by replaying it.
+    """
+
+    def __init__(self):
+        self.times = []
+        self.states = []
+        self.pressures = []
+        self.accelerations = []
+
+    def controller(self, time, sampling_rate, state, state_history, observed_variables, air_brakes, sensors):
+        barometer = sensors[0]
+        accelerometer = sensors[1]
+        self.times.append(time)
+        self.states.append(np.array(state, dtype=np.float64))
+        # Sensors have not measured yet on the launch node; stored as NaN
+        if barometer.measurement is None or accelerometer.measurement is None:
+            self.pressures.append(np.nan)
+            self.accelerations.append(np.full(3, np.nan))
+        else:
+            self.pressures.append(float(barometer.measurement))
+            self.accelerations.append(np.array([accelerometer.measurement[i] for i in range(3)], dtype=np.float64))
+        air_brakes.deployment_level = 0
+
+
+class BurnoutState:
+    """Flight state, sensor state and controller inputs of one sample at coast lockout"""
+
+    def __init__(self, initial_solution, times, states, pressures, accelerations, sensor_states, outputs):
+        self.initial_solution = initial_solution
+        self.times = times
+        self.states = states
+        self.pressures = pressures
+        self.accelerations = accelerations
+        self.sensor_states = sensor_states
+        self.outputs = outputs
+
+    def save(self, path):
+        tmp_path = Path(path).with_suffix(".tmp")
+        with open(tmp_path, "wb") as state_file:
+            np.savez(
+                state_file,
+                initial_solution=self.initial_solution,
+                times=self.times,
+                states=self.states,
+                pressures=self.pressures,
+                accelerations=self.accelerations,
+                # Bit generator states hold integers wider than 64 bits
+                sensor_states=json.dumps(self.sensor_states),
+                outputs=json.dumps(self.outputs),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as state_file:
+            return cls(
+                initial_solution=state_file['initial_solution'],
+                times=state_file['times'],
+                states=state_file['states'],
+                pressures=state_file['pressures'],
+                accelerations=state_file['accelerations'],
+                sensor_states=json.loads(str(state_file['sensor_states'])),
+                outputs=json.loads(str(state_file['outputs'])),
+            )
+
+
+class BurnoutCache:
+    """
+    Burnout states by key, kept in memory and, if directory is set, on disk
+
+    Disk entries are one small .npz per key, so separate runs (and worker
+    processes) share them.
+    """
+
+    def __init__(self, directory=BURNOUT_CACHE_DIR):
+        self.directory = Path(directory) if directory is not None else None
+        self._states = {}
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key):
+        if key in self._states:
+            return self._states[key]
+        if self.directory is not None:
+            path = self.directory / f"{key}.npz"
+            if path.exists():
+                self._states[key] = BurnoutState.load(path)
+                return self._states[key]
+        return None
+
+    def put(self, key, burnout):
+        self._states[key] = burnout
+        if self.directory is not None:
+            burnout.save(self.directory / f"{key}.npz")
+
+
+def simulate_burnout(burn_rocket, recorder, environment, stochastic_flight, launch, config):
+    """
+    Fly a sample up to coast lockout
+
+    Args:
+        burn_rocket: Rocket whose airbrakes are driven by recorder
+        recorder: BurnoutRecorder attached to burn_rocket
+        environment: Environment of the sample
+        stochastic_flight: StochasticFlight (for solver options)
+        launch: Tuple of (rail_length, inclination, heading) of the sample
+        config: Config object
+
+    Returns:
+        BurnoutState
+    """
+    rail_length, inclination, heading = launch
+    flight = Flight(
+        rocket=burn_rocket,
+        environment=environment,
+        rail_length=rail_length,
+        inclination=inclination,
+        heading=heading,
+        terminate_on_apogee=stochastic_flight.terminate_on_apogee,
+        time_overshoot=stochastic_flight.time_overshoot,
+        max_time=lockout_time(config),
+    )
+
+    return BurnoutState(
+        initial_solution=np.array(flight.solution[-1], dtype=np.float64),
+        times=np.array(recorder.times, dtype=np.float64),
+        states=np.array(recorder.states, dtype=np.float64),
+        pressures=np.array(recorder.pressures, dtype=np.float64),
+        accelerations=np.array(recorder.accelerations, dtype=np.float64).reshape(-1, 3),
+        sensor_states=[_sensor_state(sensor) for sensor in flight.sensors],
+        outputs={name: float(getattr(flight, name)) for name in BURN_OUTPUTS},
+    )
+
+
+def _sensor_state(sensor):
+    # Controllers run before sensors at a node, so the first coast call reads
+    # the last burn measurement; Flight leaves sensor.measurement untouched
+    measurement = sensor.measurement
+    if isinstance(measurement, tuple):
+        measurement = [float(value) for value in measurement]
+    elif measurement is not None:
+        measurement = float(measurement)
+    drift = sensor._random_walk_drift
+    drift = [float(drift[i]) for i in range(3)] if isinstance(drift, Vector) else float(drift)
+    return {
+        'bit_generator': sensor._rng.bit_generator.state,
+        'measurement': measurement,
+        'random_walk_drift': drift,
+    }
+
+
+def _restore_sensor_state(sensor, sensor_state):
+    sensor._rng.bit_generator.state = sensor_state['bit_generator']
+    measurement = sensor_state['measurement']
+    sensor.measurement = tuple(measurement) if isinstance(measurement, list) else measurement
+
+    # Flight zeroes the random walk when it starts, so put the drift back
+    # right after its reset
+    drift = sensor_state['random_walk_drift']
+    drift = Vector(drift) if isinstance(drift, list) else drift
+    sensor_class_reset = type(sensor)._reset
+
+    def _reset(simulated_rocket):
+        sensor_class_reset(sensor, simulated_rocket)
+        sensor._random_walk_drift = drift
+        del sensor._reset
+
+    sensor._reset = _reset
+
+
+def warm_start_flight(rocket, environment, stochastic_flight, launch, burnout, config):
+    """
+    Fly the coast segment of a sample from its cached burnout state
+
+    The rocket's controller is first fed the recorded locked-out calls, and its
+    sensors continue the noise streams, random walk and last readings of the
+    burn segment.
+
+    Returns:
+        Flight covering lockout to the end of the simulation
+    """
+    controller_instance = rocket._controller_instance
+
+    replay_air_brakes = SimpleNamespace(deployment_level=0)
+    barometer = SimpleNamespace(measurement=None)
+    accelerometer = SimpleNamespace(measurement=None)
+    for time, state, pressure, acceleration in zip(
+            burnout.times, burnout.states, burnout.pressures, burnout.accelerations):
+        measured = not np.isnan(pressure)
+        barometer.measurement = float(pressure) if measured else None
+        accelerometer.measurement = acceleration if measured else None
+        controller_instance.controller(
+            float(time), config.sampling_rate, state, None, None,
+            replay_air_brakes, [barometer, accelerometer]
+        )
+
+    for sensor, sensor_state in zip(rocket.sensors.get_components(), burnout.sensor_states):
+        _restore_sensor_state(sensor, sensor_state)
+
+    rail_length, inclination, heading = launch
+    flight = Flight(
+        rocket=rocket,
+        environment=environment,
+        rail_length=rail_length,
+        inclination=inclination,
+        heading=heading,
+        initial_solution=list(burnout.initial_solution),
+        terminate_on_apogee=stochastic_flight.terminate_on_apogee,
+        time_overshoot=stochastic_flight.time_overshoot,
+    )
+    return flight
+
+
+def warm_start_outputs(flight, burnout, export_list):
+    """Exported outputs of a warm-started flight, burn-phase values taken from the burnout state"""
+    outputs = {export_item: getattr(flight, export_item) for export_item in export_list}
+    for name in BURN_OUTPUTS:
+        if name in outputs:
+            outputs[name] = burnout.outputs[name]
+    if 'max_mach_number' in outputs:
+        outputs['max_mach_number'] = max(burnout.outputs['max_mach_number'], flight.max_mach_number)
+    return outputs
@@ -0,0 +1,119 @@
+from statistics import NormalDist
+
+import numpy as np
+
+
+class RunningStats:
+    """Running mean and standard deviation, updated a batch at a time (Chan et al. merge)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+        batch_count = values.size
+        batch_mean = values.mean()
+        batch_m2 = np.sum((values - batch_mean) ** 2)
+
+        total = self.count + batch_count
+        delta = batch_mean - self.mean
+        self.mean += delta * batch_count / total
+        self._m2 += batch_m2 + delta ** 2 * self.count * batch_count / total
+        self.count = total
+
+    @property
+    def std(self):
+        return np.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def mean_half_width(self, z):
+        """Half-width of the normal confidence interval of the mean"""
+        return z * self.std / np.sqrt(self.count) if self.count > 1 else np.inf
+
+    def std_half_width(self, z):
+        """Half-width of the (large sample) confidence interval of the std"""
+        return z * self.std / np.sqrt(2 * (self.count - 1)) if self.count > 1 else np.inf
+
+
+# Outputs the stopping rule reads
+OUTPUTS = ('apogee', 'max_airbrake_deployment')
+
+
+class ConvergenceMonitor:
+    """
+    Sequential stopping rule for a Monte Carlo run
+
+    Tracks apogee error and max airbrake deployment as samples come in, and
+    reports convergence once every requested confidence interval is narrower
+    than its tolerance. A tolerance of None is not checked.
+
+    Args:
+        config: Config object (target apogee, offset and elevation)
+        apogee_tolerance: Max half-width of the mean apogee error interval (m)
+        apogee_std_tolerance: Max half-width of the apogee error std interval (m)
+        deployment_tolerance: Max half-width of the mean max deployment interval (0-1)
+        confidence: Confidence level of the intervals
+        min_simulations: Samples required before the rule may stop a run
+    """
+
+    def __init__(self, config, apogee_tolerance=1.0, apogee_std_tolerance=None, deployment_tolerance=0.02,
+                 confidence=0.95, min_simulations=100):
+        self.target = config.target_apogee - config.apogee_offset + config.env_elevation
+        self.apogee_tolerance = apogee_tolerance
+        self.apogee_std_tolerance = apogee_std_tolerance
+        self.deployment_tolerance = deployment_tolerance
+        self.confidence = confidence
+        self.min_simulations = min_simulations
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+        self.num_samples = 0
+        self.apogee_error = RunningStats()
+        self.max_deployment = RunningStats()
+
+    def update(self, results):
+        """Add the samples of results (per-sample arrays of OUTPUTS) that follow those added so far"""
+        apogees = np.asarray(results['apogee'])
+        self.apogee_error.update(apogees - self.target)
+        self.max_deployment.update(results['max_airbrake_deployment'])
+        self.num_samples += len(apogees)
+
+    def checks(self):
+        """(name, half_width, tolerance) of every interval with a tolerance"""
+        checks = [
+            ('apogee error mean', self.apogee_error.mean_half_width(self.z), self.apogee_tolerance),
+            ('apogee error std', self.apogee_error.std_half_width(self.z), self.apogee_std_tolerance),
+            ('max deployment mean', self.max_deployment.mean_half_width(self.z), self.deployment_tolerance),
+        ]
+        return [check for check in checks if check[2] is not None]
+
+    def converged(self):
+        if self.num_samples < self.min_simulations:
+            return False
+        return all(half_width <= tolerance for _, half_width, tolerance in self.checks())
+
+    def summary(self):
+        """Current estimates and confidence interval half-widths"""
+        return {
+            'Samples': self.num_samples,
+            'Confidence': self.confidence,
+            'Mean_Error_m': self.apogee_error.mean,
+            'Mean_Error_CI_m': self.apogee_error.mean_half_width(self.z),
+            'Std_Error_m': self.apogee_error.std,
+            'Std_Error_CI_m': self.apogee_error.std_half_width(self.z),
+            'Mean_Deployment': self.max_deployment.mean,
+            'Mean_Deployment_CI': self.max_deployment.mean_half_width(self.z),
+            'Std_Deployment': self.max_deployment.std,
+            'Converged': self.converged(),
+        }
+
+    def status(self):
+        return (
+            f"{self.num_samples} samples | "
+            f"error {self.apogee_error.mean:.2f} ± {self.apogee_error.mean_half_width(self.z):.2f} m "
+            f"(std {self.apogee_error.std:.2f} ± {self.apogee_error.std_half_width(self.z):.2f} m) | "
+            f"max deployment {self.max_deployment.mean:.3f} ± {self.max_deployment.mean_half_width(self.z):.3f}"
+        )
@@ -0,0 +1,554 @@
+import copy
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from rocketpy._encoders import RocketPyEncoder
+
+from simulation_functions.setup_stochastic import setup_stochastic_models, reseed_environment
+from simulation_functions.burnout_cache import (
+    BurnoutCache,
+    BurnoutRecorder,
+    LockoutFlight,
+    burnout_key,
+    lockout_time,
+    simulate_burnout,
+    warm_start_flight,
+    warm_start_outputs
+)
+from simulation_functions.sampling import create_sampler
+from simulation_functions.monte_carlo_store import config_hash
+
+# RocketPy's default MonteCarlo export list
+EXPORT_LIST = [
+    "apogee", "apogee_time", "apogee_x", "apogee_y", "t_final", "x_impact", "y_impact",
+    "impact_velocity", "initial_stability_margin", "out_of_rail_stability_margin",
+    "out_of_rail_time", "out_of_rail_velocity", "max_mach_number",
+    "frontal_surface_wind", "lateral_surface_wind",
+]
+
+
+def get_max_deployment(flight):
+    """Extract max airbrake deployment from controller data"""
+    try:
+        # Access controller instance directly from rocket
+        if hasattr(flight.rocket, '_controller_instance'):
+            controller_instance = flight.rocket._controller_instance
+            if hasattr(controller_instance, 'data') and 'deployment' in controller_instance.data:
+                # Works at both telemetry levels; NaN when nothing was logged
+                max_deployment = controller_instance.data.max('deployment')
+                if not np.isnan(max_deployment):
+                    return max_deployment
+
+        return 0.0
+
+    except Exception as e:
+        print(f"Error in get_max_deployment: {e}")
+        return 0.0
+
+
+def get_deployment_timeseries(flight):
+    """Extract deployment time series from controller data"""
+    try:
+        # Access controller instance directly from rocket
+        if hasattr(flight.rocket, '_controller_instance'):
+            controller_instance = flight.rocket._controller_instance
+            if hasattr(controller_instance, 'data') and controller_instance.data.level == "full":
+                # Column views; the store copies them into its own arrays
+                time_data = controller_instance.data.get('time', [])
+                deployment_data = controller_instance.data.get('deployment', [])
+                if len(time_data) and len(deployment_data):
+                    return {'time': time_data, 'deployment': deployment_data}
+
+        return {'time': [], 'deployment': []}
+
+    except Exception as e:
+        print(f"Error in get_deployment_timeseries: {e}")
+        return {'time': [], 'deployment': []}
+
+
+DATA_COLLECTOR = {
+    'max_airbrake_deployment': get_max_deployment,
+    'deployment_timeseries': get_deployment_timeseries,
+}
+
+# Per-sample data collected in a batch. "summary" skips the deployment time
+# series; replay_sample gives any single sample's full telemetry afterwards.
+COLLECTORS = {
+    'timeseries': DATA_COLLECTOR,
+    'summary': {'max_airbrake_deployment': get_max_deployment},
+}
+
+# Controller telemetry level each collector needs (see TelemetryRecorder)
+COLLECTOR_TELEMETRY = {
+    'timeseries': "full",
+    'summary': "summary",
+}
+
+
+def get_stage_time_histogram(flight):
+    """Per-stage control tick duration histograms of the flight (see StageTimer)"""
+    return flight.rocket._controller_instance.profiler.histograms()
+
+
+def get_stage_time_total(flight):
+    """Per-stage total control tick time of the flight (s)"""
+    return flight.rocket._controller_instance.profiler.totals()
+
+
+# Added to every collector when config.profile_control_tick is set; combine a
+# batch with StageTimer.from_samples
+PROFILE_COLLECTOR = {
+    'stage_time_histogram': get_stage_time_histogram,
+    'stage_time_total': get_stage_time_total,
+}
+
+
+def _is_sampled(value):
+    # Same rule as StochasticModel.dict_generator: tuples are distributions and
+    # lists with more than one entry are choices, anything else is fixed
+    return isinstance(value, tuple) or (isinstance(value, list) and len(value) > 1)
+
+
+def _distribution(value):
+    if isinstance(value, list):
+        return {'choices': value}
+    return {'parameters': [value[0], value[1]], 'distribution': value[-1].__name__}
+
+
+def sampled_inputs(models):
+    """
+    The scalars drawn for the last created sample
+
+    Covers the sampled attributes of every stochastic model (wind factors, mass,
+    CoM, drag factors, launch angles, motor impulse and position) and the
+    airbrake Cd multiplier. Motor inputs are prefixed with motor_<i>_.
+
+    Returns:
+        Dict of input name -> float
+    """
+    stochastic_env, stochastic_rocket, stochastic_flight = models
+
+    values = {}
+    for model in models:
+        for name, value in model.__dict__.items():
+            if not name.startswith('_') and _is_sampled(value):
+                values[name] = float(model.last_rnd_dict[name])
+
+    motor_inputs = stochastic_rocket.last_rnd_dict['motors']
+    for i, ((stochastic_motor, position), motor_rnd) in enumerate(zip(stochastic_rocket.motors, motor_inputs)):
+        for name, value in stochastic_motor.__dict__.items():
+            if not name.startswith('_') and _is_sampled(value):
+                values[f"motor_{i}_{name}"] = float(motor_rnd[name])
+        if _is_sampled(position):
+            values[f"motor_{i}_position"] = float(motor_rnd['position'])
+
+    values['airbrake_cd_multiplier'] = float(stochastic_rocket.last_rnd_dict['airbrake_cd_multiplier'])
+    return values
+
+
+def nominal_inputs(models):
+    """
+    Inputs shared by every sample, logged once per run in compact mode
+
+    A full inputs dict (nominal Functions, geometry, motor, ...) in which every
+    sampled value is replaced by the distribution it is drawn from.
+    """
+    stochastic_env, stochastic_rocket, stochastic_flight = models
+
+    inputs = {}
+    for model in models:
+        inputs.update(next(model.dict_generator()))
+        for name, value in model.__dict__.items():
+            if not name.startswith('_') and _is_sampled(value):
+                inputs[name] = _distribution(value)
+
+    # The rocket only fills in its motors while creating an object
+    inputs['motors'] = []
+    for stochastic_motor, position in stochastic_rocket.motors:
+        motor_inputs = dict(next(stochastic_motor.dict_generator()))
+        motor_inputs['position'] = position
+        inputs['motors'].append(motor_inputs)
+        for name, value in stochastic_motor.__dict__.items():
+            if not name.startswith('_') and _is_sampled(value):
+                motor_inputs[name] = _distribution(value)
+        if _is_sampled(position):
+            motor_inputs['position'] = _distribution(position)
+
+    inputs['airbrake_cd_multiplier'] = {
+        'parameters': [1.0, stochastic_rocket.config.airbrake_cd_std],
+        'distribution': 'normal',
+    }
+    return inputs
+
+
+def sample_seed_sequence(seed, sample_index):
+    """Seed sequence for one sample, independent of which process runs it"""
+    return np.random.SeedSequence([seed, sample_index])
+
+
+def _reseed_models(models, seed, sample_index, sampler=None):
+    stochastic_env, stochastic_rocket, stochastic_flight = models
+
+    (env_seed, rocket_seed, motor_seed, flight_seed,
+     airbrake_seed, barometer_seed, accelerometer_seed) = sample_seed_sequence(seed, sample_index).spawn(7)
+
+    reseed_environment(stochastic_env, env_seed)
+    stochastic_rocket.reseed(
+        rocket_seed, motor_seed, airbrake_seed,
+        int(barometer_seed.generate_state(1)[0]),
+        int(accelerometer_seed.generate_state(1)[0])
+    )
+    stochastic_flight._set_stochastic(flight_seed)
+
+    if sampler is not None:
+        sampler.apply(models, sample_index)
+
+
+def _create_flight(rocket, environment, stochastic_flight, launch, config):
+    # Same integrator restart at lockout as a warm-started flight (see LockoutFlight)
+    rail_length, inclination, heading = launch
+    return LockoutFlight(
+        rocket=rocket,
+        environment=environment,
+        rail_length=rail_length,
+        inclination=inclination,
+        heading=heading,
+        initial_solution=stochastic_flight.initial_solution,
+        terminate_on_apogee=stochastic_flight.terminate_on_apogee,
+        time_overshoot=stochastic_flight.time_overshoot,
+        restart_time=lockout_time(config),
+    )
+
+
+def _randomize_launch(stochastic_flight):
+    return (
+        stochastic_flight._randomize_rail_length(),
+        stochastic_flight._randomize_inclination(),
+        stochastic_flight._randomize_heading(),
+    )
+
+
+def _sample_inputs(models, sample_index, input_log):
+    if input_log == "compact":
+        inputs = sampled_inputs(models)
+        inputs["index"] = sample_index
+        return inputs
+
+    stochastic_env, stochastic_rocket, stochastic_flight = models
+    inputs_dict = dict(
+        item
+        for d in [
+            stochastic_env.last_rnd_dict,
+            stochastic_rocket.last_rnd_dict,
+            stochastic_flight.last_rnd_dict,
+        ]
+        for item in d.items()
+    )
+    inputs_dict["index"] = sample_index
+    return json.dumps(inputs_dict, cls=RocketPyEncoder) + "\n"
+
+
+def _sample_outputs(flight, sample_index, burnout=None, collect="timeseries"):
+    if burnout is None:
+        outputs_dict = {export_item: getattr(flight, export_item) for export_item in EXPORT_LIST}
+    else:
+        outputs_dict = warm_start_outputs(flight, burnout, EXPORT_LIST)
+    outputs_dict["index"] = sample_index
+    for key, callback in COLLECTORS[collect].items():
+        outputs_dict[key] = callback(flight)
+    if getattr(flight.rocket._controller_instance, 'profiler', None) is not None:
+        for key, callback in PROFILE_COLLECTOR.items():
+            outputs_dict[key] = callback(flight)
+    return outputs_dict
+
+
+def _fly_warm_started(models, seed, sample_index, controller_configs, burnout_cache, sampler):
+    # Burn segment from the cache (or flown once and cached), then one coast
+    # segment per controller
+    stochastic_env, stochastic_rocket, stochastic_flight = models
+    _reseed_models(models, seed, sample_index, sampler)
+
+    recorder = BurnoutRecorder()
+    controllers = [stochastic_rocket.controller_class(config) for config in controller_configs]
+    burn_rocket, *rockets = stochastic_rocket.create_objects([recorder] + controllers)
+    environment = stochastic_env.create_object()
+    launch = _randomize_launch(stochastic_flight)
+
+    key = burnout_key(stochastic_rocket.config, sampled_inputs(models), stochastic_rocket._sensor_seeds)
+    burnout = burnout_cache.get(key)
+    if burnout is None:
+        burnout = simulate_burnout(burn_rocket, recorder, environment, stochastic_flight, launch,
+                                   stochastic_rocket.config)
+        burnout_cache.put(key, burnout)
+
+    flights = [
+        warm_start_flight(rocket, environment, stochastic_flight, launch, burnout, config)
+        for rocket, config in zip(rockets, controller_configs)
+    ]
+    return flights, burnout
+
+
+def fly_sample(models, seed, sample_index, burnout_cache=None, sampler=None):
+    """
+    Fly a single Monte Carlo sample from its own seed
+
+    Every random stream (environment, rocket, motor, flight, airbrake Cd and
+    sensor noise) is derived from (seed, sample_index), so the same sample gives
+    bit-identical results no matter which worker or in which order it runs.
+
+    Args:
+        models: Tuple of (stochastic_env, stochastic_rocket, stochastic_flight)
+        seed: Base seed of the run
+        sample_index: Index of the sample within the run
+        burnout_cache: Optional BurnoutCache. If given, the flight up to coast
+                       lockout comes from the cache (flown once on a miss) and
+                       only the coast is integrated. Gives the same flight as
+                       without a cache (see LockoutFlight).
+        sampler: Optional QuasiRandomSampler. If given, the sampled inputs come
+                 from its point sample_index instead of pseudo-random draws.
+
+    Returns:
+        Tuple of (flight, burnout), burnout being the BurnoutState the flight
+        was started from (None without a burnout_cache)
+    """
+    stochastic_env, stochastic_rocket, stochastic_flight = models
+    if burnout_cache is not None:
+        flights, burnout = _fly_warm_started(models, seed, sample_index, [stochastic_rocket.config],
+                                             burnout_cache, sampler)
+        return flights[0], burnout
+
+    _reseed_models(models, seed, sample_index, sampler)
+
+    # Same construction order as MonteCarlo.__run_single_simulation
+    rocket = stochastic_rocket.create_object()
+    environment = stochastic_env.create_object()
+    return _create_flight(rocket, environment, stochastic_flight, _randomize_launch(stochastic_flight),
+                          stochastic_rocket.config), None
+
+
+def run_sample(models, seed, sample_index, input_log="compact", burnout_cache=None, sampler=None,
+               collect="timeseries"):
+    """
+    Simulate a single Monte Carlo sample (see fly_sample) and collect its results
+
+    Args:
+        models, seed, sample_index, burnout_cache, sampler: See fly_sample
+        input_log: "compact" for only the sampled scalars (see sampled_inputs),
+                   "full" for the inputs line RocketPy's MonteCarlo would write
+        collect: Per-sample data to collect, a key of COLLECTORS
+
+    Returns:
+        Tuple of (inputs, outputs). inputs is a dict of sampled scalars or a JSON
+        line depending on input_log, outputs a dict of the exported outputs
+    """
+    flight, burnout = fly_sample(models, seed, sample_index, burnout_cache, sampler)
+    return _sample_inputs(models, sample_index, input_log), _sample_outputs(flight, sample_index, burnout, collect)
+
+
+def run_paired_sample(models, seed, sample_index, controller_configs, input_log="compact", burnout_cache=None,
+                      sampler=None, collect="timeseries"):
+    """
+    Simulate one sample once per controller, all from the same random draws
+
+    The environment, launch conditions, airframe and motor are built once and
+    shared; each controller gets its own sensors (same noise seeds), airbrakes
+    and controller instance. Each controller's result is identical to
+    run_sample with that controller and the same seed.
+
+    Args:
+        models: Tuple of (stochastic_env, stochastic_rocket, stochastic_flight)
+        seed: Base seed of the run
+        sample_index: Index of the sample within the run
+        controller_configs: Config objects differing only in control_algorithm
+        input_log: "compact" or "full", see run_sample
+        burnout_cache: Optional BurnoutCache, see run_sample. The burn segment
+                       is then flown once and shared by every controller.
+        sampler: Optional QuasiRandomSampler, see run_sample
+        collect: Per-sample data to collect, a key of COLLECTORS
+
+    Returns:
+        List of (inputs, outputs), one per controller config
+    """
+    stochastic_env, stochastic_rocket, stochastic_flight = models
+    if burnout_cache is not None:
+        flights, burnout = _fly_warm_started(models, seed, sample_index, controller_configs, burnout_cache, sampler)
+        inputs = _sample_inputs(models, sample_index, input_log)
+        return [(inputs, _sample_outputs(flight, sample_index, burnout, collect)) for flight in flights]
+
+    _reseed_models(models, seed, sample_index, sampler)
+
+    controllers = [stochastic_rocket.controller_class(config) for config in controller_configs]
+    rockets = stochastic_rocket.create_objects(controllers)
+    environment = stochastic_env.create_object()
+    launch = _randomize_launch(stochastic_flight)
+    inputs = _sample_inputs(models, sample_index, input_log)
+
+    return [
+        (inputs, _sample_outputs(_create_flight(rocket, environment, stochastic_flight, launch,
+                                                stochastic_rocket.config), sample_index, collect=collect))
+        for rocket in rockets
+    ]
+
+
+class SampleReplay:
+    """
+    One Monte Carlo sample flown again by itself
+
+    Attributes:
+        flight: The full RocketPy Flight
+        inputs: Sampled inputs (see sampled_inputs)
+        outputs: Exported outputs, with the deployment time series
+        telemetry: Every value the controller logged (controller_instance.data)
+        sensor_data: Raw sensor measurements by sensor (Flight.sensor_data)
+    """
+
+    def __init__(self, flight, inputs, outputs):
+        self.flight = flight
+        self.inputs = inputs
+        self.outputs = outputs
+        self.telemetry = flight.rocket._controller_instance.data
+        self.sensor_data = flight.sensor_data
+
+
+def replay_sample(config, seed, sample_index, warm_start=False, sampler="random", design_size=None,
+                  expected_config_hash=None):
+    """
+    Fly sample sample_index of a run again, on its own, with full telemetry
+
+    Uses the same per-sample streams as the batch, so the flight is identical
+    to the one the batch stored.
+
+    Args:
+        config: Config object of the run
+        seed: Base seed of the run
+        sample_index: Index of the sample within the run
+        warm_start, sampler, design_size: As the run was made, see run_samples
+        expected_config_hash: Optional config hash the run was stored with
+
+    Returns:
+        SampleReplay
+    """
+    if expected_config_hash is not None and config_hash(config) != expected_config_hash:
+        raise ValueError(
+            f"Config does not match the one sample {sample_index} was run with.\n"
+            f"Pass the run's config (including input files) to replay it."
+        )
+
+    models = setup_stochastic_models(config)
+    burnout_cache = BurnoutCache() if warm_start else None
+    flight, burnout = fly_sample(models, seed, sample_index, burnout_cache,
+                                 create_sampler(sampler, models, seed, design_size))
+    return SampleReplay(flight, sampled_inputs(models), _sample_outputs(flight, sample_index, burnout))
+
+
+def controller_configs(config, controllers):
+    """Copies of config, one per control algorithm name"""
+    configs = []
+    for name in controllers:
+        controller_config = copy.copy(config)
+        controller_config.control_algorithm = name
+        configs.append(controller_config)
+    return configs
+
+
+# Per-process state for pool workers, built once by _init_worker
+_worker_models = None
+_worker_seed = None
+_worker_input_log = None
+_worker_controller_configs = None
+_worker_burnout_cache = None
+_worker_sampler = None
+_worker_collect = None
+
+
+def _init_worker(config, seed, input_log, controllers, warm_start, sampler, design_size, collect):
+    global _worker_models, _worker_seed, _worker_input_log, _worker_controller_configs, _worker_burnout_cache
+    global _worker_sampler, _worker_collect
+    _worker_models = setup_stochastic_models(config)
+    _worker_models[1].telemetry_level = COLLECTOR_TELEMETRY[collect]
+    _worker_seed = seed
+    _worker_input_log = input_log
+    _worker_controller_configs = controller_configs(config, controllers) if controllers else None
+    _worker_burnout_cache = BurnoutCache() if warm_start else None
+    _worker_sampler = create_sampler(sampler, _worker_models, seed, design_size)
+    _worker_collect = collect
+
+
+def _run_one(models, seed, sample_index, input_log, configs, burnout_cache, sampler, collect):
+    if configs is None:
+        return run_sample(models, seed, sample_index, input_log, burnout_cache, sampler, collect)
+    return run_paired_sample(models, seed, sample_index, configs, input_log, burnout_cache, sampler, collect)
+
+
+def _run_chunk(sample_indices):
+    return [
+        _run_one(_worker_models, _worker_seed, i, _worker_input_log, _worker_controller_configs,
+                 _worker_burnout_cache, _worker_sampler, _worker_collect)
+        for i in sample_indices
+    ]
+
+
+def run_samples(config, seed, sample_indices, workers=1, input_log="compact", controllers=None,
+                warm_start=False, sampler="random", design_size=None, collect="timeseries"):
+    """
+    Run Monte Carlo samples, serially or across a process pool
+
+    Args:
+        config: Config object (each process builds its own models from it)
+        seed: Base seed of the run
+        sample_indices: Indices of the samples to run, e.g. range(completed, total)
+        workers: Number of worker processes. 1 runs in this process.
+        input_log: "compact" or "full", see run_sample
+        controllers: Optional control algorithm names. If given, every sample is
+                     flown once per controller (see run_paired_sample).
+        warm_start: Start every flight from a cached burnout state (see run_sample),
+                    shared with other runs through output/monte_carlo/burnout_cache
+        sampler: "random" for pseudo-random draws, or "sobol" / "lhs" for
+                 quasi-random inputs (see QuasiRandomSampler)
+        design_size: Number of samples of an "lhs" design
+        collect: Per-sample data to collect, a key of COLLECTORS
+
+    Yields:
+        (inputs, outputs) per sample, or a list of them per controller when
+        controllers is given, in sample order
+    """
+    start_time = time.time()
+    sample_indices = list(sample_indices)
+    total = len(sample_indices)
+
+    if workers <= 1:
+        models = setup_stochastic_models(config)
+        models[1].telemetry_level = COLLECTOR_TELEMETRY[collect]
+        configs = controller_configs(config, controllers) if controllers else None
+        burnout_cache = BurnoutCache() if warm_start else None
+        quasi_random_sampler = create_sampler(sampler, models, seed, design_size)
+        for completed, i in enumerate(sample_indices, start=1):
+            yield _run_one(models, seed, i, input_log, configs, burnout_cache, quasi_random_sampler, collect)
+            _print_status(completed, total, start_time)
+        return
+
+    # A few chunks per worker keeps the pool busy without a round trip per flight
+    chunk_size = max(1, total // (workers * 4))
+    chunks = [sample_indices[i:i + chunk_size] for i in range(0, total, chunk_size)]
+
+    completed = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(config, seed, input_log, controllers, warm_start, sampler,
+                                       design_size, collect)) as executor:
+        # map() hands chunks back in submission order, so output stays in sample order
+        for chunk_results in executor.map(_run_chunk, chunks):
+            for sample_result in chunk_results:
+                completed += 1
+                yield sample_result
+            _print_status(completed, total, start_time)
+
+
+def _print_status(completed, total, start_time):
+    elapsed = time.time() - start_time
+    remaining = elapsed / completed * (total - completed)
+    print(f"\rSimulations completed: {completed}/{total} | Elapsed: {elapsed:.1f} s | "
+          f"Estimated time left: {remaining:.0f} s", end="", flush=True)
+    if completed == total:
+        print()
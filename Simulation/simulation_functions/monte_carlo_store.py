@@ -0,0 +1,390 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+from rocketpy._encoders import RocketPyEncoder
+
+STORE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+NOMINAL_INPUTS_NAME = "nominal_inputs.json"
+CHUNK_PATTERN = "chunk_*.npz"
+INPUT_LOG_MODES = ("compact", "full")
+
+# Dict-valued outputs (e.g. deployment_timeseries) are stored as one flat array
+# per field plus an offsets array, so a column never needs per-sample objects
+RAGGED_SEPARATOR = "__"
+OFFSETS_FIELD = "offsets"
+
+
+def config_values(config):
+    """Every public, non-callable Config value, class attributes included"""
+    values = {}
+    for name in dir(config):
+        if name.startswith('_'):
+            continue
+        value = getattr(config, name)
+        if not callable(value):
+            values[name] = value
+    return values
+
+
+def config_hash(config):
+    """
+    Hash of the config values and the contents of the input files they point to
+
+    Two runs only share a store when this matches, so editing a drag curve or
+    engine file starts a new run instead of mixing results.
+    """
+    return values_hash(config_values(config))
+
+
+def values_hash(values):
+    """Hash of a dict of config values and the contents of its *_file and *_file_path files"""
+    digest = hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode())
+    for name in sorted(values):
+        if name.endswith('_file') or name.endswith('_file_path'):
+            path = Path(str(values[name]))
+            if path.is_file():
+                digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def default_run_dir(config, seed=None, base_dir="output/monte_carlo", prefix=None, sampler="random",
+                    collect="timeseries"):
+    """
+    Run directory for a config (and explicit seed, non-default sampler and
+    collector, if any), prefixed by the controller by default
+    """
+    prefix = prefix or config.control_algorithm.lower()
+    name = f"{prefix}_{config_hash(config)[:12]}"
+    if seed is not None:
+        name += f"_seed{seed}"
+    if sampler != "random":
+        name += f"_{sampler}"
+    if collect != "timeseries":
+        name += f"_{collect}"
+    return Path(base_dir) / name
+
+
+class MonteCarloResults:
+    """
+    Results of a Monte Carlo run loaded from a MonteCarloStore
+
+    Mirrors the parts of RocketPy's MonteCarlo used by the plotting code:
+    results maps each output to a per-sample array (or list of dicts for
+    time series), and inputs_log is a list of per-sample input dicts.
+
+    Runs logged in compact mode also have inputs, a dict of per-sample arrays
+    of the sampled scalars (None for full logs).
+    """
+
+    def __init__(self, run_dir, seed, results, inputs, input_paths, num_samples):
+        self.run_dir = run_dir
+        self.seed = seed
+        self.results = results
+        self.inputs = inputs
+        self.num_samples = num_samples
+        self._input_paths = input_paths
+        self._inputs_log = None
+
+    @property
+    def inputs_log(self):
+        # Only built when something asks for it
+        if self._inputs_log is None:
+            if self.inputs is not None:
+                columns = {key: values.tolist() for key, values in self.inputs.items()}
+                self._inputs_log = [dict(zip(columns, row)) for row in zip(*columns.values())]
+            else:
+                inputs_log = []
+                for path in self._input_paths:
+                    with open(path, encoding="utf-8") as inputs_file:
+                        inputs_log.extend(json.loads(line) for line in inputs_file)
+                self._inputs_log = inputs_log[:self.num_samples]
+        return self._inputs_log
+
+    @property
+    def nominal_inputs(self):
+        """Inputs shared by every sample (compact logs only)"""
+        with open(self.run_dir / NOMINAL_INPUTS_NAME, encoding="utf-8") as nominal_file:
+            return json.load(nominal_file)
+
+
+class MonteCarloStore:
+    """
+    Append-only, chunked result store for one Monte Carlo run
+
+    Layout of the run directory:
+        manifest.json               config hash, seed, controller, sampler, collector, input log
+                                    and warm start modes
+        nominal_inputs.json         inputs shared by every sample (compact log)
+        chunk_00000.npz             one column per output for a block of samples
+        chunk_00000.inputs.npz      one column per sampled input (compact log), or
+        chunk_00000.inputs.txt      full inputs, one JSON line per sample (full log)
+
+    A chunk counts as written once its .npz exists. It is renamed into place
+    last, so a crash mid-write leaves the previous chunks intact.
+    """
+
+    def __init__(self, run_dir):
+        self.run_dir = Path(run_dir)
+        self.manifest_path = self.run_dir / MANIFEST_NAME
+        self.nominal_inputs_path = self.run_dir / NOMINAL_INPUTS_NAME
+
+    def read_manifest(self):
+        if not self.manifest_path.exists():
+            return None
+        with open(self.manifest_path, encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+
+    def open(self, config, seed=None, input_log="compact", warm_start=False, sampler="random",
+             collect="timeseries"):
+        """
+        Create the run directory, or check that an existing one matches this run
+
+        Args:
+            config: Config object of the run
+            seed: Base seed. If None, the seed of an existing run is reused,
+                  otherwise a fresh one is drawn.
+            input_log: "compact" or "full" input logging
+            warm_start: Whether flights start from cached burnout states
+            sampler: Sampler name, see sampling.sampler_name
+            collect: Per-sample collector, a key of monte_carlo_runner.COLLECTORS
+
+        Returns:
+            The seed of the run
+        """
+        if input_log not in INPUT_LOG_MODES:
+            raise ValueError(f"input_log must be one of {INPUT_LOG_MODES}, got {input_log!r}")
+
+        manifest = self.read_manifest()
+        digest = config_hash(config)
+
+        if manifest is not None:
+            mismatches = []
+            if manifest['config_hash'] != digest:
+                mismatches.append("config")
+            if manifest['controller'] != config.control_algorithm:
+                mismatches.append("controller")
+            if seed is not None and manifest['seed'] != seed:
+                mismatches.append("seed")
+            if manifest['input_log'] != input_log:
+                mismatches.append("input log mode")
+            if manifest.get('warm_start', False) != warm_start:
+                mismatches.append("warm start")
+            if manifest.get('sampler', "random") != sampler:
+                mismatches.append("sampler")
+            if manifest.get('collect', "timeseries") != collect:
+                mismatches.append("collector")
+            if mismatches:
+                raise ValueError(
+                    f"Run directory {self.run_dir} belongs to a different run "
+                    f"({', '.join(mismatches)} differ).\n"
+                    f"Use another run directory or delete this one to start over."
+                )
+            return manifest['seed']
+
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
+
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            'version': STORE_VERSION,
+            'config_hash': digest,
+            'seed': seed,
+            'controller': config.control_algorithm,
+            'input_log': input_log,
+            'warm_start': warm_start,
+            'sampler': sampler,
+            'collect': collect,
+            'config': config_values(config),
+        }
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, default=str)
+        os.replace(tmp_path, self.manifest_path)
+        return seed
+
+    def write_nominal_inputs(self, nominal_inputs):
+        tmp_path = self.nominal_inputs_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as nominal_file:
+            json.dump(nominal_inputs, nominal_file, cls=RocketPyEncoder)
+        os.replace(tmp_path, self.nominal_inputs_path)
+
+    def chunk_paths(self):
+        # Input chunks (chunk_*.inputs.npz) match the pattern too
+        return sorted(path for path in self.run_dir.glob(CHUNK_PATTERN) if not path.name.endswith(".inputs.npz"))
+
+    def num_completed(self):
+        """Number of samples already written, checking they are 0..n-1 in order"""
+        completed = 0
+        for path in self.chunk_paths():
+            with np.load(path) as chunk:
+                indices = chunk['index']
+            if not np.array_equal(indices, np.arange(completed, completed + len(indices))):
+                raise ValueError(f"Chunk {path} does not continue from sample {completed}")
+            completed += len(indices)
+        return completed
+
+    def append(self, samples, chunk_size=50):
+        """
+        Write (inputs, outputs) samples in chunks of chunk_size
+
+        Samples already finished are flushed if the iterator raises, so an
+        interrupted run resumes from the last finished sample.
+        """
+        rows = []
+        try:
+            for sample in samples:
+                rows.append(sample)
+                if len(rows) == chunk_size:
+                    self.write_chunk(rows)
+                    rows = []
+        finally:
+            if rows:
+                self.write_chunk(rows)
+
+    def write_chunk(self, rows):
+        """Write one chunk of (inputs, outputs) samples"""
+        chunk_path = self.run_dir / f"chunk_{len(self.chunk_paths()):05d}.npz"
+
+        inputs = [inputs for inputs, _ in rows]
+        if isinstance(inputs[0], dict):
+            with open(chunk_path.with_suffix(".inputs.npz"), "wb") as inputs_file:
+                np.savez(inputs_file, **_encode_columns(inputs))
+        else:
+            with open(chunk_path.with_suffix(".inputs.txt"), "w", encoding="utf-8") as inputs_file:
+                inputs_file.writelines(inputs)
+
+        tmp_path = chunk_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as chunk_file:
+            np.savez(chunk_file, **_encode_columns([outputs for _, outputs in rows]))
+        os.replace(tmp_path, chunk_path)
+
+    def load_outputs(self, keys, first_chunk=0):
+        """
+        Scalar output columns of the chunks from first_chunk on
+
+        Only the requested columns of those chunks are read, so a run checked
+        after every batch does not reload what it read before.
+
+        Returns:
+            Tuple of (dict of per-sample arrays, number of chunks read)
+        """
+        paths = self.chunk_paths()[first_chunk:]
+        columns = {key: [] for key in keys}
+        for path in paths:
+            with np.load(path) as chunk:
+                for key in keys:
+                    columns[key].append(chunk[key])
+        return {key: np.concatenate(values) if values else np.empty(0) for key, values in columns.items()}, len(paths)
+
+    def load(self, num_samples=None):
+        """
+        Load the first num_samples results (all of them if None)
+
+        Returns:
+            MonteCarloResults
+        """
+        manifest = self.read_manifest()
+        if manifest is None:
+            raise FileNotFoundError(f"No Monte Carlo run found in {self.run_dir}")
+
+        chunks = []
+        for path in self.chunk_paths():
+            with np.load(path) as chunk:
+                chunks.append({key: chunk[key] for key in chunk.files})
+
+        results = _decode_columns(chunks)
+        total = len(results['index']) if 'index' in results else 0
+        if num_samples is None:
+            num_samples = total
+        elif num_samples > total:
+            raise ValueError(f"Run {self.run_dir} has {total} samples, {num_samples} requested")
+
+        results = {key: values[:num_samples] for key, values in results.items()}
+
+        inputs = None
+        input_paths = [path.with_suffix(".inputs.txt") for path in self.chunk_paths()]
+        if manifest['input_log'] == "compact":
+            input_chunks = []
+            for path in self.chunk_paths():
+                with np.load(path.with_suffix(".inputs.npz")) as chunk:
+                    input_chunks.append({key: chunk[key] for key in chunk.files})
+            inputs = {key: values[:num_samples] for key, values in _decode_columns(input_chunks).items()}
+
+        return MonteCarloResults(self.run_dir, manifest['seed'], results, inputs, input_paths, num_samples)
+
+
+def append_paired(stores, paired_samples, chunk_size=50):
+    """
+    Write paired samples to several stores in lockstep
+
+    Each sample is a list with one (inputs, outputs) per store. A store that is
+    already ahead of the others (a run interrupted between their writes) skips
+    the samples it holds, so every store stays a contiguous 0..n-1 run.
+    """
+    completed = [store.num_completed() for store in stores]
+
+    def flush(rows):
+        for k, store in enumerate(stores):
+            store_rows = [sample[k] for sample in rows if sample[k][1]['index'] >= completed[k]]
+            if store_rows:
+                store.write_chunk(store_rows)
+
+    rows = []
+    try:
+        for sample in paired_samples:
+            rows.append(sample)
+            if len(rows) == chunk_size:
+                flush(rows)
+                rows = []
+    finally:
+        if rows:
+            flush(rows)
+
+
+def _encode_columns(outputs_list):
+    columns = {}
+    for key, first in outputs_list[0].items():
+        values = [outputs[key] for outputs in outputs_list]
+        if isinstance(first, dict):
+            lengths = [len(next(iter(value.values()), [])) for value in values]
+            columns[f"{key}{RAGGED_SEPARATOR}{OFFSETS_FIELD}"] = np.concatenate(([0], np.cumsum(lengths)))
+            for field in first:
+                columns[f"{key}{RAGGED_SEPARATOR}{field}"] = np.concatenate(
+                    [np.asarray(value[field], dtype=np.float64) for value in values]
+                )
+        elif key == 'index':
+            columns[key] = np.asarray(values, dtype=np.int64)
+        else:
+            columns[key] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    return columns
+
+
+def _decode_columns(chunks):
+    if not chunks:
+        return {}
+
+    results = {}
+    ragged = {}
+    for key in chunks[0]:
+        if RAGGED_SEPARATOR in key:
+            name, field = key.split(RAGGED_SEPARATOR, 1)
+            ragged.setdefault(name, []).append(field)
+        else:
+            results[key] = np.concatenate([chunk[key] for chunk in chunks])
+
+    for name, fields in ragged.items():
+        offsets_key = f"{name}{RAGGED_SEPARATOR}{OFFSETS_FIELD}"
+        fields = [field for field in fields if field != OFFSETS_FIELD]
+        series = []
+        for chunk in chunks:
+            offsets = chunk[offsets_key]
+            for start, end in zip(offsets[:-1], offsets[1:]):
+                # Slices are views into the chunk's flat arrays, not copies
+                series.append({field: chunk[f"{name}{RAGGED_SEPARATOR}{field}"][start:end] for field in fields})
+        results[name] = series
+
+    return results
@@ -0,0 +1,175 @@
+from statistics import NormalDist
+
+import numpy as np
+from rocketpy.rocket.components import Components
+from scipy.stats import qmc
+
+SAMPLERS = ("random", "sobol", "lhs")
+
+# Distributions the quasi-random samplers can map a uniform coordinate onto
+QUANTILE_FUNCTIONS = {
+    'normal': lambda u, mean, std: mean + std * NormalDist().inv_cdf(u),
+    'uniform': lambda u, low, high: low + (high - low) * u,
+}
+
+# Keeps inverse CDFs finite
+EDGE = 1e-12
+
+
+class QuantileDraw:
+    """
+    Stands in for the distribution method of a stochastic attribute
+
+    StochasticModel.dict_generator calls value[-1](value[0], value[1]); this
+    returns the quantile of the sample's quasi-random coordinate instead of a
+    pseudo-random draw. __name__ is kept so logged distributions still read
+    'normal' or 'uniform'.
+    """
+
+    def __init__(self, distribution, u):
+        self.__name__ = distribution
+        self.u = u
+
+    def __call__(self, first, second):
+        return QUANTILE_FUNCTIONS[self.__name__](self.u, first, second)
+
+
+def _is_spread(value):
+    # Only distributions that actually vary take a dimension
+    if not isinstance(value, tuple):
+        return False
+    return value[1] != 0 and not (value[-1].__name__ == 'uniform' and value[0] == value[1])
+
+
+def _check_distribution(name, value, kind):
+    distribution = value[-1].__name__
+    if distribution not in QUANTILE_FUNCTIONS:
+        raise ValueError(
+            f"Sampler {kind!r} supports {', '.join(QUANTILE_FUNCTIONS)} distributions, "
+            f"but {name} uses {distribution!r}.\n"
+            f"Use sampler='random' for this configuration."
+        )
+
+
+def sampler_name(kind, design_size=None):
+    """Name recorded in a run's manifest. LHS designs depend on their size, so it is part of the name"""
+    if kind not in SAMPLERS:
+        raise ValueError(f"sampler must be one of {SAMPLERS}, got {kind!r}")
+    return f"lhs{design_size}" if kind == "lhs" else kind
+
+
+def parse_sampler_name(name):
+    """Inverse of sampler_name: (kind, design_size)"""
+    if name.startswith("lhs"):
+        return "lhs", int(name[len("lhs"):])
+    return name, None
+
+
+def create_sampler(kind, models, seed, design_size=None):
+    """QuasiRandomSampler for kind, or None for plain pseudo-random draws"""
+    if kind == "random":
+        return None
+    return QuasiRandomSampler(kind, models, seed, design_size)
+
+
+class QuasiRandomSampler:
+    """
+    Low-discrepancy sampling of every spread distribution of the stochastic models
+
+    Each sample gets one point of a scrambled Sobol sequence or of a Latin
+    hypercube design over all sampled inputs (wind factors, mass, CoM, drag
+    factors, motor impulse and position, airbrake Cd multiplier), mapped onto
+    their distributions through the inverse CDF. Sensor noise, list choices and
+    fixed values stay on the sample's pseudo-random streams.
+
+    Point i depends only on (seed, i), so workers agree without sharing state.
+    Sobol prefixes are balanced at powers of two and can be extended; an LHS
+    design is stratified for exactly design_size samples.
+
+    Args:
+        kind: "sobol" or "lhs"
+        models: Tuple of (stochastic_env, stochastic_rocket, stochastic_flight)
+        seed: Base seed of the run (scrambles the sequence or design)
+        design_size: Number of samples of an LHS design
+    """
+
+    def __init__(self, kind, models, seed, design_size=None):
+        if kind not in ("sobol", "lhs"):
+            raise ValueError(f"Quasi-random sampler must be 'sobol' or 'lhs', got {kind!r}")
+        if kind == "lhs" and not design_size:
+            raise ValueError("An LHS design needs its number of samples (design_size)")
+
+        self.kind = kind
+        self.dimensions = self._dimensions(models)
+        self.design_size = design_size
+
+        rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+        if kind == "sobol":
+            self._engine = qmc.Sobol(len(self.dimensions), scramble=True, seed=rng)
+        else:
+            self._design = qmc.LatinHypercube(len(self.dimensions), seed=rng).random(design_size)
+
+    def _dimensions(self, models):
+        stochastic_env, stochastic_rocket, stochastic_flight = models
+        dimensions = []
+        for model in (stochastic_env, stochastic_rocket, stochastic_flight):
+            for name, value in model.__dict__.items():
+                if not name.startswith('_') and _is_spread(value):
+                    _check_distribution(name, value, self.kind)
+                    dimensions.append(name)
+        for i, (stochastic_motor, position) in enumerate(stochastic_rocket.motors):
+            for name, value in stochastic_motor.__dict__.items():
+                if not name.startswith('_') and _is_spread(value):
+                    _check_distribution(f"motor_{i}_{name}", value, self.kind)
+                    dimensions.append(f"motor_{i}_{name}")
+            if _is_spread(position):
+                _check_distribution(f"motor_{i}_position", position, self.kind)
+                dimensions.append(f"motor_{i}_position")
+        if stochastic_rocket.config.airbrake_cd_std != 0:
+            dimensions.append('airbrake_cd_multiplier')
+        return dimensions
+
+    def point(self, sample_index):
+        """Uniform coordinates of one sample, one per dimension"""
+        if self.kind == "sobol":
+            self._engine.reset()
+            if sample_index:
+                self._engine.fast_forward(sample_index)
+            point = self._engine.random(1)[0]
+        else:
+            if sample_index >= self.design_size:
+                raise ValueError(
+                    f"Sample {sample_index} is outside the LHS design of {self.design_size} samples"
+                )
+            point = self._design[sample_index]
+        return np.clip(point, EDGE, 1 - EDGE)
+
+    def apply(self, models, sample_index):
+        """
+        Point the freshly reseeded models at sample_index's coordinates
+
+        Reseeding rebuilds every stochastic attribute, so this has to run after
+        each reseed and before the sample's objects are created.
+        """
+        stochastic_env, stochastic_rocket, stochastic_flight = models
+        coordinates = dict(zip(self.dimensions, self.point(sample_index)))
+
+        for model in (stochastic_env, stochastic_rocket, stochastic_flight):
+            for name, value in list(model.__dict__.items()):
+                if name in coordinates:
+                    setattr(model, name, (value[0], value[1], QuantileDraw(value[-1].__name__, coordinates[name])))
+
+        motors = Components()
+        for i, (stochastic_motor, position) in enumerate(stochastic_rocket.motors):
+            for name, value in list(stochastic_motor.__dict__.items()):
+                u = coordinates.get(f"motor_{i}_{name}")
+                if u is not None:
+                    setattr(stochastic_motor, name, (value[0], value[1], QuantileDraw(value[-1].__name__, u)))
+            u = coordinates.get(f"motor_{i}_position")
+            if u is not None:
+                position = (position[0], position[1], QuantileDraw(position[-1].__name__, u))
+            motors.add(stochastic_motor, position)
+        stochastic_rocket.motors = motors
+
+        if 'airbrake_cd_multiplier' in coordinates:
+            stochastic_rocket.set_airbrake_cd_quantile(coordinates['airbrake_cd_multiplier'])
@@ -0,0 +1,241 @@
+import copy
+from statistics import NormalDist
+
+import numpy as np
+from rocketpy import Flight, Barometer, Accelerometer
+from rocketpy.rocket.components import Components
+from rocketpy.stochastic import (
+    StochasticEnvironment,
+    StochasticRocket,
+    StochasticFlight,
+    StochasticGenericMotor
+)
+
+from controller import Control
+from simulation_functions.airbrake_drag_curve import (
+    load_airbrake_drag_curve,
+    create_drag_coefficient_function,
+    ScaledDragCoefficient
+)
+from simulation_functions.setup_environment import setup_environment
+from simulation_functions.setup_rocket import setup_rocket
+
+
+class CustomStochasticRocket(StochasticRocket):
+    def __init__(self, rocket, controller_class, config, *args, **kwargs):
+        super().__init__(rocket, *args, **kwargs)
+        self.controller_class = controller_class
+        self.config = config
+        self._airbrake_config = {
+            'drag_coefficient_curve': config.airbrake_drag_curve_file,
+            'sampling_rate': config.sampling_rate,
+            'reference_area': 3.14159 * (config.rocket_radius ** 2),
+            'clamp': True,
+            'initial_observed_variables': [0],
+            'override_rocket_drag': False,
+            'name': "Air Brakes",
+        }
+
+        # Loaded once per run; samples only scale it by their Cd multiplier
+        self._airbrake_drag_table = load_airbrake_drag_curve(config.airbrake_drag_curve_file)
+        self._airbrake_drag_coefficient = create_drag_coefficient_function(self._airbrake_drag_table)
+
+        # Unseeded until reseed() is called for a Monte Carlo sample. Kept out of
+        # tuples/lists, which StochasticModel.dict_generator would try to sample
+        self._airbrake_rng = np.random.default_rng()
+        self._airbrake_cd_quantile = None
+        self._sensor_seeds = {'barometer': None, 'accelerometer': None}
+
+        # Controller telemetry level of the flights this model creates (see TelemetryRecorder)
+        self.telemetry_level = "full"
+
+    def reseed(self, rocket_seed, motor_seed, airbrake_seed, barometer_seed, accelerometer_seed):
+        """Reset every random stream used by create_object for one sample"""
+        self._set_stochastic(rocket_seed)
+        # The rocket hands its own seed to every component, so give the motor
+        # an independent stream or impulse and mass would draw identical normals
+        for stochastic_motor, _ in self.motors:
+            stochastic_motor._set_stochastic(motor_seed)
+        self._airbrake_rng = np.random.default_rng(airbrake_seed)
+        self._airbrake_cd_quantile = None
+        self._sensor_seeds = {'barometer': barometer_seed, 'accelerometer': accelerometer_seed}
+
+    def set_airbrake_cd_quantile(self, u):
+        """Take the next airbrake Cd multiplier from a quasi-random coordinate u in (0, 1)"""
+        self._airbrake_cd_quantile = u
+
+    def create_object(self):
+        new_rocket = super().create_object()
+        airbrake_cd_multiplier = self._draw_airbrake_cd_multiplier()
+        return self._add_avionics(new_rocket, self.controller_class(self.config), airbrake_cd_multiplier)
+
+    def create_objects(self, controllers):
+        """
+        Create one rocket per controller, all from the same random draws
+
+        The airframe and motor are built once and shallow-copied, then each copy
+        gets its own sensors, airbrakes and controller. Sensors are rebuilt from
+        the same seeds, so every controller sees identical noise.
+
+        Args:
+            controllers: Controller instances (anything with a controller() method)
+
+        Returns:
+            List of Rocket objects, in the order of controllers
+        """
+        base_rocket = super().create_object()
+        airbrake_cd_multiplier = self._draw_airbrake_cd_multiplier()
+
+        rockets = []
+        for controller_instance in controllers:
+            new_rocket = copy.copy(base_rocket)
+            new_rocket.sensors = Components()
+            new_rocket.air_brakes = []
+            new_rocket._controllers = []
+            rockets.append(self._add_avionics(new_rocket, controller_instance, airbrake_cd_multiplier))
+        return rockets
+
+    def _draw_airbrake_cd_multiplier(self):
+        # Apply variance to airbrake drag coefficient
+        if self._airbrake_cd_quantile is not None:
+            airbrake_cd_multiplier = 1.0 + self.config.airbrake_cd_std * NormalDist().inv_cdf(self._airbrake_cd_quantile)
+        else:
+            airbrake_cd_multiplier = self._airbrake_rng.normal(1.0, self.config.airbrake_cd_std)
+        # Logged with the rest of the sampled rocket inputs
+        self.last_rnd_dict['airbrake_cd_multiplier'] = airbrake_cd_multiplier
+        return airbrake_cd_multiplier
+
+    def _add_avionics(self, new_rocket, controller_instance, airbrake_cd_multiplier):
+        barometer = Barometer(
+            sampling_rate=self.config.sampling_rate,
+            measurement_range=self.config.barometer_range,
+            resolution=self.config.barometer_resolution,
+            noise_density=self.config.barometer_noise_density,
+            noise_variance=self.config.barometer_noise_variance,
+            random_walk_density=self.config.barometer_random_walk_density,
+            constant_bias=self.config.barometer_constant_bias,
+            operating_temperature=self.config.barometer_operating_temperature,
+            temperature_bias=self.config.barometer_temperature_bias,
+            temperature_scale_factor=self.config.barometer_temperature_scale_factor,
+            name="Barometer",
+            seed=self._sensor_seeds['barometer']
+        )
+        new_rocket.add_sensor(barometer, position=(0, 0, self.config.barometer_position))
+
+        accelerometer = Accelerometer(
+            sampling_rate=self.config.sampling_rate,
+            measurement_range=self.config.accel_range,
+            resolution=self.config.accel_resolution,
+            noise_density=self.config.accel_noise_density,
+            noise_variance=self.config.accel_noise_variance,
+            random_walk_density=self.config.accel_random_walk_density,
+            constant_bias=self.config.accel_constant_bias,
+            operating_temperature=self.config.accel_operating_temp,
+            temperature_bias=self.config.accel_temperature_bias,
+            temperature_scale_factor=self.config.accel_temperature_scale_factor,
+            cross_axis_sensitivity=self.config.accel_cross_axis_sensitivity,
+            name="Accelerometer",
+            seed=self._sensor_seeds['accelerometer']
+        )
+        new_rocket.add_sensor(accelerometer, position=(0, 0, self.config.accele_position))
+
+        # Store controller instance on rocket for later access
+        new_rocket._controller_instance = controller_instance
+        if hasattr(controller_instance, 'set_telemetry_level'):
+            controller_instance.set_telemetry_level(self.telemetry_level)
+
+        air_brakes = new_rocket.add_air_brakes(
+            drag_coefficient_curve=self._airbrake_drag_coefficient,
+            controller_function=controller_instance.controller,
+            sampling_rate=self._airbrake_config['sampling_rate'],
+            reference_area=self._airbrake_config['reference_area'],
+            clamp=self._airbrake_config['clamp'],
+            initial_observed_variables=self._airbrake_config['initial_observed_variables'],
+            override_rocket_drag=self._airbrake_config['override_rocket_drag'],
+            name=self._airbrake_config['name'],
+        )
+        # Scale the shared curve lazily instead of rebuilding it for every sample
+        air_brakes.drag_coefficient = ScaledDragCoefficient(self._airbrake_drag_coefficient, airbrake_cd_multiplier)
+
+        return new_rocket
+
+
+def reseed_environment(stochastic_env, seed):
+    """Reseed a StochasticEnvironment without compounding its wind factors"""
+    # create_object() writes the scaled wind back onto the wrapped Environment,
+    # and reseeding re-reads the nominal value from it, so restore it first
+    for name in ('wind_velocity_x', 'wind_velocity_y'):
+        nominal = getattr(stochastic_env, f'_{name}', None)
+        if nominal is not None:
+            setattr(stochastic_env.obj, name, nominal)
+    stochastic_env._set_stochastic(seed)
+
+
+def setup_stochastic_models(config):
+    """
+    Build the nominal flight and the stochastic models sampled by the Monte Carlo
+
+    Args:
+        config: Config object
+
+    Returns:
+        Tuple of (stochastic_env, stochastic_rocket, stochastic_flight)
+    """
+    nominal_controller = Control(config)
+    environment = setup_environment(config)
+    rocket, motor = setup_rocket(config, nominal_controller.controller)
+
+    nominal_flight = Flight(
+        rocket=rocket,
+        environment=environment,
+        rail_length=config.rail_length,
+        inclination=90,
+        heading=0,
+        terminate_on_apogee=config.terminate_on_apogee
+    )
+
+    # Wind configuration: supports both normal and uniform distributions
+    # For normal: wind_std = (multiplier, std)
+    # For uniform: wind_std = (min, max, "uniform")
+    if len(config.wind_std) == 3 and config.wind_std[2] == "uniform":
+        # Uniform distribution: (min, max, "uniform")
+        wind_min, wind_max = config.wind_std[0], config.wind_std[1]
+        stochastic_env = StochasticEnvironment(
+            environment=environment,
+            wind_velocity_x_factor=(wind_min, wind_max, "uniform"),
+            wind_velocity_y_factor=(wind_min, wind_max, "uniform"),
+        )
+    else:
+        # Normal distribution: (multiplier, std)
+        wind_multiplier, wind_std = config.wind_std
+        stochastic_env = StochasticEnvironment(
+            environment=environment,
+            wind_velocity_x_factor=(wind_multiplier, wind_std),
+            wind_velocity_y_factor=(wind_multiplier, wind_std),
+        )
+
+    nominal_impulse = motor.total_impulse
+    stochastic_motor = StochasticGenericMotor(
+        generic_motor=motor,
+        total_impulse=(nominal_impulse, config.impulse_std),
+    )
+
+    stochastic_rocket = CustomStochasticRocket(
+        rocket=rocket,
+        controller_class=Control,
+        config=config,
+        mass=(config.dry_mass, config.mass_std),
+        center_of_mass_without_motor=(config.com_no_motor, config.com_std),
+        power_off_drag_factor=(1.0, config.rocket_cd_std),
+        power_on_drag_factor=(1.0, config.rocket_cd_std),
+    )
+
+    stochastic_rocket.add_motor(stochastic_motor, position=config.motor_position)
+
+    stochastic_flight = StochasticFlight(
+        flight=nominal_flight,
+        inclination=(90, 0),
+        heading=(0, 0),
+    )
+
+    return stochastic_env, stochastic_rocket, stochastic_flight